@@ -1,11 +1,14 @@
 import gc
 import os
 import logging
-import queue
 from pathlib import Path
 import whisper
 import threading
 import torch
+# own:
+from media_jobs import JobQueue, Job, job_key
+from media_stats import STATS, stage
+from ai_cpu import configure_cpu_threads, quantize_linear
 
 """
 🎚️ 1. Mögliche Whisper-Modelle
@@ -19,6 +22,19 @@ large / large-v2 / large-v3	~3–6 GB	🐌 Deutlich langsamer	🧠 Exzellent	Fas
 
 log = logging.getLogger(__name__)
 
+
+def _mem_available_mb() -> float | None:
+    """MemAvailable aus /proc/meminfo (Linux): freier RAM plus freigebbarer Page Cache."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024  # kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
 class AIAudio:
     """
     Klasse zur einmaligen Initialisierung des Whisper-Modells (Audio)
@@ -26,115 +42,311 @@ class AIAudio:
     """
 
     AUDIO_MODEL_PATH = Path.home() / ".cache/whisper/"
+    # Batch-Modus für kurze Clips (Sprachmemos): mehrere 30 s Fenster in einem Encoder/Decoder-Lauf
+    BATCH_SIZE = 8
+    BATCH_MAX_SECONDS = 30.0  # länger -> normales transcribe() mit gleitendem Fenster
+    BATCH_BEAM_SIZE = 5  # Beams je Clip im Batch (wie whisper CLI), None = greedy
+    # Speicherbedarf beim Laden (fp32 Gewichte) in MB, für den Modell-Tausch im laufenden Betrieb
+    MODEL_MB = {"tiny": 160, "base": 300, "small": 1000, "medium": 3100, "large": 6300, "large-v2": 6300,
+                "large-v3": 6300, "turbo": 3300}
+    MEMORY_BUDGET_MB = None  # z.B. 8000: nie mehr als 8 GB für Whisper (zwei Modelle während des Tauschs)
+    # Schwellwerte wie in whisper.transcribe(): schlechte Batch-Ergebnisse werden einzeln wiederholt
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    LOGPROB_THRESHOLD = -1.0
+    NO_SPEECH_THRESHOLD = 0.6
 
-    def __init__(self, audio_model_size:str="large-v3"):
+    # cpu_optimized: ohne GPU int8-quantisiertes Modell und alle CPU-Kerne (siehe ai_cpu.py)
+    def __init__(self, audio_model_size:str="large-v3", cpu_optimized:bool = False, num_threads:int = None):
         self.device_str = "cuda" if torch.cuda.is_available() else "cpu"
         self.device = torch.device(self.device_str)
         self.use_fp16 = (self.device_str == "cuda")
+        self.cpu_optimized:bool = cpu_optimized and self.device_str == "cpu"
+        self.num_threads = num_threads
+        self.quantized:bool = False
 
-        # Whisper
-        self.ai_queue = queue.Queue()
+        # Whisper. Persistente Queue: offene Transkriptionen überleben Absturz/Neustart.
+        self.ai_queue = JobQueue("audio")
         self.audio_model = None
         self.audio_model_ready = threading.Event()
         self.audio_model_error = None
-        self.audio_model_size = audio_model_size
-        self.audio_model_size_loaded = None
+        self.audio_model_size = audio_model_size  # gewünschtes Modell
+        self.audio_model_size_loaded = None  # tatsächlich geladenes Modell
+        # _model_lock: ein Job (transcribe) oder ein Modell-Tausch, nie beides gleichzeitig
+        self._model_lock = threading.RLock()
+        self._swap_lock = threading.Lock()
+        self._swap_thread = None
+        self._swap_callback = None
         self._load_audio_model(audio_model_size)
 
     #
     # Push jedes Audio und Video in die Queue. _audio_worker_loop()
     #
-    def push(self, path, kind:str, item_id, image_text:str, length:float):
+    # run_id: Kennung des Analyse-Durchgangs, item_id ist nur innerhalb dieses Durchgangs gültig.
+    def push(self, path, kind:str, item_id, image_text:str, length:float, folder="", run_id=None):
         if kind not in ("audio", "video"):
             return
-        self.ai_queue.put(
-            (path, kind, item_id, image_text, length)
-        )
-        log.info(f"queue.size={self.ai_queue.qsize()}")
+        self.ai_queue.put(job_key(path), {
+            "path": str(path), "kind": kind, "item_id": item_id,
+            "image_text": image_text, "length": length, "folder": str(folder), "run_id": run_id
+        })
+        size = self.ai_queue.qsize()
+        STATS.gauge("queue.audio", size)
+        log.info(f"queue.size={size}")
 
     #
-    # Wartet max. 10 Sekunden, wenn die Queue leer ist.
+    # Blockiert, bis ein Job kommt. None, wenn die Queue leer und mit close() geschlossen ist.
     #
-    def _get(self):
-        log.info(f"Audio queue.size={self.ai_queue.qsize()}")
-        try:
-            return self.ai_queue.get(block=True, timeout=10)
-        except queue.Empty:
-            return None
+    def _get(self) -> Job | None:
+        size = self.ai_queue.qsize()
+        STATS.gauge("queue.audio", size)
+        log.info(f"Audio queue.size={size}")
+        return self.ai_queue.get(block=True)
+
+    # Transkript einer früheren (auch abgebrochenen) Sitzung, falls die Datei unverändert ist.
+    def cached_transcript(self, path) -> str | None:
+        return self.ai_queue.result(job_key(path))
+
+    def job_done(self, job:Job, transcript:str):
+        self.ai_queue.task_done(job, transcript)
+
+    def job_failed(self, job:Job, error):
+        self.ai_queue.task_failed(job, str(error))
 
     def preload_audio_model(self, audio_model_size:str="large-v3"):
         """
         Startet das Laden des Whisper-Modells im Hintergrund.
         """
+        self.audio_model_ready.clear()
 
-        def _load():
-            try:
-                self._load_audio_model(audio_model_size)
-                self.audio_model_size_loaded = audio_model_size
-            except Exception as exc:
-                self.audio_model_error = exc
-                self.audio_model = None
-            finally:
-                self.audio_model_ready.set()
+        def _done(error):
+            self.audio_model_error = error
+            self.audio_model_ready.set()
 
-        thread = threading.Thread(
-            target=_load,
-            name="WhisperModelLoader",
-            daemon=True
-        )
-        thread.start()
+        self.swap_model_async(audio_model_size, on_done=_done)
 
     #
-    # Lädt das Audio Modell (Whisper) in den Speicher
+    # Lädt das Audio Modell (Whisper) in den Speicher (blockierend).
     #
     def _load_audio_model(self, audio_model_size:str):
         """
         Whisper für Transkription laden.
         Nutzt lokales Modell, falls vorhanden, sonst Download.
         """
+        self.audio_model_size = audio_model_size
+        if self.audio_model is not None and self.audio_model_size_loaded == audio_model_size:
+            log.info("✅ Audio2Text AI Model already loaded into RAM is now ready")
+            return
+        self._swap_to(audio_model_size)
+
+    def _build_model(self, audio_model_size:str):
+        """Neues Whisper-Modell laden (ohne das aktuelle anzufassen), ggf. fp16 bzw. int8."""
         # Standard-Whisper-Cachepfad
-        if self.audio_model is not None:
-            if self.audio_model_size_loaded == self.audio_model_size:
-                log.info("✅ Audio2Text AI Model already loaded into RAM is now ready")
-            else:
-                log.info("🗑️ Unloading Audio2Text AI Model...")
-                del self.audio_model
-                gc.collect()
-                if torch.cuda.is_available():
-                    log.info("🗑️ Deleting GPU cache")
-                    torch.cuda.empty_cache()
+        cache_dir = os.path.join( Path.home(), ".cache", "whisper")
+        model_filename = f"{audio_model_size}.pt"
+        model_path = os.path.join(cache_dir, model_filename)
+        log.info(f"🎧 Audio2Text AI Model runs on {self.device_str.upper()}")
+        if os.path.exists(model_path):
+            log.info(f"🎧 Audio2Text AI Model locally found ({model_path}). Initializing...")
+            model = whisper.load_model(model_path,device=self.device)
+        else:
+            log.info("🎧  Audio2Text AI Model not found – Download started...")
+            model = whisper.load_model(audio_model_size, device=self.device)
+            log.info(f"🎧 Audio2Text AI Model saved locally under: {model_path}")
+        if self.use_fp16:
+           model.half()  # Konvertiert zu float16 (schneller auf GPU)
+        if self.cpu_optimized:
+            configure_cpu_threads(self.num_threads)
+            model = quantize_linear(model)
+        log.info(f"✅ Audio2Text AI Model '{audio_model_size}' loaded into RAM is now ready")
+        return model
+
+    # Nach dem Löschen der letzten Referenz auf das alte Modell
+    def _release_memory(self):
+        gc.collect()
+        if torch.cuda.is_available():
+            log.info("🗑️ Deleting GPU cache")
+            torch.cuda.empty_cache()
+
+    #
+    # Speicherbedarf: passt das neue Modell noch neben das alte?
+    # MEMORY_BUDGET_MB begrenzt zusätzlich (None = nur freier RAM bzw. freier GPU-Speicher).
+    #
+    def _free_memory_mb(self) -> float | None:
+        try:
+            if self.device_str == "cuda":
+                return torch.cuda.mem_get_info(self.device)[0] / 2**20
+        except RuntimeError:
+            return None
+        available = _mem_available_mb()
+        if available is not None:
+            return available
+        try:  # ohne /proc/meminfo: nur MemFree (ohne freigebbaren Page Cache), zu vorsichtig
+            return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (AttributeError, ValueError, OSError):  # z.B. Windows ohne sysconf
+            return None
+
+    def _fits_next_to_current(self, audio_model_size:str) -> bool:
+        if self.audio_model is None:
+            return True
+        need = self.MODEL_MB.get(audio_model_size, self.MODEL_MB["large-v3"])
+        free = self._free_memory_mb()
+        if self.MEMORY_BUDGET_MB is not None:
+            used = self.MODEL_MB.get(self.audio_model_size_loaded, 0)
+            budget = self.MEMORY_BUDGET_MB - used
+            free = budget if free is None else min(free, budget)
+        return free is None or need <= free * 0.9
+
+    #
+    # Modell wechseln. Das alte Modell transkribiert weiter, bis das neue geladen ist;
+    # getauscht wird zwischen zwei Jobs (unter _model_lock), danach wird das alte freigegeben.
+    # Reicht der Speicher nicht für beide, wird erst entladen (dann warten die Jobs).
+    #
+    def _swap_to(self, audio_model_size:str):
+        if self._fits_next_to_current(audio_model_size):
+            model = self._build_model(audio_model_size)
+            with self._model_lock:
+                old, self.audio_model = self.audio_model, model
+                self.audio_model_size_loaded = audio_model_size
+                self.quantized = self.cpu_optimized
+            if old is not None:
+                log.info("🗑️ Unloading previous Audio2Text AI Model...")
+                del old, model
+                self._release_memory()
+        else:
+            log.info(f"🎧 Not enough memory for two Whisper models, unloading before loading '{audio_model_size}'")
+            with self._model_lock:
                 self.audio_model = None
                 self.audio_model_size_loaded = None
+                self._release_memory()
+                self.audio_model = self._build_model(audio_model_size)
+                self.audio_model_size_loaded = audio_model_size
+                self.quantized = self.cpu_optimized
+        self.audio_model_error = None
 
-        if self.audio_model is None or self.audio_model_error is not None:
-            cache_dir = os.path.join( Path.home(), ".cache", "whisper")
-            model_filename = f"{audio_model_size}.pt"
-            model_path = os.path.join(cache_dir, model_filename)
-            log.info(f"🎧 Audio2Text AI Model runs on {self.device_str.upper()}")
-            if os.path.exists(model_path):
-                log.info(f"🎧 Audio2Text AI Model locally found ({model_path}). Initializing...")
-                self.audio_model = whisper.load_model(model_path,device=self.device)
-            else:
-                log.info("🎧  Audio2Text AI Model not found – Download started...")
-                self.audio_model = whisper.load_model(audio_model_size, device=self.device)
-                log.info(f"🎧 Audio2Text AI Model saved locally under: {model_path}")
-            if self.use_fp16:
-               self.audio_model.half()  # Konvertiert zu float16 (schneller auf GPU)
+    #
+    # Modellwechsel im Hintergrund. Mehrere Aufrufe hintereinander: es gilt die letzte Auswahl.
+    # on_done(error) wird im Loader-Thread aufgerufen (error = None bei Erfolg).
+    #
+    def swap_model_async(self, audio_model_size:str, on_done=None):
+        with self._swap_lock:
+            self.audio_model_size = audio_model_size
+            self._swap_callback = on_done
+            if self._swap_thread is not None:
+                return  # der laufende Loader holt sich das neue Ziel
+            self._swap_thread = threading.Thread(target=self._swap_worker, name="WhisperModelLoader", daemon=True)
+            self._swap_thread.start()
 
-            log.info("✅ Audio2Text AI Model loaded into RAM is now ready")
+    def _swap_worker(self):
+        error = None
+        while True:
+            with self._swap_lock:
+                target = self.audio_model_size
+                if error is not None or (self.audio_model is not None and target == self.audio_model_size_loaded):
+                    self._swap_thread = None
+                    callback = self._swap_callback
+                    break
+            try:
+                self._swap_to(target)
+            except Exception as exc:
+                log.exception(f"swap_model_async({target}): ")
+                self.audio_model_error = error = exc
+        if callback is not None:
+            callback(error)
+
+    def _apply_cpu_mode(self):
+        if not self.cpu_optimized or self.audio_model is None or self.quantized:
+            return
+        configure_cpu_threads(self.num_threads)
+        with self._model_lock:  # nicht während einer Transkription quantisieren
+            self.audio_model = quantize_linear(self.audio_model)
+            self.quantized = True
+
+    #
+    # CPU-Modus ein-/ausschalten. Ausschalten lädt das fp32 Modell neu, weil die
+    # Quantisierung nicht rückgängig gemacht werden kann.
+    #
+    def set_cpu_optimized(self, enabled:bool):
+        enabled = enabled and self.device_str == "cpu"
+        if enabled == self.cpu_optimized:
+            return
+        self.cpu_optimized = enabled
+        if enabled:
+            self._apply_cpu_mode()
+        elif self.quantized:
+            self._swap_to(self.audio_model_size_loaded or self.audio_model_size)
 
     ###################################################################
     # Do Audio2Text
     ###################################################################
-    def transcribe_audio(self, path:Path):
+    def transcribe_audio(self, path:Path) -> str:
+        return self.transcribe_audio_segments(path)[0]
+
+    #
+    # Wie transcribe_audio(), zusätzlich die Whisper-Segmente [{"start", "end", "text"}]
+    # für die Volltextsuche (Treffer mit Zeitstempel).
+    # audio: schon dekodierte Samples (16 kHz mono float32, siehe media_audio_decode.py),
+    #        sonst startet whisper ffmpeg für path selbst.
+    #
+    def transcribe_audio_segments(self, path:Path, audio=None) -> tuple[str, list[dict]]:
+        with self._model_lock:  # Modell-Tausch erst nach diesem Job
+            return self._transcribe_audio_segments(path, audio)
+
+    def _transcribe_audio_segments(self, path:Path, audio=None) -> tuple[str, list[dict]]:
         if self.audio_model is None:
             raise RuntimeError("❌ FATAL: Audio AI Model not yet initialized.")
 
         try:
             log.debug(f"transcribe_audio({os.path.basename(path)}): START")
-            result = self.audio_model.transcribe(audio=str(path), fp16=self.use_fp16)  # ignore model warning
+            with stage("whisper.transcribe"), torch.inference_mode():
+                result = self.audio_model.transcribe(audio=str(path) if audio is None else audio,
+                                                     fp16=self.use_fp16)  # ignore model warning
             log.info(f"transcribe_audio({os.path.basename(path)})={result}")
-            return result["text"].strip()
+            segments = [{"start": float(seg["start"]), "end": float(seg["end"]), "text": seg["text"].strip()}
+                        for seg in result.get("segments", [])]
+            return result["text"].strip(), segments
         except Exception as e:
             log.exception("transcribe_audio()")
-            return "⚠️ ERROR in Audio transcription"
+            return "⚠️ ERROR in Audio transcription", []
+
+    #
+    # Mehrere kurze Clips (<= BATCH_MAX_SECONDS) auf einmal: je Clip ein 30 s Mel-Fenster,
+    # alle Fenster als ein Batch durch Encoder und Decoder, beam_size Beams je Clip (None = greedy).
+    # items: [(path, samples)], Ergebnis in derselben Reihenfolge wie transcribe_audio_segments().
+    # Clips, bei denen whisper.transcribe() mit höherer Temperatur wiederholen würde, laufen einzeln.
+    #
+    def transcribe_batch(self, items:list, beam_size:int = BATCH_BEAM_SIZE) -> list[tuple[str, list[dict]]]:
+        with self._model_lock:  # Modell-Tausch erst nach diesem Batch
+            return self._transcribe_batch(items, beam_size)
+
+    def _transcribe_batch(self, items:list, beam_size:int = None) -> list[tuple[str, list[dict]]]:
+        if self.audio_model is None:
+            raise RuntimeError("❌ FATAL: Audio AI Model not yet initialized.")
+        if not items:
+            return []
+        try:
+            with stage("whisper.batch"), torch.inference_mode():
+                mels = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(samples)),
+                                                n_mels=self.audio_model.dims.n_mels)
+                    for _, samples in items]).to(self.device)
+                options = whisper.DecodingOptions(task="transcribe", temperature=0.0, beam_size=beam_size,
+                                                  without_timestamps=True, fp16=self.use_fp16)
+                decoded = whisper.decode(self.audio_model, mels, options)
+        except Exception:
+            log.exception("transcribe_batch()")
+            return [self.transcribe_audio_segments(path, audio=samples) for path, samples in items]
+
+        results = []
+        for (path, samples), res in zip(items, decoded):
+            seconds = len(samples) / whisper.audio.SAMPLE_RATE
+            if res.no_speech_prob > self.NO_SPEECH_THRESHOLD and res.avg_logprob < self.LOGPROB_THRESHOLD:
+                results.append(("", []))  # Stille
+            elif res.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD or res.avg_logprob < self.LOGPROB_THRESHOLD:
+                log.info(f"transcribe_batch({os.path.basename(str(path))}): fallback to transcribe()")
+                results.append(self.transcribe_audio_segments(path, audio=samples))
+            else:
+                text = res.text.strip()
+                results.append((text, [{"start": 0.0, "end": round(seconds, 2), "text": text}] if text else []))
+        STATS.gauge("whisper.batch_size", len(items))
+        log.info(f"transcribe_batch({len(items)} clips)")
+        return results
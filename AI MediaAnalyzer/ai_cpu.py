@@ -0,0 +1,67 @@
+import logging
+import os
+import torch
+
+log = logging.getLogger(__name__)
+
+#
+# CPU-Modus für Rechner ohne GPU (opt-in):
+#  - dynamische int8 Quantisierung aller nn.Linear (Gewichte int8, Aktivierungen zur Laufzeit)
+#  - torch.set_num_threads() auf die verfügbaren Kerne
+#  - Inferenz unter torch.inference_mode() (im Aufrufer)
+# BLIP und Whisper bestehen zum größten Teil aus Linear-Layern (Attention, MLP),
+# die Convolutions (Whisper Encoder-Stem, ViT Patch-Embedding) bleiben fp32.
+#
+
+
+def available_cpus() -> int:
+    """Kerne, auf denen dieser Prozess laufen darf (berücksichtigt taskset/cgroups-Affinität)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Windows, macOS
+        return os.cpu_count() or 1
+
+
+def configure_cpu_threads(num_threads:int = None) -> int:
+    """Setzt die Anzahl der Intra-Op Threads von torch. None -> alle verfügbaren Kerne."""
+    num_threads = num_threads or available_cpus()
+    if torch.get_num_threads() != num_threads:
+        torch.set_num_threads(num_threads)
+    log.info(f"🧮 torch CPU threads: {torch.get_num_threads()}")
+    return num_threads
+
+
+def _plain_linear(model: torch.nn.Module) -> int:
+    """
+    Whisper verwendet eigene Unterklassen von nn.Linear (casten nur den dtype im forward()).
+    quantize_dynamic() ersetzt aber nur exakt nn.Linear – für fp32 sind beide gleichwertig.
+    """
+    count = 0
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and not type(module).__module__.startswith("torch."):
+            module.__class__ = torch.nn.Linear
+            count += 1
+    return count
+
+
+def _select_engine():
+    # x86: fbgemm/x86, ARM: qnnpack
+    supported = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in supported:
+            torch.backends.quantized.engine = engine
+            return engine
+    return torch.backends.quantized.engine
+
+
+def quantize_linear(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Dynamische int8 Quantisierung der Linear-Layer (in-place, damit nicht kurzzeitig
+    zwei Kopien im RAM liegen). Nur für CPU, das Modell muss fp32 sein.
+    """
+    engine = _select_engine()
+    model.eval()
+    _plain_linear(model)
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    log.info(f"🧮 Model quantized (dynamic int8, nn.Linear, engine={engine}).")
+    return quantized
@@ -0,0 +1,76 @@
+import logging
+from pathlib import Path
+from typing import List
+import numpy as np
+from PIL import Image
+from media_stats import stage
+from media_vectors import VectorStore
+# torch und transformers erst im Konstruktor importieren (wie in ai_image.py)
+
+log = logging.getLogger(__name__)
+
+#
+# Bild- und Text-Embeddings mit CLIP für die semantische Suche ("Kinder am See bei Sonnenuntergang")
+# und die Duplikat-Suche. Die BLIP Captioning-Gewichte haben keinen gemeinsamen Bild/Text-Raum,
+# deshalb ein eigenes, kleines CLIP Modell (ViT-B/32, 512 Dimensionen, ~600 MB).
+#
+class AIEmbed:
+
+    DEFAULT_MODEL_PATH = Path.home() / ".cache/huggingface/hub"
+    MODEL_NAME = "openai/clip-vit-base-patch32"
+    BATCH_SIZE = 16
+
+    def __init__(self, model_name:str = MODEL_NAME, num_threads:int = None):
+        import torch
+        from transformers import CLIPModel, CLIPProcessor
+        self.model_name = model_name
+        self.device_str = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = torch.device(self.device_str)
+        self.use_fp16 = (self.device_str == "cuda")
+        if self.device_str == "cpu" and num_threads:
+            from ai_cpu import configure_cpu_threads
+            configure_cpu_threads(num_threads)
+
+        log.info(f"🧲 CLIP model loading ({model_name})...")
+        self.processor = CLIPProcessor.from_pretrained(model_name, cache_dir=self.DEFAULT_MODEL_PATH)
+        dtype = torch.float16 if self.use_fp16 else torch.float32
+        self.model = CLIPModel.from_pretrained(model_name, cache_dir=self.DEFAULT_MODEL_PATH,
+                                               torch_dtype=dtype).to(self.device).eval()
+        self.dim:int = self.model.config.projection_dim
+        self.store = VectorStore(model_name, self.dim)
+        log.info(f"✅ CLIP model ready, {len(self.store)} embeddings cached.")
+
+    def embed_images(self, images:List[Image.Image]) -> np.ndarray:
+        """L2-normierte Bild-Embeddings (n x dim, float32)."""
+        import torch
+        result = []
+        for start in range(0, len(images), self.BATCH_SIZE):
+            batch = [img.convert("RGB") for img in images[start:start + self.BATCH_SIZE]]
+            with stage("clip.image"), torch.inference_mode():
+                inputs = self.processor(images=batch, return_tensors="pt").to(self.device)
+                if self.use_fp16:
+                    inputs["pixel_values"] = inputs["pixel_values"].half()
+                features = self.model.get_image_features(**inputs)
+            result.append(torch.nn.functional.normalize(features.float(), dim=-1).cpu().numpy())
+        return np.concatenate(result) if result else np.zeros((0, self.dim), np.float32)
+
+    def embed_text(self, text:str) -> np.ndarray:
+        """L2-normiertes Text-Embedding (dim, float32) für die Suche."""
+        import torch
+        with stage("clip.text"), torch.inference_mode():
+            inputs = self.processor(text=[text], return_tensors="pt", padding=True, truncation=True).to(self.device)
+            features = self.model.get_text_features(**inputs)
+        return torch.nn.functional.normalize(features.float(), dim=-1).cpu().numpy()[0]
+
+    # Embedding berechnen und speichern; key = Dateipfad oder media_vectors.frame_key() für Keyframes.
+    def add_image(self, key:str, image:Image.Image):
+        try:
+            self.store.add(key, self.embed_images([image])[0])
+        except Exception:
+            log.exception(f"add_image({key}): ")
+
+    def search_text(self, text:str, k:int = 50):
+        return self.store.search(self.embed_text(text), k)
+
+    def duplicates(self, threshold:float = None):
+        return self.store.duplicate_clusters(threshold) if threshold else self.store.duplicate_clusters()
@@ -2,11 +2,13 @@ import logging
 import os
 from deepface import DeepFace
 from pathlib import Path
-import queue
 import threading
 import cv2
+import numpy as np
 # own:
 import media_tools
+from media_jobs import JobQueue, Job, job_key
+from media_stats import STATS, stage
 
 log = logging.getLogger(__name__)
 
@@ -18,10 +20,13 @@ class AIFace:
         self.model_name:str = model_name
         self.enforce_detection:bool = enforce_detection
         self.runs:bool = False
-        self.ai_queue = queue.Queue()
+        self.ai_queue = JobQueue("face")  # persistent, überlebt Absturz/Neustart
+        # Personen je Cover-Datei im Cover-Cache: ein Album-Cover wird nur einmal untersucht
+        self._cover_persons:dict[Path, set] = {}
 
     def set_db_path(self, db_path:Path):
         self.db_path:Path = db_path
+        self._cover_persons.clear()
 
     @staticmethod
     def _normalize_path(path: str) -> str:
@@ -30,19 +35,22 @@ class AIFace:
     def _identify_persons_image(self, image_path:Path) -> set:
         """Erkennt alle Personen auf einem Bild und gibt eine Liste der Namen zurück."""
         try:
-            img = cv2.imdecode(
-                np.fromfile(str(image_path), dtype=np.uint8),
-                cv2.IMREAD_COLOR
-            )
+            with stage("face.decode"):
+                img = cv2.imdecode(
+                    np.fromfile(str(image_path), dtype=np.uint8),
+                    cv2.IMREAD_COLOR
+                )
             # enforce_detection=False verhindert Abstürze, wenn kein Gesicht gefunden wird
-            results = DeepFace.find(img_path=img,
-                                    db_path=str(self.db_path),
-                                    model_name=self.model_name,
-                                    enforce_detection=self.enforce_detection,
-                                    silent=True)
-            mood = DeepFace.analyze(img=img,
-                                    enforce_detection=self.enforce_detection,
-                                    silent=True)
+            with stage("deepface.find"):
+                results = DeepFace.find(img_path=img,
+                                        db_path=str(self.db_path),
+                                        model_name=self.model_name,
+                                        enforce_detection=self.enforce_detection,
+                                        silent=True)
+            with stage("deepface.analyze"):
+                mood = DeepFace.analyze(img=img,
+                                        enforce_detection=self.enforce_detection,
+                                        silent=True)
             log.info(f"Personen Stimmung: {mood}")
             found_persons = set()
             for df in results:
@@ -74,26 +82,42 @@ class AIFace:
             for frame in frame_files:
                 persons = persons | self._identify_persons_image(Path(frame))
         elif kind == "audio":
-            infile = file_path.with_name(file_path.stem + '+cover.png')
-            if infile.exists() and infile.is_file():
-                log.debug(f"Found Cover image in {infile}.")
-                persons = self._identify_persons_image(infile)
+            cover = media_tools.extract_mp3_cover_file(file_path)
+            if cover is not None:
+                if cover not in self._cover_persons:
+                    log.debug(f"Found Cover image in {cover}.")
+                    self._cover_persons[cover] = self._identify_persons_image(cover)
+                persons = set(self._cover_persons[cover])
         else:
             log.debug(f"Unknown kind {kind}")
 
         return persons
 
-    def push(self, file_path:Path, kind:str, item_id):
+    # run_id: Kennung des Analyse-Durchgangs, item_id ist nur innerhalb dieses Durchgangs gültig.
+    def push(self, file_path:Path, kind:str, item_id, folder="", run_id=None):
         if kind not in ("image", "audio", "video"):
             return
-        self.ai_queue.put( (file_path, kind, item_id), block=False, timeout=None)
-
-    def get(self):
-        log.info(f"Face queue.size={self.ai_queue.qsize()}")
-        try:
-            return self.ai_queue.get(block=True, timeout=10)
-        except queue.Empty:
-            return None
+        self.ai_queue.put(job_key(file_path), {
+            "path": str(file_path), "kind": kind, "item_id": item_id, "folder": str(folder), "run_id": run_id
+        })
+
+    # Blockiert, bis ein Job kommt. None, wenn die Queue leer und mit close() geschlossen ist.
+    def get(self) -> Job | None:
+        size = self.ai_queue.qsize()
+        STATS.gauge("queue.face", size)
+        log.info(f"Face queue.size={size}")
+        return self.ai_queue.get(block=True)
+
+    # Personen aus einer früheren Sitzung, falls die Datei unverändert ist.
+    def cached_persons(self, file_path:Path) -> set | None:
+        persons = self.ai_queue.result(job_key(file_path))
+        return set(persons) if persons is not None else None
+
+    def job_done(self, job:Job, persons:set):
+        self.ai_queue.task_done(job, sorted(persons))
+
+    def job_failed(self, job:Job, error):
+        self.ai_queue.task_failed(job, str(error))
 
     def load(self) -> bool:
         if not self.db_path or not self.db_path.exists():
@@ -1,17 +1,32 @@
 import os
 import logging
+from dataclasses import dataclass
 from os.path import exists
 from pathlib import Path
 import numpy as np
-import torch
 from PIL import Image
 from moviepy.video.io.VideoFileClip import VideoFileClip
-from transformers import BlipProcessor, BlipForConditionalGeneration
 import queue
+import threading
 from media_tools import format_time2mmss
+from media_stats import stage
+from media_vectors import frame_key
+from media_prefetch import load_image_for_model
+import ai_image_onnx
+# torch und transformers werden erst beim Laden des torch-Backends importiert (dauert mehrere Sekunden)
 
 log = logging.getLogger(__name__)
 
+
+@dataclass
+class PreparedImage:
+    """Geladenes, verkleinertes Bild mit fertigen Modell-Eingaben (siehe AIImage.prepare_image)."""
+    image: Image.Image
+    inputs: object  # ONNX: pixel_values (numpy), torch: BatchFeature (noch auf der CPU)
+    backend: str
+    key: str
+
+
 class AIImage:
     """
     Klasse zur einmaligen Initialisierung des BLIP- (Image) Modells
@@ -20,17 +35,88 @@ class AIImage:
 
     DEFAULT_IMAGE_MODEL_PATH = Path.home() / ".cache/huggingface/hub"
     IMAGE_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+    MODEL_INPUT_SIZE = (384, 384)  # BLIP base; größere Bilder werden schon beim JPEG-Dekodieren verkleinert
 
-    def __init__(self):
+    # cpu_optimized: ohne GPU int8-quantisiertes Modell und alle CPU-Kerne (siehe ai_cpu.py)
+    # backend: "auto" = ONNX (onnxruntime, CPU), falls exportiert (python ai_image_onnx.py export), sonst torch
+    #          "onnx" / "torch" erzwingen das Backend, "onnx" fällt ohne Export trotzdem auf torch zurück.
+    def __init__(self, cpu_optimized:bool = False, num_threads:int = None, backend:str = "auto"):
         self.ai_queue = queue.Queue()
-        self.device_str = "cuda" if torch.cuda.is_available() else "cpu"
-        self.device = torch.device(self.device_str)
-        self.use_fp16 = (self.device_str == "cuda")
+        self.num_threads = num_threads
+        # _model_lock: eine Bildbeschreibung oder ein Modell-Tausch (set_cpu_optimized), nie beides gleichzeitig
+        self._model_lock = threading.RLock()
+        self.quantized:bool = False
+        self.backend:str = "torch"
+        # Optional: image_hook(key, PIL.Image) für jedes dekodierte Bild/Keyframe, z.B. AIEmbed.add_image.
+        # Damit wird jedes Bild nur einmal geladen, auch wenn es zusätzlich eingebettet wird.
+        self.image_hook = None
 
         # BLIP
         self.image_processor = None
         self.image_model = None
+        self.onnx_captioner = None
+        if backend in ("auto", "onnx"):
+            self._load_onnx_model(cpu_optimized)
+        if self.onnx_captioner is not None:
+            self.backend = "onnx"
+            self.device_str = "cpu"
+            self.device = None
+            self.use_fp16 = False
+            self.cpu_optimized:bool = cpu_optimized
+            return
+
+        import torch
+        self.device_str = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = torch.device(self.device_str)
+        self.use_fp16 = (self.device_str == "cuda")
+        self.cpu_optimized:bool = cpu_optimized and self.device_str == "cpu"
         self._load_image_model(self.DEFAULT_IMAGE_MODEL_PATH)
+        self._apply_cpu_mode()
+
+    # ONNX-Modell laden, im CPU-Modus die int8-Variante (falls mit --quantize exportiert)
+    def _load_onnx_model(self, cpu_optimized:bool):
+        quantized = cpu_optimized and ai_image_onnx.is_available(quantized=True)
+        if not ai_image_onnx.is_available(quantized=quantized):
+            log.info("🖼️ No BLIP ONNX export found, using torch.")
+            return
+        try:
+            captioner = ai_image_onnx.BlipOnnxCaptioner(quantized=quantized, num_threads=self.num_threads)
+        except Exception:
+            log.exception("⚠️ BLIP ONNX model could not be loaded.")
+            return
+        self.onnx_captioner = captioner
+        self.quantized = quantized
+
+    def _apply_cpu_mode(self):
+        if not self.cpu_optimized or self.image_model is None or self.quantized:
+            return
+        from ai_cpu import configure_cpu_threads, quantize_linear
+        configure_cpu_threads(self.num_threads)
+        self.image_model = quantize_linear(self.image_model)
+        self.quantized = True
+
+    #
+    # CPU-Modus ein-/ausschalten. Ausschalten lädt das fp32 Modell neu, weil die
+    # Quantisierung nicht rückgängig gemacht werden kann.
+    #
+    def set_cpu_optimized(self, enabled:bool):
+        enabled = enabled and self.device_str == "cpu"
+        with self._model_lock:  # wartet auf die laufende Bildbeschreibung
+            if enabled == self.cpu_optimized:
+                return
+            self.cpu_optimized = enabled
+            if self.backend == "onnx":
+                if enabled and not ai_image_onnx.is_available(quantized=True):
+                    # sonst würde dieselbe fp32 Session noch einmal geladen
+                    log.warning("🖼️ No BLIP int8 ONNX export (python ai_image_onnx.py export --quantize), staying fp32.")
+                elif enabled != self.quantized:
+                    self._load_onnx_model(enabled)
+            elif enabled:
+                self._apply_cpu_mode()
+            elif self.quantized:
+                self.image_model = None
+                self.quantized = False
+                self._load_image_model(self.DEFAULT_IMAGE_MODEL_PATH)
 
     # Pushes the job into the Queue.
     def push(self, path:Path, kind:str, item_id):
@@ -50,6 +136,8 @@ class AIImage:
     # ------------------ MODELLE LADEN ------------------
     def _load_image_model(self, path):
         """BLIP-Modell laden (lokal oder aus dem Netz)."""
+        import torch
+        from transformers import BlipProcessor, BlipForConditionalGeneration
         if exists( path / "models--Salesforce--blip-image-captioning-base/snapshots/82a37760796d32b1411fe092ab5d4e227313294b/config.json"):
             try:
                 path = path / ('models--Salesforce--blip-image-captioning-base/snapshots'
@@ -88,35 +176,77 @@ class AIImage:
             self.image_processor = None
             self.image_model = None
 
+    def _preprocess(self, image:Image.Image):
+        if self.onnx_captioner is not None:
+            return self.onnx_captioner.preprocess(image)
+        return self.image_processor(image, return_tensors="pt")
+
+    #
+    # Laden + Vorverarbeitung ohne Modell, für den Prefetcher (media_prefetch.py) in Worker-Threads.
+    # Fehler -> None, describe_image(path) meldet sie dann wie gewohnt.
+    #
+    def prepare_image(self, path) -> PreparedImage | None:
+        try:
+            image = load_image_for_model(path, self.MODEL_INPUT_SIZE)
+            return PreparedImage(image, self._preprocess(image), self.backend, os.path.abspath(str(path)))
+        except Exception as e:
+            log.warning(f"prepare_image({path}): {e}")
+            return None
+
     ###################################################################
     # Describe the image with BLIP AI model
-    # image_or_path is either an image of a filepath to an image.
+    # image_or_path is either an image, a PreparedImage or a filepath to an image.
+    # key: Schlüssel für image_hook (Default: der Pfad), bei PIL Images ohne key kein Hook.
     ###################################################################
-    def describe_image(self, image_or_path):
+    def describe_image(self, image_or_path, key:str = None):
         """Generiert eine Bildunterschrift für ein einzelnes Bild."""
-        if self.image_model is None or self.image_processor is None:
+        with self._model_lock:  # CPU-Modus erst nach dieser Beschreibung umschalten
+            return self._describe_image(image_or_path, key)
+
+    def _describe_image(self, image_or_path, key:str = None):
+        if self.onnx_captioner is None and (self.image_model is None or self.image_processor is None):
             raise RuntimeError("❌ FATAL: Image AI Model not yet initialized.")
 
         try:
-            if isinstance(image_or_path, Image.Image):
+            inputs = None
+            if isinstance(image_or_path, PreparedImage):
+                image = image_or_path.image
+                source = os.path.basename(image_or_path.key)
+                key = key or image_or_path.key
+                # Backend inzwischen gewechselt (CPU-Modus)? Dann neu vorverarbeiten.
+                if image_or_path.backend == self.backend:
+                    inputs = image_or_path.inputs
+            elif isinstance(image_or_path, Image.Image):
                 image = image_or_path
                 source = "<PIL.Image>"
             else:
-                image = Image.open(image_or_path).convert("RGB")
+                with stage("image.load"):
+                    image = load_image_for_model(image_or_path, self.MODEL_INPUT_SIZE)
                 source = os.path.basename(str(image_or_path))
+                key = key or os.path.abspath(str(image_or_path))
 
             log.debug(f"describe_image({source}): START")
+            if self.image_hook is not None and key:
+                self.image_hook(key, image)
+            if inputs is None:
+                inputs = self._preprocess(image)
 
-            #command = "Describe objects, people, and location. "
-            inputs = self.image_processor(image, return_tensors="pt").to(self.device)
-            out = self.image_model.generate(**inputs,
-                                            max_new_tokens=100,
-                                            # BLIP-2: do_sample=True,
-                                            # BLIP-2: temperature=0.7,
-                                            # BLIP-2: top_p=0.9,
-                                            # BLIP-2: repetition_penalty=1.1
-                                            )
-            caption = self.image_processor.decode(out[0], skip_special_tokens=True)
+            if self.onnx_captioner is not None:
+                with stage("blip.caption"):
+                    caption = self.onnx_captioner.caption_pixels(inputs, max_new_tokens=100)
+            else:
+                import torch
+                #command = "Describe objects, people, and location. "
+                with stage("blip.caption"), torch.inference_mode():
+                    inputs = inputs.to(self.device)
+                    out = self.image_model.generate(**inputs,
+                                                    max_new_tokens=100,
+                                                    # BLIP-2: do_sample=True,
+                                                    # BLIP-2: temperature=0.7,
+                                                    # BLIP-2: top_p=0.9,
+                                                    # BLIP-2: repetition_penalty=1.1
+                                                    )
+                caption = self.image_processor.decode(out[0], skip_special_tokens=True)
             log.info(f"describe_image()={caption}")
             return caption.capitalize()
         except FileNotFoundError:
@@ -145,9 +275,10 @@ class AIImage:
                 try:
                     fmt_mm_ss = format_time2mmss(t)
                     log.info(f"  Frame {fmt_mm_ss}/{fmt_dur_mm_ss}")
-                    frame = clip.get_frame(t)
+                    with stage("video.frame"):
+                        frame = clip.get_frame(t)
                     image = Image.fromarray(frame)
-                    caption = self.describe_image(image)
+                    caption = self.describe_image(image, key=frame_key(video_path, t))
                     if caption != last_caption:
                         captions.append(f"{fmt_mm_ss} {caption}")
                     last_caption = caption
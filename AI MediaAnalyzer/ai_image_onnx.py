@@ -0,0 +1,259 @@
+import argparse
+import json
+import logging
+import shutil
+from pathlib import Path
+import numpy as np
+from PIL import Image
+# own:
+from media_tools import CACHE_DIR
+
+try:  # optional: nur für das ONNX-Backend nötig
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+log = logging.getLogger(__name__)
+
+#
+# BLIP (Salesforce/blip-image-captioning-base) als ONNX für onnxruntime (CPU):
+#   vision_encoder.onnx       pixel_values -> image_embeds
+#   decoder.onnx              input_ids, image_embeds -> logits, present.*   (erster Schritt)
+#   decoder_with_past.onnx    input_ids, image_embeds, past.* -> logits, present.*  (KV-Cache)
+# Dazu preprocessor_config.json und vocab.txt des BlipProcessors.
+# Export einmalig (braucht torch + transformers):
+#   python ai_image_onnx.py export [--quantize]
+# Zur Laufzeit werden nur onnxruntime, numpy und PIL gebraucht.
+#
+ONNX_MODEL_DIR = CACHE_DIR / "blip-onnx"
+IMAGE_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+ONNX_OPSET = 17
+VISION_FILE = "vision_encoder.onnx"
+DECODER_FILE = "decoder.onnx"
+DECODER_PAST_FILE = "decoder_with_past.onnx"
+INT8_SUFFIX = "_int8"
+MAX_NEW_TOKENS = 100
+SPECIAL_TOKENS = {"[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "[DEC]", "[ENC]"}
+
+
+def _model_file(model_dir:Path, name:str, quantized:bool) -> Path:
+    if quantized:
+        return model_dir / name.replace(".onnx", f"{INT8_SUFFIX}.onnx")
+    return model_dir / name
+
+
+def is_available(model_dir:Path = ONNX_MODEL_DIR, quantized:bool = False) -> bool:
+    """onnxruntime installiert und das Modell exportiert?"""
+    if ort is None:
+        return False
+    files = [_model_file(model_dir, f, quantized) for f in (VISION_FILE, DECODER_FILE, DECODER_PAST_FILE)]
+    files += [model_dir / "preprocessor_config.json", model_dir / "vocab.txt", model_dir / "blip_onnx.json"]
+    return all(f.exists() for f in files)
+
+
+###########################################################
+# Export (torch + transformers nur hier)
+###########################################################
+def export_blip_onnx(model_name_or_path = IMAGE_MODEL_NAME, out_dir:Path = ONNX_MODEL_DIR,
+                     quantize:bool = False, cache_dir:Path = None) -> Path:
+    import torch
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    processor = BlipProcessor.from_pretrained(model_name_or_path, cache_dir=cache_dir)
+    model = BlipForConditionalGeneration.from_pretrained(model_name_or_path, cache_dir=cache_dir).eval()
+    decoder = model.text_decoder
+    n_layers = model.config.text_config.num_hidden_layers
+
+    def _flat(past_key_values) -> tuple:
+        # Neuere transformers liefern ein Cache-Objekt statt Tupeln
+        if hasattr(past_key_values, "to_legacy_cache"):
+            past_key_values = past_key_values.to_legacy_cache()
+        return tuple(t for layer in past_key_values for t in layer[:2])
+
+    class _Vision(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.vision = model.vision_model
+
+        def forward(self, pixel_values):
+            return self.vision(pixel_values=pixel_values, return_dict=True).last_hidden_state
+
+    class _Decoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.decoder = decoder
+
+        def forward(self, input_ids, image_embeds, *past):
+            past_key_values = tuple((past[2 * i], past[2 * i + 1]) for i in range(n_layers)) if past else None
+            out = self.decoder(input_ids=input_ids, encoder_hidden_states=image_embeds,
+                               past_key_values=past_key_values, use_cache=True, return_dict=True)
+            return (out.logits[:, -1, :],) + _flat(out.past_key_values)
+
+    size = processor.image_processor.size
+    pixel_values = torch.zeros(1, 3, size["height"], size["width"])
+    present_names = [f"present.{i}.{kv}" for i in range(n_layers) for kv in ("key", "value")]
+    past_names = [f"past.{i}.{kv}" for i in range(n_layers) for kv in ("key", "value")]
+    kv_axes = {0: "batch", 2: "past_seq"}
+
+    with torch.inference_mode():
+        log.info("Export vision encoder ...")
+        torch.onnx.export(_Vision(), (pixel_values,), out_dir / VISION_FILE,
+                          input_names=["pixel_values"], output_names=["image_embeds"],
+                          dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+                          opset_version=ONNX_OPSET)
+        image_embeds = model.vision_model(pixel_values=pixel_values, return_dict=True).last_hidden_state
+        input_ids = torch.tensor([[model.decoder_input_ids]], dtype=torch.long)
+
+        log.info("Export text decoder ...")
+        torch.onnx.export(_Decoder(), (input_ids, image_embeds), out_dir / DECODER_FILE,
+                          input_names=["input_ids", "image_embeds"], output_names=["logits"] + present_names,
+                          dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "image_embeds": {0: "batch"},
+                                        "logits": {0: "batch"}, **{n: kv_axes for n in present_names}},
+                          opset_version=ONNX_OPSET)
+
+        log.info("Export text decoder with KV cache ...")
+        out = decoder(input_ids=input_ids, encoder_hidden_states=image_embeds, use_cache=True, return_dict=True)
+        past = _flat(out.past_key_values)
+        next_ids = out.logits[:, -1, :].argmax(-1, keepdim=True)
+        torch.onnx.export(_Decoder(), (next_ids, image_embeds, *past), out_dir / DECODER_PAST_FILE,
+                          input_names=["input_ids", "image_embeds"] + past_names,
+                          output_names=["logits"] + present_names,
+                          dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "image_embeds": {0: "batch"},
+                                        "logits": {0: "batch"}, **{n: kv_axes for n in past_names + present_names}},
+                          opset_version=ONNX_OPSET)
+
+    processor.image_processor.save_pretrained(out_dir)
+    processor.tokenizer.save_vocabulary(str(out_dir))
+    with open(out_dir / "blip_onnx.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "model": str(model_name_or_path),
+            "layers": n_layers,
+            "bos_token_id": model.decoder_input_ids,
+            "eos_token_id": model.config.text_config.sep_token_id,
+        }, f, indent=2)
+
+    if quantize:
+        quantize_onnx(out_dir)
+    log.info(f"✅ BLIP ONNX export → {out_dir}")
+    return out_dir
+
+
+def quantize_onnx(model_dir:Path = ONNX_MODEL_DIR):
+    """Dynamische int8 Quantisierung der exportierten Modelle (MatMul/Gemm Gewichte)."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    for name in (VISION_FILE, DECODER_FILE, DECODER_PAST_FILE):
+        quantize_dynamic(model_dir / name, _model_file(model_dir, name, True), weight_type=QuantType.QInt8)
+    log.info(f"✅ BLIP ONNX int8 → {model_dir}")
+
+
+###########################################################
+# Laufzeit: nur onnxruntime + numpy + PIL
+###########################################################
+class _WordPieceDecoder:
+    """Minimaler BERT-WordPiece Decoder (skip_special_tokens=True) über vocab.txt."""
+
+    def __init__(self, vocab_path:Path):
+        with open(vocab_path, encoding="utf-8") as f:
+            self.vocab = [line.rstrip("\n") for line in f]
+
+    def decode(self, ids) -> str:
+        tokens = [self.vocab[i] for i in ids if 0 <= i < len(self.vocab) and self.vocab[i] not in SPECIAL_TOKENS]
+        text = " ".join(tokens).replace(" ##", "")
+        # clean_up_tokenization_spaces wie in transformers
+        for before, after in ((" .", "."), (" ?", "?"), (" !", "!"), (" ,", ","), (" ' ", "'"),
+                              (" n't", "n't"), (" 'm", "'m"), (" 's", "'s"), (" 've", "'ve"), (" 're", "'re")):
+            text = text.replace(before, after)
+        return text.strip()
+
+
+class BlipOnnxCaptioner:
+    """
+    BLIP Captioning mit onnxruntime (CPUExecutionProvider), greedy wie BlipForConditionalGeneration.generate().
+    Der Decoder rechnet pro Schritt nur das neue Token, Keys/Values der vorherigen Tokens kommen aus dem KV-Cache.
+    """
+
+    def __init__(self, model_dir:Path = ONNX_MODEL_DIR, quantized:bool = False, num_threads:int = None):
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed (pip install onnxruntime).")
+        model_dir = Path(model_dir)
+        with open(model_dir / "blip_onnx.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(model_dir / "preprocessor_config.json", encoding="utf-8") as f:
+            pre = json.load(f)
+        self.bos_token_id:int = meta["bos_token_id"]
+        self.eos_token_id:int = meta["eos_token_id"]
+        self.n_layers:int = meta["layers"]
+        size = pre.get("size", {})
+        self.size = (size.get("width", 384), size.get("height", 384))
+        self.resample = pre.get("resample", Image.BICUBIC)
+        self.rescale = pre.get("rescale_factor", 1 / 255)
+        self.mean = np.array(pre["image_mean"], dtype=np.float32).reshape(3, 1, 1)
+        self.std = np.array(pre["image_std"], dtype=np.float32).reshape(3, 1, 1)
+        self.tokenizer = _WordPieceDecoder(model_dir / "vocab.txt")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        providers = ["CPUExecutionProvider"]
+        self.vision = ort.InferenceSession(str(_model_file(model_dir, VISION_FILE, quantized)), options, providers=providers)
+        self.decoder = ort.InferenceSession(str(_model_file(model_dir, DECODER_FILE, quantized)), options, providers=providers)
+        self.decoder_past = ort.InferenceSession(str(_model_file(model_dir, DECODER_PAST_FILE, quantized)), options,
+                                                 providers=providers)
+        self.past_names = [f"past.{i}.{kv}" for i in range(self.n_layers) for kv in ("key", "value")]
+        log.info(f"✅ BLIP ONNX loaded ({model_dir}, int8={quantized})")
+
+    def preprocess(self, image:Image.Image) -> np.ndarray:
+        image = image.convert("RGB").resize(self.size, resample=self.resample)
+        pixels = np.asarray(image, dtype=np.float32).transpose(2, 0, 1) * self.rescale
+        return ((pixels - self.mean) / self.std)[np.newaxis].astype(np.float32)
+
+    def caption(self, image:Image.Image, max_new_tokens:int = MAX_NEW_TOKENS) -> str:
+        return self.caption_pixels(self.preprocess(image), max_new_tokens)
+
+    # pixel_values aus preprocess(), z.B. schon im Prefetch-Thread berechnet
+    def caption_pixels(self, pixel_values:np.ndarray, max_new_tokens:int = MAX_NEW_TOKENS) -> str:
+        image_embeds = self.vision.run(None, {"pixel_values": pixel_values})[0]
+        input_ids = np.array([[self.bos_token_id]], dtype=np.int64)
+        logits, *past = self.decoder.run(None, {"input_ids": input_ids, "image_embeds": image_embeds})
+        tokens = []
+        for _ in range(max_new_tokens):
+            next_id = int(logits[0].argmax())
+            if next_id == self.eos_token_id:
+                break
+            tokens.append(next_id)
+            feeds = {"input_ids": np.array([[next_id]], dtype=np.int64), "image_embeds": image_embeds}
+            feeds.update(zip(self.past_names, past))
+            logits, *past = self.decoder_past.run(None, feeds)
+        return self.tokenizer.decode(tokens)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="BLIP ONNX export and test captioning")
+    sub = ap.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="export BLIP to ONNX (needs torch + transformers)")
+    exp.add_argument("--model", default=IMAGE_MODEL_NAME, help="HF model name or local snapshot folder")
+    exp.add_argument("--out", type=Path, default=ONNX_MODEL_DIR)
+    exp.add_argument("--quantize", action="store_true", help="additionally write int8 models")
+    exp.add_argument("--force", action="store_true", help="delete an existing export first")
+    cap = sub.add_parser("caption", help="caption images with the ONNX model")
+    cap.add_argument("images", nargs="+", type=Path)
+    cap.add_argument("--dir", type=Path, default=ONNX_MODEL_DIR)
+    cap.add_argument("--int8", action="store_true")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+
+    if args.command == "export":
+        if args.force and args.out.exists():
+            shutil.rmtree(args.out)
+        export_blip_onnx(args.model, args.out, quantize=args.quantize)
+    else:
+        captioner = BlipOnnxCaptioner(args.dir, quantized=args.int8)
+        for path in args.images:
+            print(f"{path}: {captioner.caption(Image.open(path))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+# own:
+from media_stats import STATS
+
+log = logging.getLogger(__name__)
+
+USER_AGENT = "AI MediaAnalyzer/1.0 (aimedia.icetoaster@xoxy.net)"
+# Bei diesen Status-Codes wird erneut versucht (Rate-Limit, Gateway/Backend überlastet)
+RETRY_STATUS = (429, 502, 503, 504)
+MAX_RETRIES = 4
+# Obergrenze für eine einzelne Wartezeit, auch wenn Retry-After mehr verlangt
+MAX_BACKOFF_S = 60.0
+POOL_SIZE = 4
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After Header: Sekunden ("120") oder HTTP-Datum ("Wed, 21 Oct 2026 07:28:00 GMT")."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+###########################################################
+# HttpClient: eine requests.Session je Dienst (Keep-Alive,
+# Connection-Pool statt TCP+TLS Handshake pro Aufruf).
+# 429/502/503/504 → warten (Retry-After oder exponentiell mit
+# Jitter) und erneut versuchen. Nach einem 429 wird der Abstand
+# zwischen zwei Requests vergrößert und bei Erfolg wieder halbiert.
+# Latenz pro Versuch als Stufe "http.<name>" in STATS.
+###########################################################
+class HttpClient:
+    def __init__(self, name: str, backoff: float = 1.0, max_retries: int = MAX_RETRIES,
+                 max_backoff: float = MAX_BACKOFF_S, pool_size: int = POOL_SIZE):
+        self.name = name
+        self.backoff = backoff
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0  # time.monotonic(), frühester Start des nächsten Requests
+        self.penalty = 0.0     # zusätzlicher Abstand nach 429, adaptiv
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _wait_for_slot(self, min_interval: float):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + max(min_interval, self.penalty)
+        if start > now:
+            time.sleep(start - now)
+
+    def _delay(self, attempt: int, response: requests.Response) -> float:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+
+    def request(self, method: str, url: str, min_interval: float = 0.0, **kwargs) -> requests.Response:
+        """
+        Wie session.request(), mit Wiederholung bei RETRY_STATUS.
+        Liefert die letzte Antwort (auch 429/5xx, wenn alle Versuche scheitern).
+        Verbindungsfehler und Timeouts werden nicht wiederholt (offline), sondern als
+        requests.RequestException weitergegeben.
+        min_interval: Mindestabstand zwischen zwei Requests (z.B. 1s für nominatim.openstreetmap.org).
+        """
+        attempt = 0
+        while True:
+            self._wait_for_slot(min_interval)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                STATS.record(f"http.{self.name}", time.perf_counter() - start, start=start, failed=True)
+                self.failures += 1
+                raise
+            STATS.record(f"http.{self.name}", time.perf_counter() - start, start=start,
+                         failed=response.status_code >= 400)
+            self.requests += 1
+            self._adapt(response)
+            if response.status_code not in RETRY_STATUS:
+                return response
+            self.failures += 1
+            if attempt >= self.max_retries:
+                log.warning(f"{self.name}: HTTP {response.status_code} after {attempt + 1} attempts, giving up")
+                return response
+            delay = self._delay(attempt, response)
+            log.info(f"{self.name}: HTTP {response.status_code}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            attempt += 1
+            self.retries += 1
+            STATS.gauge(f"http.{self.name}.retries", self.retries)
+            time.sleep(delay)
+
+    def _adapt(self, response: requests.Response):
+        status = response.status_code
+        with self._lock:
+            if status == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                base = self.backoff if retry_after is None else retry_after
+                self.penalty = min(self.max_backoff, max(base, self.penalty * 2))
+            elif status < 400 and self.penalty:
+                self.penalty = self.penalty / 2 if self.penalty > 0.1 else 0.0
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Zähler dieses Clients, die Latenzen (p50/p95/max) stehen in STATS.summary() unter http.<name>."""
+        return {"requests": self.requests, "retries": self.retries, "failures": self.failures,
+                "penalty_s": round(self.penalty, 3)}
+
+    def close(self):
+        self.session.close()
+
+
+_clients: dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str, **kwargs) -> HttpClient:
+    """Gemeinsamer Client je Dienst ("overpass", "nominatim"), wird beim ersten Aufruf angelegt."""
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = HttpClient(name, **kwargs)
+        return client
+
+
+def client_stats() -> dict[str, dict]:
+    with _clients_lock:
+        return {name: client.stats() for name, client in _clients.items()}
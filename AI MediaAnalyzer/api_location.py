@@ -1,18 +1,35 @@
+import os
 import requests
+import time
 from math import radians, sin, cos, sqrt, atan2
 import logging
-from geopy import Nominatim
 from typing import Dict, Any, List, Optional, Tuple
 from collections import defaultdict
 
-from urllib3.exceptions import NameResolutionError
+# own:
+from api_http import get_client
+from media_stats import stage
+from media_geo import reverse_geocode_offline
 
 log = logging.getLogger(__name__)
 
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+# Server über Umgebungsvariablen änderbar, z.B. für einen lokalen Mirror, eine eigene Instanz
+# oder den Stub der Benchmarks
+OVERPASS_URL = os.environ.get("AIMEDIA_OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+NOMINATIM_PUBLIC = "nominatim.openstreetmap.org"
+NOMINATIM_DOMAIN = os.environ.get("AIMEDIA_NOMINATIM_DOMAIN", NOMINATIM_PUBLIC)
+NOMINATIM_SCHEME = os.environ.get("AIMEDIA_NOMINATIM_SCHEME", "https")
+# Usage Policy von nominatim.openstreetmap.org: höchstens 1 Request pro Sekunde
+NOMINATIM_MIN_INTERVAL_S = 1.0
+# Adressen kommen zuerst aus dem Offline-Geocoder (media_geo, GeoNames/Grenzen).
+# NOMINATIM_REFINE: zusätzlich Nominatim fragen (Straße, Hausnummer), wenn online.
+NOMINATIM_REFINE = False
+# Nach einem Verbindungsfehler so lange nicht mehr online versuchen (kein Timeout pro Foto)
+OFFLINE_RETRY_S = 300
+_offline_until = 0.0
 # Reihenfolge der Namensauflösung
 NAME_KEYS = ["name:de", "name:en", "name:fr", "name:es", "name", "name:ar"]
-overpass_wait = 2 # wait 2 seconds. Can be adapted times 2 when 429 error.
+overpass_wait = 2 # erste Wartezeit nach 429/504, verdoppelt sich je Versuch (bzw. Retry-After)
 # Priorität der Hauptkategorien (hoch → niedrig)
 CATEGORY_PRIORITY = [
     "historic",
@@ -170,21 +187,17 @@ def get_pois_nearby(
     """
 
     try:
-        response = requests.post(
-            OVERPASS_URL,
-            data=query,
-            headers={"User-Agent": "AI MediaAnalyzer/1.0 (aimedia.icetoaster@xoxy.net)"},
-            timeout=timeout + 5,
-        )
+        with stage("overpass"):
+            response = get_client("overpass", backoff=overpass_wait).post(OVERPASS_URL, data=query, timeout=timeout + 5)
     except requests.RequestException as exc:
         log.error("Point of Interests retrieval failed. Are you offline?: %s", exc)
         return []
 
     if response.status_code == 429:
-        log.error("Overpass rate limit (429): %s", response.text)
+        log.error("Overpass rate limit (429), retries exhausted: %s", response.text)
         return []
     elif response.status_code in (502, 503, 504):
-        log.error("Overpass backend error (%s): %s", response.status_code, response.text)
+        log.error("Overpass backend error (%s), retries exhausted: %s", response.status_code, response.text)
         return []
     elif response.status_code != 200:
         log.error(
@@ -291,21 +304,17 @@ def get_pois_nearby2(
     """
 
     try:
-        response = requests.post(
-            OVERPASS_URL,
-            data=query,
-            headers={"User-Agent": "AI MediaAnalyzer/1.0 (aimedia.icetoaster@xoxy.net)"},
-            timeout=timeout + 5,
-        )
+        with stage("overpass"):
+            response = get_client("overpass", backoff=overpass_wait).post(OVERPASS_URL, data=query, timeout=timeout + 5)
     except requests.RequestException as exc:
         log.error("Point of Interests retrieval failed. Are you offline?: %s", exc)
         return []
 
     if response.status_code == 429:
-        log.error("Overpass rate limit (429): %s", response.text)
+        log.error("Overpass rate limit (429), retries exhausted: %s", response.text)
         return []
     elif response.status_code in (502, 503, 504):
-        log.error("Overpass backend error (%s): %s", response.status_code, response.text)
+        log.error("Overpass backend error (%s), retries exhausted: %s", response.status_code, response.text)
         return []
     elif response.status_code != 200:
         log.error(
@@ -323,7 +332,7 @@ def get_pois_nearby2(
     collected: List[Dict[str, Any]] = []
 
     for el in elements:
-        coords = get_element_coords(el)
+        coords = extract_coords(el)
         if not coords:
             continue
 
@@ -418,21 +427,39 @@ def test_pois(lat: float, lon: float, radius=500, top_n=15, max_per_category=3)
 # {'road': 'Circuit 2', 'town': 'Tremblay-en-France', 'municipality': 'Le Raincy', 'county': 'Seine-Saint-Denis', 'ISO3166-2-lvl6': 'FR-93', 'state': 'Île-de-France', 'ISO3166-2-lvl4': 'FR-IDF', 'region': 'Metropolitanes Frankreich', 'postcode': '93290', 'country': 'Frankreich', 'country_code': 'fr'}
 # {'road': 'Rue de la Grande Borne', 'village': 'Le Mesnil-Amelot', 'municipality': 'Meaux', 'county': 'Seine-et-Marne', 'ISO3166-2-lvl6': 'FR-77', 'region': 'Metropolitanes Frankreich', 'postcode': '77990', 'country': 'Frankreich', 'country_code': 'fr'}
 ###########################################################
-def reverse_geocode(lat:float, lon:float) -> str:
-    """Wandelt Koordinaten in einen Ortsnamen um (Nominatim - uses OpenStreetMap)."""
+def reverse_geocode(lat:float, lon:float, refine:bool = None) -> str:
+    """
+    Wandelt Koordinaten in einen Ortsnamen um: offline (media_geo) "Ort, Region, Land",
+    mit refine (Default NOMINATIM_REFINE) genauer über Nominatim (uses OpenStreetMap), falls online.
+    """
+    global _offline_until
     if not lat or not lon:
         return ""
+    with stage("geocode.offline"):
+        offline = reverse_geocode_offline(lat, lon)
+    refine = NOMINATIM_REFINE if refine is None else refine
+    if offline and not refine:
+        return offline
+    if time.monotonic() < _offline_until:
+        return offline or "<error>"
 
     try:
-        geolocator = Nominatim(user_agent="AI MediaAnalyzer/v0.8")
-        location = geolocator.reverse((lat, lon), language="en", timeout=10)
-        loc:str = "<None>"
-        if location and location.address:
-            #log.info(f"{}")
-            log.info(f"name={location.raw.get("name")}")
-            log.info(f"display_name={location.raw.get("display_name")}")
-            loc =  location.raw.get("name") or location.raw.get("display_name")
-            parts = location.raw.get("address", {})
+        min_interval = NOMINATIM_MIN_INTERVAL_S if NOMINATIM_DOMAIN == NOMINATIM_PUBLIC else 0.0
+        with stage("nominatim"):
+            response = get_client("nominatim").get(
+                f"{NOMINATIM_SCHEME}://{NOMINATIM_DOMAIN}/reverse",
+                params={"lat": lat, "lon": lon, "format": "json", "addressdetails": 1, "accept-language": "en"},
+                timeout=10, min_interval=min_interval)
+        if response.status_code != 200:
+            log.info(f"Nominatim status {response.status_code}, using offline address.")
+            return offline or "<error>"
+        raw = response.json()
+        loc:str = offline or "<None>"
+        if raw and raw.get("display_name"):
+            log.info(f"name={raw.get('name')}")
+            log.info(f"display_name={raw.get('display_name')}")
+            loc =  raw.get("name") or raw.get("display_name")
+            parts = raw.get("address", {})
             for adr_type in {"country_code", "house_number", "road", "street", "postcode", "city", "town", "village", "hamlet", "municipality", "region", "state", "country"}:
                 if parts.get(adr_type):
                     if loc:
@@ -441,14 +468,10 @@ def reverse_geocode(lat:float, lon:float) -> str:
 
             log.info(f"reverse_geocode(): Address={loc}")
         return loc
-    except NameResolutionError:
-        log.info(f"Reverse Address resolution by lat,lon can only be done online. Cannot resolve URL.")
-    except urllib3.exceptions.MaxRetryError:
-        log.info(f"Reverse Address resolution by lat,lon can only be done online. Retry max exceeded.")
-    except requests.exceptions.ConnectionError:
-        log.info(f"Reverse Address resolution by lat,lon can only be done online. Connection Error.")
-    except eopy.exc.GeocoderUnavailable:
+    except (requests.ConnectionError, requests.Timeout):
         log.info(f"Reverse Address resolution by lat,lon can only be done online. Nominatim unavailable.")
     except Exception:
         log.exception("reverse_geocode() Exception Nominatim")
-    return "<error>"
+        return offline or "<error>"
+    _offline_until = time.monotonic() + OFFLINE_RETRY_S
+    return offline or "<error>"
@@ -0,0 +1,95 @@
+# Benchmark: Bildbeschreibung (BLIP) und Transkription (Whisper tiny).
+# Braucht torch, transformers, whisper und die Modelle im lokalen Cache,
+# sonst werden die Benchmarks übersprungen (asv: NotImplementedError im setup).
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fixtures import make_jpeg, make_mp4, make_wav
+
+
+def _require(*modules):
+    for name in modules:
+        try:
+            __import__(name)
+        except ImportError:
+            raise NotImplementedError(f"{name} is not installed")
+
+
+class TimeCaption:
+    timeout = 600
+    images = 5
+
+    def setup(self):
+        _require("torch", "transformers")
+        from ai_image import AIImage
+        self.ai_image = AIImage()
+        if self.ai_image.image_model is None:
+            raise NotImplementedError("BLIP model not available")
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [make_jpeg(self.tmp_dir / f"IMG_{i:04d}.jpg", size=(1024, 768), seed=i)
+                      for i in range(self.images)]
+        self.video = make_mp4(self.tmp_dir / "VID_0000.mp4", seconds=20)
+        self.ai_image.describe_image(self.paths[0])  # Warm-up
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_describe_image(self):
+        for path in self.paths:
+            self.ai_image.describe_image(path)
+
+    def time_describe_video(self):
+        self.ai_image.describe_video_by_frames(str(self.video), interval=5)
+
+
+class TimeTranscribe:
+    timeout = 600
+    params = [5.0, 30.0]
+    param_names = ["seconds"]
+
+    def setup(self, seconds):
+        _require("torch", "whisper")
+        from ai_audio import AIAudio
+        self.ai_audio = AIAudio(audio_model_size="tiny")
+        if self.ai_audio.audio_model is None:
+            raise NotImplementedError("Whisper tiny not available")
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.path = make_wav(self.tmp_dir / "REC_0000.wav", seconds=seconds)
+
+    def teardown(self, seconds):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_transcribe_audio(self, seconds):
+        self.ai_audio.transcribe_audio(self.path)
+
+
+class TimeTranscribeBatch:
+    """16 kurze Clips: einzeln (wie bisher) vs. gebündelt (AIAudio.transcribe_batch)."""
+    timeout = 900
+    clips = 16
+
+    def setup(self):
+        _require("torch", "whisper")
+        from ai_audio import AIAudio
+        from media_audio_decode import decode_audio
+        self.ai_audio = AIAudio(audio_model_size="tiny")
+        if self.ai_audio.audio_model is None:
+            raise NotImplementedError("Whisper tiny not available")
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        paths = [make_wav(self.tmp_dir / f"MEMO_{i:04d}.wav", seconds=3.0 + i % 5) for i in range(self.clips)]
+        self.items = [(path, decode_audio(path).samples) for path in paths]
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_sequential(self):
+        for path, samples in self.items:
+            self.ai_audio.transcribe_audio_segments(path, audio=samples)
+
+    def time_batched(self):
+        size = self.ai_audio.BATCH_SIZE
+        for start in range(0, len(self.items), size):
+            self.ai_audio.transcribe_batch(self.items[start:start + size])
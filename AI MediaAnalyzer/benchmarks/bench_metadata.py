@@ -0,0 +1,196 @@
+# Benchmark: Metadaten lesen (EXIF/GPS, Video ISO6709, Audio) und POI/Adresse über die lokalen Stubs.
+# asv-Stil, direkt startbar über run_benchmarks.py
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import media_tools
+from fixtures import make_jpeg, make_mp4, make_mp3_with_cover, make_wav, make_media_folder, DEFAULT_LAT, DEFAULT_LON
+from stub_servers import StubGeoServer
+
+
+class TimeImageMetadata:
+    """EXIF Datum + GPS aus JPEGs (Header-Leser, ohne ExifTool)."""
+    params = [50]
+    param_names = ["files"]
+
+    def setup(self, files):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [make_jpeg(self.tmp_dir / f"IMG_{i:04d}.jpg", seed=i) for i in range(files)]
+
+    def teardown(self, files):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_read_image_header_cold(self, files):
+        media_tools._read_image_header_cached.cache_clear()
+        for path in self.paths:
+            media_tools.read_image_header(path)
+
+    def time_read_image_header_cached(self, files):
+        for path in self.paths:
+            media_tools.read_image_header(path)
+
+    def time_meta_data_bundle(self, files):
+        media_tools._read_image_header_cached.cache_clear()
+        for path in self.paths:
+            media_tools.get_meta_data_bundle(path, {})
+
+
+class TimeVideoMetadata:
+    """Dauer (moviepy) und Datum/GPS (ffprobe) kurzer MP4s."""
+    params = [3]
+    param_names = ["files"]
+
+    def setup(self, files):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [make_mp4(self.tmp_dir / f"VID_{i:04d}.mp4") for i in range(files)]
+
+    def teardown(self, files):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_meta_data_bundle(self, files):
+        for path in self.paths:
+            media_tools.get_meta_data_bundle(path, {})
+
+
+class TimeAudioMetadata:
+    """Dauer und Datum von MP3 (mit Cover) und WAV."""
+    params = [10]
+    param_names = ["files"]
+
+    def setup(self, files):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = []
+        for i in range(files):
+            self.paths.append(make_mp3_with_cover(self.tmp_dir / f"AUD_{i:04d}.mp3"))
+            self.paths.append(make_wav(self.tmp_dir / f"REC_{i:04d}.wav"))
+
+    def teardown(self, files):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_meta_data_bundle(self, files):
+        for path in self.paths:
+            media_tools.get_meta_data_bundle(path, {})
+
+
+
+class TimeExifToolMetadata:
+    """AI Tags und Datum über einen ExifTool-Prozess (nur mit installiertem exiftool)."""
+    params = [10]
+    param_names = ["files"]
+
+    def setup(self, files):
+        if shutil.which("exiftool") is None:
+            raise NotImplementedError("exiftool not found")
+        from exiftool import ExifToolHelper
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.folder = make_media_folder(self.tmp_dir, images=files, videos=1, audios=files // 2)
+        self.paths = [path for paths in self.folder.values() for path in paths]
+        self.et = ExifToolHelper(encoding="utf-8")
+        self.et.run()
+
+    def teardown(self, files):
+        self.et.terminate()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_read_ai_metadata(self, files):
+        media_tools._read_image_header_cached.cache_clear()
+        for path in self.paths:
+            media_tools.read_ai_metadata(path, self.et)
+
+    def time_meta_data_bundle(self, files):
+        media_tools._read_image_header_cached.cache_clear()
+        for path in self.paths:
+            media_tools.get_meta_data_bundle(path, {}, et_instance=self.et)
+
+
+class TimeGeoLookup:
+    """POI-Suche (Overpass) und Adresse (Nominatim, refine=True) gegen lokale Stubs mit fester Latenz."""
+    params = [0.0, 0.05]
+    param_names = ["latency_s"]
+    lookups = 10
+
+    def setup(self, latency_s):
+        import api_location
+        self.api = api_location
+        self.api._offline_until = 0.0
+        self.stub = StubGeoServer(latency=latency_s).__enter__()
+
+    def teardown(self, latency_s):
+        self.stub.__exit__(None, None, None)
+
+    def time_get_pois_nearby(self, latency_s):
+        for i in range(self.lookups):
+            self.api.get_pois_nearby(DEFAULT_LAT + i * 1e-3, DEFAULT_LON, radius=500, top_n=15, max_per_category=3)
+
+    def time_reverse_geocode(self, latency_s):
+        for i in range(self.lookups):
+            self.api.reverse_geocode(DEFAULT_LAT + i * 1e-3, DEFAULT_LON, refine=True)
+
+
+class TimeOfflineGeocode:
+    """Offline Reverse Geocoding (media_geo) über einen synthetischen GeoNames-Dump mit places Orten."""
+    params = [10000, 200000]
+    param_names = ["places"]
+    lookups = 1000
+
+    def setup(self, places):
+        import random
+        import media_geo
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        rng = random.Random(places)
+        with open(self.tmp_dir / "cities.txt", "w", encoding="utf-8") as f:
+            for i in range(places):
+                f.write(f"{i}\tOrt {i}\t\t\t{rng.uniform(-60, 70):.5f}\t{rng.uniform(-180, 180):.5f}\tP\tPPL\tDE\t\t02\n")
+        self.cities = self.tmp_dir / "cities.txt"
+        media_geo.import_geonames(self.cities, root=self.tmp_dir / "geo")
+        self.geocoder = media_geo.OfflineGeocoder(self.tmp_dir / "geo")
+        self.geocoder.lookup(DEFAULT_LAT, DEFAULT_LON)  # Index laden
+        self.points = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(self.lookups)]
+
+    def teardown(self, places):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_import(self, places):
+        import media_geo
+        media_geo.import_geonames(self.cities, root=self.tmp_dir / "geo2")
+
+    def time_lookup(self, places):
+        for lat, lon in self.points:
+            self.geocoder.lookup(lat, lon)
+
+
+class TimeGeoRetry:
+    """Overpass/Nominatim über api_http gegen einen Stub, der jeden 2. Request mit 429 bzw. 504 beantwortet."""
+    params = [429, 504]
+    param_names = ["status"]
+    lookups = 10
+
+    def setup(self, status):
+        import api_location
+        self.api = api_location
+        self.api._offline_until = 0.0
+        self.stub = StubGeoServer(error_every=2, error_status=status, retry_after=0).__enter__()
+
+    def teardown(self, status):
+        self.stub.__exit__(None, None, None)
+
+    def time_get_pois_nearby(self, status):
+        for i in range(self.lookups):
+            assert self.api.get_pois_nearby(DEFAULT_LAT + i * 1e-3, DEFAULT_LON)
+
+    def time_reverse_geocode(self, status):
+        for i in range(self.lookups):
+            self.api.reverse_geocode(DEFAULT_LAT + i * 1e-3, DEFAULT_LON, refine=True)
+
+    def track_requests_per_lookup(self, status):
+        start = self.stub.requests
+        self.time_get_pois_nearby(status)
+        return (self.stub.requests - start) / self.lookups
+
+    def track_connections_per_lookup(self, status):
+        start = self.stub.connections
+        self.time_get_pois_nearby(status)
+        return (self.stub.connections - start) / self.lookups
@@ -0,0 +1,58 @@
+# Benchmark: Bytes, die write_mp3_metadata() pro getaggter MP3 schreibt.
+# asv-Stil (track_* liefert den Messwert), direkt startbar:
+#   python benchmarks/bench_mp3_tags.py
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import media_tools
+from fixtures import make_mp3, make_transcript, bytes_written
+
+
+class TrackMP3BytesWritten:
+    """10 Minuten Podcast (~9.6 MB), Transkripte unterschiedlicher Länge."""
+    params = [1_000, 20_000]
+    param_names = ["transcript_chars"]
+    unit = "bytes"
+
+    def setup(self, transcript_chars):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.path = make_mp3(self.tmp_dir / "podcast.mp3", seconds=600)
+        self.transcript = make_transcript(transcript_chars)
+
+    def teardown(self, transcript_chars):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def track_first_write(self, transcript_chars):
+        return bytes_written(
+            lambda: media_tools.write_mp3_metadata(self.path, "Cover", self.transcript), self.path)
+
+    def track_update_same(self, transcript_chars):
+        media_tools.write_mp3_metadata(self.path, "Cover", self.transcript)
+        return bytes_written(
+            lambda: media_tools.write_mp3_metadata(self.path, "Cover", self.transcript), self.path)
+
+    def track_update_longer(self, transcript_chars):
+        media_tools.write_mp3_metadata(self.path, "Cover", self.transcript)
+        longer = self.transcript + " " + make_transcript(transcript_chars // 10)
+        return bytes_written(
+            lambda: media_tools.write_mp3_metadata(self.path, "Cover", longer), self.path)
+
+    def track_delete(self, transcript_chars):
+        media_tools.write_mp3_metadata(self.path, "Cover", self.transcript)
+        return bytes_written(lambda: media_tools.delete_mp3_metadata(self.path), self.path)
+
+
+if __name__ == "__main__":
+    bench = TrackMP3BytesWritten()
+    for chars in bench.params:
+        for name in ("track_first_write", "track_update_same", "track_update_longer", "track_delete"):
+            bench.setup(chars)
+            try:
+                size = (bench.path.stat().st_size)
+                value = getattr(bench, name)(chars)
+                print(f"{name:22s} transcript={chars:6d}  {value:10d} bytes  (file {size} bytes)")
+            finally:
+                bench.teardown(chars)
@@ -0,0 +1,47 @@
+# Benchmark: Laden der Bilder für BLIP (volle Auflösung vs. Image.draft) und Prefetcher.
+# time_prefetched simuliert ein Modell mit fester Rechenzeit pro Bild: ideal ist images x MODEL_SECONDS.
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from media_prefetch import Prefetcher, load_image_for_model
+from fixtures import make_jpeg
+
+MODEL_SECONDS = 0.05
+
+
+class TimeImageLoad:
+    params = [(1600, 1200), (4000, 3000)]
+    param_names = ["image_size"]
+    images = 10
+
+    def setup(self, image_size):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [make_jpeg(self.tmp_dir / f"IMG_{i:04d}.jpg", size=image_size, orientation=6, seed=i)
+                      for i in range(self.images)]
+
+    def teardown(self, image_size):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_full_decode(self, image_size):
+        for path in self.paths:
+            Image.open(path).convert("RGB")
+
+    def time_draft_decode(self, image_size):
+        for path in self.paths:
+            load_image_for_model(path)
+
+    def time_sequential(self, image_size):
+        for path in self.paths:
+            load_image_for_model(path)
+            time.sleep(MODEL_SECONDS)
+
+    def time_prefetched(self, image_size):
+        with Prefetcher(load_image_for_model, self.paths) as prefetch:
+            for path in self.paths:
+                prefetch.get(path)
+                time.sleep(MODEL_SECONDS)
@@ -0,0 +1,65 @@
+# Benchmark: RecordStore mit vielen Zeilen (MediaRecord mit __slots__, Lat/Lon/Length als float).
+# track_bytes_per_row misst mit tracemalloc den Speicher pro Zeile, time_* Einfügen, Sortieren und CSV-Export.
+# time_sort_*_cached: zweites Sortieren derselben Spalte (umgekehrt), die Reihenfolge ist gemerkt.
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import media_export
+from media_table import RecordStore
+
+
+def _rec(i: int) -> dict:
+    return {"File": f"DCIM/2024/IMG_{i:06d}.jpg", "Type": "image".capitalize(), "Date": "2024-05-01 12:00:00",
+            "Lat": f"{48.1 + i * 1e-6:.6f}", "Lon": f"{11.5 + i * 1e-6:.6f}", "Length": "",
+            "Address": "Marienplatz, München", "Landmark": "", "Persons": {"Anna", "Bob"},
+            "Image": "a dog sitting on a bench", "Audio": ""}
+
+
+def _fill(count: int) -> RecordStore:
+    store = RecordStore()
+    for i in range(count):
+        store.append(_rec(i))
+    return store
+
+
+class TimeRecordStore:
+    params = [10000, 100000]
+    unit = "bytes"
+
+    def setup(self, count):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.store = _fill(count)
+
+    def teardown(self, count):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_append(self, count):
+        _fill(count)
+
+    def time_sort_file(self, count):
+        self.store.update(0, Image="changed")  # Cache ungültig machen
+        self.store.sort("File")
+
+    def time_sort_lat(self, count):
+        self.store.update(0, Image="changed")
+        self.store.sort("Lat")
+
+    def time_sort_lat_cached(self, count):
+        self.store.sort("Lat")
+        self.store.sort("Lat", reverse=True)
+
+    def time_export_csv(self, count):
+        media_export.export_csv(self.store, str(self.tmp_dir / "out.csv"))
+
+    def track_bytes_per_row(self, count):
+        tracemalloc.start()
+        try:
+            store = _fill(count)
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return used // len(store)
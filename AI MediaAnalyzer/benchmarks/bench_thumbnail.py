@@ -0,0 +1,58 @@
+# Benchmark: Thumbnails für den Tooltip der Tabelle und MP3 Cover.
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import media_tools
+from fixtures import make_jpeg, make_mp4, make_mp3_with_cover
+
+
+class TimeThumbnails:
+    params = [(1600, 1200), (4000, 3000)]
+    param_names = ["image_size"]
+    images = 10
+
+    def setup(self, image_size):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        # Orientierung 6: das Bild wird zusätzlich gedreht
+        self.paths = [make_jpeg(self.tmp_dir / f"IMG_{i:04d}.jpg", size=image_size, orientation=6, seed=i)
+                      for i in range(self.images)]
+
+    def teardown(self, image_size):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_image_thumbnail(self, image_size):
+        for path in self.paths:
+            media_tools.make_image_thumbnail(path)
+
+
+class TimeVideoThumbnail:
+    def setup(self):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.path = make_mp4(self.tmp_dir / "VID_0000.mp4", seconds=10, size="1280x720")
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_video_thumbnail(self):
+        media_tools.make_video_thumbnail(self.path)
+
+
+class TimeMP3Cover:
+    files = 10
+
+    def setup(self):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [make_mp3_with_cover(self.tmp_dir / f"AUD_{i:04d}.mp3") for i in range(self.files)]
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_extract_cover(self):
+        # extract_mp3_front_cover() legt "+cover.png" ab, gemessen wird das erste Auslesen
+        for cover in self.tmp_dir.glob("*+cover.png"):
+            cover.unlink()
+        for path in self.paths:
+            media_tools.extract_mp3_front_cover(str(path))
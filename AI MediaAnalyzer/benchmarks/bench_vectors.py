@@ -0,0 +1,59 @@
+# Benchmark: Top-k Suche und Duplikat-Gruppen im VectorStore (float16 memmap, nur numpy).
+# Zufällige, normierte 512-dim Vektoren wie von CLIP ViT-B/32, mit einigen eingestreuten Beinahe-Duplikaten.
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from media_vectors import VectorStore
+
+DIM = 512
+
+
+def _fill(store: VectorStore, count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, 10000):
+        n = min(10000, count - start)
+        vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+        vectors[1::500] = vectors[0::500][:len(vectors[1::500])] + 0.05 * rng.standard_normal((len(vectors[1::500]), DIM))
+        store.add_many([f"/bench/IMG_{start + i:06d}.jpg" for i in range(n)], vectors)
+
+
+class TimeVectorSearch:
+    params = [10000, 100000]
+    timeout = 300
+
+    def setup(self, count):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.store = VectorStore("bench", DIM, root=self.tmp_dir)
+        _fill(self.store, count)
+        self.query = np.random.default_rng(1).standard_normal(DIM).astype(np.float32)
+        self.store.search(self.query, 20)  # Seiten der memmap laden
+
+    def teardown(self, count):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_search_top20(self, count):
+        self.store.search(self.query, 20)
+
+
+class TimeDuplicates:
+    params = [5000, 20000]
+    timeout = 600
+    unit = "groups"
+
+    def setup(self, count):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.store = VectorStore("bench", DIM, root=self.tmp_dir)
+        _fill(self.store, count)
+
+    def teardown(self, count):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_duplicate_clusters(self, count):
+        self.store.duplicate_clusters()
+
+    def track_duplicate_clusters(self, count):
+        return len(self.store.duplicate_clusters())
@@ -0,0 +1,49 @@
+# Benchmark: Coordinator + lokale Worker über Loopback (media_worker.py).
+# Die Analyse wird mit einer festen Rechenzeit pro Datei simuliert: ideal ist files x WORK_SECONDS / workers,
+# der Rest ist Protokoll-Overhead (Lease, Ergebnis hochladen, SQLite).
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from media_jobs import JobQueue
+from media_worker import Coordinator, Worker
+
+WORK_SECONDS = 0.02
+
+
+def _analyze(path, kind):
+    time.sleep(WORK_SECONDS)
+    return {"Image": f"caption of {path.name}", "Persons": ""}
+
+
+class TimeDistributed:
+    params = [1, 2, 4]
+    param_names = ["workers"]
+    files = 100
+
+    def setup(self, workers):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [self.tmp_dir / f"IMG_{i:04d}.jpg" for i in range(self.files)]
+        for path in self.paths:
+            path.write_bytes(b"\xff\xd8\xff\xd9")
+
+    def teardown(self, workers):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_process_all(self, workers):
+        queue = JobQueue("bench", db_path=self.tmp_dir / f"jobs-{time.time_ns()}.sqlite")
+        with Coordinator(queue, port=0) as coordinator:
+            for path in self.paths:
+                coordinator.add(path)
+            queue.close()
+            clients = [Worker(coordinator.url, _analyze, name=f"bench-{i}", wait=1.0) for i in range(workers)]
+            threads = [threading.Thread(target=client.run) for client in clients]
+            for thread in threads:
+                thread.start()
+            coordinator.wait(poll_s=0.05)
+            for thread in threads:
+                thread.join()
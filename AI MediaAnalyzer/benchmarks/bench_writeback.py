@@ -0,0 +1,57 @@
+# Benchmark: AI Tags zurück in die Dateien schreiben (ExifTool Bulk/Parallel, MP3 über mutagen).
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import media_tools
+from fixtures import make_jpeg, make_mp3_with_cover, make_transcript
+
+
+class TimeWriteBackImages:
+    """Address, Landmark und Caption in JPEGs (XMP/IPTC), nur mit installiertem exiftool."""
+    params = [50]
+    param_names = ["files"]
+    number = 1  # schreibt Dateien, jede Messung braucht frische Fixtures
+
+    def setup(self, files):
+        if shutil.which("exiftool") is None:
+            raise NotImplementedError("exiftool not found")
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.jobs = [{
+            "path": make_jpeg(self.tmp_dir / f"IMG_{i:04d}.jpg", size=(640, 480), seed=i),
+            "address": "Marienplatz, München", "landmark": "Mariensäule – 30 m",
+            "persons": "", "image2text": f"A picture of a square number {i}", "transcript": "",
+        } for i in range(files)]
+
+    def teardown(self, files):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_write_parallel(self, files):
+        media_tools.write_ai_metadata_parallel(self.jobs)
+
+    def time_delete_parallel(self, files):
+        media_tools.delete_ai_metadata_parallel([job["path"] for job in self.jobs])
+
+
+class TimeWriteBackMP3:
+    """Caption und Transkript in MP3s mit Cover (ID3 über mutagen)."""
+    params = [10]
+    param_names = ["files"]
+
+    def setup(self, files):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="aimedia_bench_"))
+        self.paths = [make_mp3_with_cover(self.tmp_dir / f"AUD_{i:04d}.mp3", seconds=30) for i in range(files)]
+        self.transcript = make_transcript(5_000)
+
+    def teardown(self, files):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def time_write_mp3_metadata(self, files):
+        for path in self.paths:
+            media_tools.write_mp3_metadata(path, "A cover with circles", self.transcript)
+
+    def time_delete_mp3_metadata(self, files):
+        for path in self.paths:
+            media_tools.delete_mp3_metadata(path)
@@ -0,0 +1,153 @@
+# Vergleich fp32 <-> CPU int8 Modus (AIImage/AIAudio mit cpu_optimized=True):
+# Laufzeit, RSS nach dem Laden und Qualitätsabweichung von Captions und Transkripten.
+# Jeder Modus läuft in einem eigenen Prozess, damit die RSS-Werte vergleichbar sind.
+#   python benchmarks/compare_cpu_modes.py                       # synthetische Fixtures
+#   python benchmarks/compare_cpu_modes.py --fixtures D:/testset  # eigene Bilder/Audios (+ optional <name>.txt als Referenz)
+import argparse
+import difflib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fixtures import make_jpeg, make_wav, rss_bytes
+
+IMAGE_EXT = {".jpg", ".jpeg", ".png"}
+AUDIO_EXT = {".wav", ".mp3", ".m4a", ".flac"}
+
+
+def make_fixture_set(folder: Path) -> Path:
+    for i in range(5):
+        make_jpeg(folder / f"IMG_{i:04d}.jpg", size=(1024, 768), seed=i)
+    for i in range(2):
+        make_wav(folder / f"REC_{i:04d}.wav", seconds=10, freq=300 + 100 * i)
+    return folder
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein-Distanz auf Wortebene / Anzahl Referenzwörter."""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, start=1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def caption_similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+
+###########################################################
+# Worker: ein Modus, Ergebnis als JSON auf stdout
+###########################################################
+def run_worker(mode: str, fixtures: Path, whisper_size: str, threads: int | None) -> dict:
+    cpu_optimized = mode == "int8"
+    rss_start = rss_bytes()
+    start = time.perf_counter()
+    from ai_image import AIImage
+    from ai_audio import AIAudio
+    ai_image = AIImage(cpu_optimized=cpu_optimized, num_threads=threads)
+    ai_audio = AIAudio(audio_model_size=whisper_size, cpu_optimized=cpu_optimized, num_threads=threads)
+    result = {"mode": mode, "load_s": time.perf_counter() - start,
+              "rss_start": rss_start, "rss_loaded": rss_bytes(), "captions": {}, "transcripts": {}}
+
+    files = sorted(fixtures.iterdir())
+    images = [f for f in files if f.suffix.lower() in IMAGE_EXT]
+    audios = [f for f in files if f.suffix.lower() in AUDIO_EXT]
+    if images:
+        ai_image.describe_image(images[0])  # Warm-up
+    start = time.perf_counter()
+    for path in images:
+        result["captions"][path.name] = ai_image.describe_image(path)
+    result["caption_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    for path in audios:
+        result["transcripts"][path.name] = ai_audio.transcribe_audio(path)
+    result["transcribe_s"] = time.perf_counter() - start
+    result["rss_end"] = rss_bytes()
+    return result
+
+
+def _spawn(mode: str, args) -> dict:
+    cmd = [sys.executable, __file__, "--worker", mode, "--fixtures", str(args.fixtures), "--whisper", args.whisper]
+    if args.threads:
+        cmd += ["--threads", str(args.threads)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _mb(value) -> str:
+    return f"{value / 2**20:8.0f} MB" if value else "       ?"
+
+
+def report(fp32: dict, int8: dict, fixtures: Path) -> dict:
+    captions = [caption_similarity(fp32["captions"][k], int8["captions"].get(k, "")) for k in fp32["captions"]]
+    wers = [word_error_rate(fp32["transcripts"][k], int8["transcripts"].get(k, "")) for k in fp32["transcripts"]]
+    # Referenz-Transkripte <name>.txt neben den Audios, falls vorhanden
+    ref_wer = {}
+    for mode in (fp32, int8):
+        values = []
+        for name, text in mode["transcripts"].items():
+            ref = fixtures / (Path(name).stem + ".txt")
+            if ref.exists():
+                values.append(word_error_rate(ref.read_text(encoding="utf-8"), text))
+        if values:
+            ref_wer[mode["mode"]] = sum(values) / len(values)
+
+    summary = {
+        "caption_speedup": fp32["caption_s"] / int8["caption_s"] if int8["caption_s"] else None,
+        "transcribe_speedup": fp32["transcribe_s"] / int8["transcribe_s"] if int8["transcribe_s"] else None,
+        "rss_reduction_bytes": (fp32["rss_loaded"] or 0) - (int8["rss_loaded"] or 0),
+        "caption_similarity_mean": sum(captions) / len(captions) if captions else None,
+        "caption_exact_match": sum(c == 1.0 for c in captions) / len(captions) if captions else None,
+        "transcript_wer_vs_fp32": sum(wers) / len(wers) if wers else None,
+        "transcript_wer_vs_reference": ref_wer,
+    }
+    print(f"{'':22}{'fp32':>12}{'int8':>12}")
+    print(f"{'load':22}{fp32['load_s']:11.1f}s{int8['load_s']:11.1f}s")
+    print(f"{'captions':22}{fp32['caption_s']:11.1f}s{int8['caption_s']:11.1f}s")
+    print(f"{'transcripts':22}{fp32['transcribe_s']:11.1f}s{int8['transcribe_s']:11.1f}s")
+    print(f"{'RSS after load':22}{_mb(fp32['rss_loaded'])}{_mb(int8['rss_loaded'])}")
+    print(f"{'RSS at end':22}{_mb(fp32['rss_end'])}{_mb(int8['rss_end'])}")
+    for key, value in summary.items():
+        print(f"{key:28} {value}")
+    return summary
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Compare fp32 and CPU int8 inference")
+    ap.add_argument("--fixtures", type=Path, help="folder with images/audios (default: synthetic set)")
+    ap.add_argument("--whisper", default="tiny", help="Whisper model size")
+    ap.add_argument("--threads", type=int, help="torch threads for int8 mode (default: all cores)")
+    ap.add_argument("--json", help="write the full results to this file")
+    ap.add_argument("--worker", choices=("fp32", "int8"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.fixtures, args.whisper, args.threads)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="aimedia_bench_") as tmp:
+        if args.fixtures is None:
+            args.fixtures = make_fixture_set(Path(tmp))
+        fp32 = _spawn("fp32", args)
+        int8 = _spawn("int8", args)
+        summary = report(fp32, int8, args.fixtures)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"fp32": fp32, "int8": int8, "summary": summary}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
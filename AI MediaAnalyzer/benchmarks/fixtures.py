@@ -0,0 +1,240 @@
+# Synthetische Medien-Dateien für die Benchmarks (keine echten Fotos/Aufnahmen nötig).
+import io
+import math
+import os
+import shutil
+import struct
+import subprocess
+import wave
+from pathlib import Path
+from PIL import Image, ImageDraw
+from mutagen.id3 import ID3, APIC, ID3NoHeaderError
+
+try:  # optional: ffmpeg-Binary aus dem pip-Paket, falls keins im PATH liegt
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, Joint Stereo: 417 Byte pro Frame, 1152 Samples
+MP3_FRAME_HEADER = bytes((0xFF, 0xFB, 0x90, 0x64))
+MP3_FRAME_SIZE = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def make_mp3(path: Path, seconds: float = 60.0) -> Path:
+    """Schreibt eine stumme MP3 ohne ID3-Tag aus lauter leeren Frames."""
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_SIZE - len(MP3_FRAME_HEADER))
+    frames = int(seconds / MP3_FRAME_SECONDS) + 1
+    with open(path, "wb") as f:
+        f.write(frame * frames)
+    return Path(path)
+
+
+###########################################################
+# Bilder, Videos, Audios mit Metadaten wie aus Kamera/Handy
+###########################################################
+# Marienplatz München
+DEFAULT_LAT = 48.137154
+DEFAULT_LON = 11.576124
+DEFAULT_DATE = "2024:05:01 12:30:00"
+_TAG_EXIF_IFD = 0x8769
+_TAG_GPS_IFD = 0x8825
+_TAG_ORIENTATION = 0x0112
+_TAG_DATETIME_ORIGINAL = 0x9003
+
+
+def _dms(value: float) -> tuple:
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round(((value - degrees) * 60 - minutes) * 60, 4)
+    return (degrees, minutes, seconds)
+
+
+def _test_image(size: tuple, seed: int = 0) -> Image.Image:
+    """Farbverlauf mit ein paar Formen, damit JPEG nicht trivial komprimiert."""
+    width, height = size
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for k in range(8):
+        x = (seed * 37 + k * 101) % width
+        y = (seed * 53 + k * 67) % height
+        r = 10 + (k * 13) % (min(size) // 4)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=((k * 40) % 256, (seed * 20) % 256, 128))
+    return img
+
+
+def make_jpeg(path: Path, size: tuple = (1600, 1200), lat: float = DEFAULT_LAT, lon: float = DEFAULT_LON,
+              date: str = DEFAULT_DATE, orientation: int = 1, seed: int = 0) -> Path:
+    """JPEG mit EXIF Datum, Orientierung und GPS."""
+    exif = Image.Exif()
+    exif[_TAG_ORIENTATION] = orientation
+    exif[_TAG_EXIF_IFD] = {_TAG_DATETIME_ORIGINAL: date}
+    if lat is not None and lon is not None:
+        exif[_TAG_GPS_IFD] = {
+            1: "N" if lat >= 0 else "S", 2: _dms(lat),
+            3: "E" if lon >= 0 else "W", 4: _dms(lon),
+        }
+    _test_image(size, seed).save(path, "JPEG", quality=90, exif=exif)
+    return Path(path)
+
+
+def make_wav(path: Path, seconds: float = 5.0, rate: int = 16000, freq: float = 440.0) -> Path:
+    """Mono 16 bit Sinuston."""
+    frames = int(seconds * rate)
+    samples = (int(12000 * math.sin(2 * math.pi * freq * i / rate)) for i in range(frames))
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"".join(struct.pack("<h", s) for s in samples))
+    return Path(path)
+
+
+def ffmpeg_exe() -> str | None:
+    exe = shutil.which("ffmpeg")
+    if exe is None and imageio_ffmpeg is not None:
+        exe = imageio_ffmpeg.get_ffmpeg_exe()
+    return exe
+
+
+def _run_ffmpeg(*args):
+    exe = ffmpeg_exe()
+    if exe is None:
+        # asv-Konvention: NotImplementedError im setup() überspringt den Benchmark
+        raise NotImplementedError("ffmpeg not found")
+    subprocess.run([exe, "-hide_banner", "-loglevel", "error", "-y", *args], check=True)
+
+
+def _iso6709(lat: float, lon: float) -> str:
+    return f"{lat:+08.4f}{lon:+09.4f}/"
+
+
+def make_mp4(path: Path, seconds: float = 3.0, lat: float = DEFAULT_LAT, lon: float = DEFAULT_LON,
+             size: str = "320x240") -> Path:
+    """Kurzes H.264/AAC Video mit ISO6709 location (wie von iPhone/Android)."""
+    _run_ffmpeg(
+        "-f", "lavfi", "-i", f"testsrc=size={size}:rate=25:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest",
+        "-metadata", f"location={_iso6709(lat, lon)}",
+        "-metadata", "creation_time=2024-05-01T12:30:00Z",
+        "-movflags", "+use_metadata_tags",
+        str(path),
+    )
+    return Path(path)
+
+
+def cover_jpeg_bytes(size: tuple = (500, 500), seed: int = 1) -> bytes:
+    buf = io.BytesIO()
+    _test_image(size, seed).save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def add_cover(path: Path, data: bytes = None) -> Path:
+    """Front-Cover (APIC Typ 3) in den ID3 Tag schreiben."""
+    try:
+        tags = ID3(path)
+    except ID3NoHeaderError:
+        tags = ID3()
+    tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=data or cover_jpeg_bytes()))
+    tags.save(path)
+    return Path(path)
+
+
+def make_mp3_with_cover(path: Path, seconds: float = 5.0) -> Path:
+    """MP3 mit Cover. Mit ffmpeg (lame) ein Sinuston, sonst stumme Frames."""
+    try:
+        _run_ffmpeg("-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                    "-c:a", "libmp3lame", "-b:a", "128k", str(path))
+    except (NotImplementedError, subprocess.CalledProcessError):
+        make_mp3(path, seconds)
+    return add_cover(path)
+
+
+def make_media_folder(folder: Path, images: int = 20, videos: int = 2, audios: int = 2) -> dict:
+    """Ordner mit gemischten Medien. Videos/MP3 nur, wenn ffmpeg vorhanden ist."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    files = {"image": [], "video": [], "audio": []}
+    for i in range(images):
+        # leicht verschobene Positionen, damit Caches nicht alles abfangen
+        files["image"].append(make_jpeg(folder / f"IMG_{i:04d}.jpg", lat=DEFAULT_LAT + i * 1e-4,
+                                        lon=DEFAULT_LON + i * 1e-4, orientation=(1, 6, 3, 8)[i % 4], seed=i))
+    if ffmpeg_exe() is not None:
+        for i in range(videos):
+            files["video"].append(make_mp4(folder / f"VID_{i:04d}.mp4"))
+    for i in range(audios):
+        files["audio"].append(make_mp3_with_cover(folder / f"AUD_{i:04d}.mp3"))
+        files["audio"].append(make_wav(folder / f"REC_{i:04d}.wav"))
+    return files
+
+
+def make_transcript(chars: int) -> str:
+    words = ("heute", "haben", "wir", "über", "den", "Podcast", "gesprochen", "und", "Whisper", "getestet")
+    text = []
+    length = 0
+    i = 0
+    while length < chars:
+        word = words[i % len(words)]
+        text.append(word)
+        length += len(word) + 1
+        i += 1
+    return " ".join(text)[:chars]
+
+
+###########################################################
+# Misst die Bytes, die der Prozess während func() schreibt.
+# Linux: /proc/self/io (wchar). Sonst Schätzung über die Datei:
+# gleiche Audio-Position -> nur der Tag-Bereich, sonst die ganze Datei.
+###########################################################
+def _proc_write_bytes():
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _id3_size(path: Path) -> int:
+    with open(path, "rb") as f:
+        header = f.read(10)
+    if header[:3] != b"ID3":
+        return 0
+    size = 0
+    for b in header[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    return size + 10
+
+
+def bytes_written(func, path: Path) -> int:
+    before = _proc_write_bytes()
+    tag_before = _id3_size(path)
+    func()
+    after = _proc_write_bytes()
+    if before is not None and after is not None:
+        return after - before
+    tag_after = _id3_size(path)
+    return tag_after if tag_after == tag_before else os.path.getsize(path)
+
+
+###########################################################
+# Aktueller Speicherverbrauch (RSS) des Prozesses in Bytes.
+# Linux: /proc/self/status, sonst Peak-RSS über resource (nur Unix).
+###########################################################
+def rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return None
@@ -0,0 +1,135 @@
+# Einfacher Runner für die asv-artigen Benchmarks in diesem Ordner (ohne asv-Installation):
+#   python benchmarks/run_benchmarks.py                     # alle
+#   python benchmarks/run_benchmarks.py -k metadata -r 5    # nur bench_metadata, 5 Wiederholungen
+#   python benchmarks/run_benchmarks.py --json results.json
+# time_*: Median der Laufzeit in Sekunden, track_*: Rückgabewert (z.B. Bytes).
+# Ein NotImplementedError in setup() überspringt den Benchmark (fehlendes ffmpeg, exiftool, Modell).
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+
+def _param_sets(cls):
+    params = getattr(cls, "params", None)
+    if params is None:
+        return [()]
+    # asv: eine Liste = ein Parameter, Liste von Listen = Kreuzprodukt
+    if params and all(isinstance(p, list) for p in params):
+        return list(itertools.product(*params))
+    return [(p,) for p in params]
+
+
+def _call(obj, name, args):
+    method = getattr(obj, name, None)
+    if method is not None:
+        method(*args)
+
+
+def run_benchmark(cls, method_name: str, args: tuple, repeat: int) -> dict:
+    result = {"name": f"{cls.__module__}.{cls.__name__}.{method_name}", "params": list(args)}
+    obj = cls()
+    samples = []
+    # Benchmarks mit number = 1 verändern ihre Fixtures (z.B. Dateien schreiben) -> setup() vor jeder Messung
+    fresh_setup = getattr(cls, "number", None) == 1
+    rounds = repeat if method_name.startswith("time_") else 1
+    try:
+        _call(obj, "setup", args)
+    except NotImplementedError as e:
+        result["skipped"] = str(e) or "not implemented"
+        return result
+    except Exception as e:
+        logging.exception(f"{result['name']}{args} setup(): ")
+        result["error"] = repr(e)
+        return result
+    try:
+        for k in range(rounds):
+            if fresh_setup and k:
+                _call(obj, "teardown", args)
+                _call(obj, "setup", args)
+            start = time.perf_counter()
+            value = getattr(obj, method_name)(*args)
+            samples.append(time.perf_counter() - start if method_name.startswith("time_") else value)
+    except NotImplementedError as e:
+        result["skipped"] = str(e) or "not implemented"
+        return result
+    except Exception as e:
+        logging.exception(f"{result['name']}{args}: ")
+        result["error"] = repr(e)
+        return result
+    finally:
+        try:
+            _call(obj, "teardown", args)
+        except Exception:
+            logging.exception("teardown(): ")
+
+    if method_name.startswith("time_"):
+        result["unit"] = "s"
+        result["median"] = statistics.median(samples)
+        result["min"] = min(samples)
+    else:
+        result["unit"] = getattr(cls, "unit", "")
+        result["value"] = samples[0]
+    return result
+
+
+def discover(keyword: str = None):
+    for path in sorted(BENCH_DIR.glob("bench_*.py")):
+        if keyword and keyword not in path.stem:
+            continue
+        module = importlib.import_module(path.stem)
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            methods = [name for name in dir(cls) if name.startswith(("time_", "track_"))]
+            for method_name in sorted(methods):
+                yield cls, method_name
+
+
+def _format(result: dict) -> str:
+    params = ", ".join(str(p) for p in result["params"])
+    name = f"{result['name']}({params})"
+    if "skipped" in result:
+        return f"{name:<80} skipped: {result['skipped']}"
+    if "error" in result:
+        return f"{name:<80} ERROR: {result['error']}"
+    if result["unit"] == "s":
+        return f"{name:<80} {result['median'] * 1000:10.1f} ms  (min {result['min'] * 1000:.1f} ms)"
+    return f"{name:<80} {result['value']:>10} {result['unit']}"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="AI MediaAnalyzer benchmarks")
+    ap.add_argument("-k", "--keyword", help="only bench_<keyword>*.py modules")
+    ap.add_argument("-r", "--repeat", type=int, default=3, help="repetitions per time_* benchmark")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s | %(message)s")
+
+    results = []
+    for cls, method_name in discover(args.keyword):
+        for params in _param_sets(cls):
+            result = run_benchmark(cls, method_name, params, args.repeat)
+            results.append(result)
+            print(_format(result), flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "date": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# Lokale Stubs für Overpass und Nominatim: die Benchmarks laufen offline,
+# ohne Rate-Limits und mit reproduzierbaren Antwortzeiten.
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote_plus
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_AROUND = re.compile(r"around:(\d+),([-\d.]+),([-\d.]+)")
+
+# Feste POIs relativ zur angefragten Position (dlat, dlon, tags)
+STUB_POIS = [
+    (0.0003, 0.0002, {"historic": "monument", "name": "Mariensäule"}),
+    (0.0008, -0.0004, {"amenity": "place_of_worship", "name": "Frauenkirche"}),
+    (-0.0005, 0.0006, {"tourism": "museum", "name": "Stadtmuseum"}),
+    (0.0001, 0.0001, {"amenity": "cafe", "name": "Café am Platz"}),
+    (-0.0002, -0.0009, {"leisure": "park", "name": "Hofgarten"}),
+]
+
+
+def overpass_response(lat: float, lon: float) -> dict:
+    elements = []
+    for idx, (dlat, dlon, tags) in enumerate(STUB_POIS):
+        if idx % 2:
+            elements.append({"type": "way", "id": idx, "center": {"lat": lat + dlat, "lon": lon + dlon}, "tags": tags})
+        else:
+            elements.append({"type": "node", "id": idx, "lat": lat + dlat, "lon": lon + dlon, "tags": tags})
+    return {"version": 0.6, "generator": "aimedia-stub", "elements": elements}
+
+
+def nominatim_response(lat: float, lon: float) -> dict:
+    return {
+        "place_id": 1, "lat": str(lat), "lon": str(lon), "name": "Marienplatz",
+        "display_name": "Marienplatz, Altstadt, München, Bayern, 80331, Deutschland",
+        "address": {"road": "Marienplatz", "city": "München", "state": "Bayern", "postcode": "80331",
+                    "country": "Deutschland", "country_code": "de"},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "AIMediaStub/1.0"
+    protocol_version = "HTTP/1.1"  # Keep-Alive, wie die echten Server
+    disable_nagle_algorithm = True  # sonst 40ms Delayed-ACK pro Antwort (Header und Body getrennt)
+
+    def setup(self):
+        super().setup()
+        self.server.stub.connections += 1
+
+    def log_message(self, fmt, *args):  # keine Zeile pro Request auf stderr
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _injected_error(self) -> bool:
+        """Nächsten eingereihten Fehler (429/504, ...) senden, falls vorhanden."""
+        error = self.server.stub.next_error()
+        if error is None:
+            return False
+        status, retry_after = error
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        self._send_json({"error": f"injected {status}"}, status, headers)
+        return True
+
+    def do_POST(self):
+        self.server.stub.requests += 1
+        time.sleep(self.server.stub.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        query = unquote_plus(self.rfile.read(length).decode("utf-8", "replace"))
+        if self._injected_error():
+            return
+        match = _AROUND.search(query)
+        if not urlparse(self.path).path.endswith("/interpreter") or not match:
+            self._send_json({"error": "bad request"}, 400)
+            return
+        self._send_json(overpass_response(float(match.group(2)), float(match.group(3))))
+
+    def do_GET(self):
+        self.server.stub.requests += 1
+        time.sleep(self.server.stub.latency)
+        if self._injected_error():
+            return
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        if not url.path.startswith("/reverse") or "lat" not in qs or "lon" not in qs:
+            self._send_json({"error": "Unable to geocode"}, 400)
+            return
+        self._send_json(nominatim_response(float(qs["lat"][0]), float(qs["lon"][0])))
+
+
+class StubGeoServer:
+    """
+    Overpass (POST /api/interpreter) und Nominatim (GET /reverse) auf 127.0.0.1.
+    Als Context-Manager werden api_location.OVERPASS_URL und NOMINATIM_* auf den Stub umgebogen:
+        with StubGeoServer(latency=0.05):
+            api_location.get_pois_nearby(lat, lon)
+    inject(429, 504, retry_after=0) reiht Fehlerantworten für die nächsten Requests ein,
+    error_every=n antwortet auf jeden n-ten Request mit error_status (Rate-Limit/Gateway-Timeout testen).
+    """
+
+    def __init__(self, latency: float = 0.0, error_every: int = 0, error_status: int = 429, retry_after: int = None):
+        self.latency = latency
+        self.error_every = error_every
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.requests = 0
+        self.connections = 0
+        self.errors = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._saved = None
+
+    def inject(self, *statuses: int, retry_after: int = None):
+        with self._lock:
+            self._pending.extend((status, retry_after) for status in statuses)
+
+    def next_error(self) -> tuple[int, int | None] | None:
+        with self._lock:
+            if self._pending:
+                error = self._pending.pop(0)
+            elif self.error_every and self.requests % self.error_every == 0:
+                error = (self.error_status, self.retry_after)
+            else:
+                return None
+            self.errors += 1
+            return error
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="StubGeoServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        import api_location
+        self.start()
+        self._saved = (api_location.OVERPASS_URL, api_location.NOMINATIM_DOMAIN, api_location.NOMINATIM_SCHEME)
+        api_location.OVERPASS_URL = f"{self.url}/api/interpreter"
+        api_location.NOMINATIM_DOMAIN = self.host
+        api_location.NOMINATIM_SCHEME = "http"
+        return self
+
+    def __exit__(self, *exc):
+        import api_location
+        api_location.OVERPASS_URL, api_location.NOMINATIM_DOMAIN, api_location.NOMINATIM_SCHEME = self._saved
+        self.stop()
+        return False
@@ -0,0 +1,193 @@
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+import numpy as np
+# own:
+from media_jobs import Job, JobQueue
+from media_stats import STATS, stage
+from media_tools import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+#
+# Audio für Whisper vorab dekodieren (16 kHz, mono, float32), während das Modell noch das
+# vorige File transkribiert. whisper.transcribe(str(path)) startet ffmpeg sonst synchron im Modell-Thread.
+# Lange Aufnahmen (Hörbücher, Videos) landen in einer memory-mapped Scratch-Datei statt im RAM.
+#
+SAMPLE_RATE = 16000
+AUDIO_LOOKAHEAD = 2                 # so viele Jobs werden höchstens im Voraus dekodiert
+AUDIO_DECODE_WORKERS = 2
+MEMMAP_MIN_SECONDS = 10 * 60        # ab 10 min (38 MB float32) in die Scratch-Datei
+SCRATCH_DIR = CACHE_DIR / "audio-scratch"
+READ_BYTES = 1 << 20
+_ffmpeg_exe = None
+
+
+def ffmpeg_exe() -> str:
+    """ffmpeg aus dem PATH, sonst das von imageio-ffmpeg (kommt mit moviepy)."""
+    global _ffmpeg_exe
+    if _ffmpeg_exe is None:
+        _ffmpeg_exe = shutil.which("ffmpeg")
+        if _ffmpeg_exe is None:
+            import imageio_ffmpeg
+            _ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+    return _ffmpeg_exe
+
+
+class DecodedAudio:
+    """Samples (float32, 16 kHz mono) im RAM oder als memmap. release() löscht die Scratch-Datei."""
+
+    def __init__(self, samples: np.ndarray, scratch: Path = None):
+        self.samples = samples
+        self.scratch = scratch
+
+    @property
+    def seconds(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
+
+    def release(self):
+        self.samples = None
+        if self.scratch is not None:
+            try:
+                self.scratch.unlink(missing_ok=True)
+            except OSError as e:  # Windows: memmap noch offen, beim nächsten Aufräumen
+                log.debug(f"release({self.scratch}): {e}")
+            self.scratch = None
+
+
+def _int16_to_float32(raw: np.ndarray, out: np.ndarray):
+    for start in range(0, len(raw), READ_BYTES):
+        np.divide(raw[start:start + READ_BYTES], 32768.0, out=out[start:start + READ_BYTES], dtype=np.float32)
+
+
+def decode_audio(path, memmap_min_seconds: float = MEMMAP_MIN_SECONDS, scratch_dir: Path = SCRATCH_DIR) -> DecodedAudio:
+    """Wie whisper.load_audio(), aber gestreamt; lange Dateien als memmap in scratch_dir."""
+    cmd = [ffmpeg_exe(), "-nostdin", "-threads", "0", "-i", str(path),
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"]
+    memmap_min_bytes = int(memmap_min_seconds * SAMPLE_RATE) * 2
+    chunks, size = [], 0
+    raw_file = None
+    with stage("audio.decode"):
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        # stderr in eigenem Thread lesen, sonst blockiert ffmpeg bei vollem Pipe-Puffer
+        err = []
+        err_thread = threading.Thread(target=lambda: err.append(proc.stderr.read()), daemon=True)
+        err_thread.start()
+        try:
+            while chunk := proc.stdout.read(READ_BYTES):
+                size += len(chunk)
+                if raw_file is None and size >= memmap_min_bytes:
+                    scratch_dir.mkdir(parents=True, exist_ok=True)
+                    raw_file = tempfile.NamedTemporaryFile(dir=scratch_dir, suffix=".s16", delete=False)
+                    raw_file.write(b"".join(chunks))
+                    chunks = []
+                if raw_file is not None:
+                    raw_file.write(chunk)
+                else:
+                    chunks.append(chunk)
+            proc.wait()
+            err_thread.join()
+        finally:
+            if raw_file is not None:
+                raw_file.close()
+        if proc.returncode != 0:
+            if raw_file is not None:
+                os.unlink(raw_file.name)
+            message = b"".join(err).decode("utf-8", "replace").strip().splitlines()
+            raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {message[-1] if message else ''}")
+
+        if raw_file is None:
+            samples = np.frombuffer(b"".join(chunks), np.int16).astype(np.float32) / 32768.0
+            return DecodedAudio(samples)
+
+        # int16 -> float32 blockweise in eine zweite Scratch-Datei, die int16 Datei wird gelöscht
+        raw_path = Path(raw_file.name)
+        out_path = raw_path.with_suffix(".f32")
+        raw = np.memmap(raw_path, dtype=np.int16, mode="r")
+        out = np.memmap(out_path, dtype=np.float32, mode="w+", shape=raw.shape)
+        _int16_to_float32(raw, out)
+        out.flush()
+        del raw, out
+        raw_path.unlink(missing_ok=True)
+        # "c": copy-on-write, torch.from_numpy() braucht ein beschreibbares Array
+        samples = np.memmap(out_path, dtype=np.float32, mode="c")
+        log.info(f"🎧 {os.path.basename(str(path))}: {len(samples) / SAMPLE_RATE:.0f} s decoded to {out_path.name}")
+        return DecodedAudio(samples, out_path)
+
+
+def clear_scratch(scratch_dir: Path = SCRATCH_DIR):
+    """Reste abgebrochener Läufe löschen."""
+    if scratch_dir.is_dir():
+        for path in scratch_dir.iterdir():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class AudioDecodePool:
+    """
+    Dekodiert die nächsten AUDIO_LOOKAHEAD Jobs der Audio-Queue (JobQueue.peek) in einem Thread-Pool.
+        pool = AudioDecodePool(ai_audio.ai_queue)
+        job = ai_audio._get()
+        audio = pool.get(job)   # DecodedAudio, meist schon fertig
+        ...
+        audio.release()
+    """
+
+    def __init__(self, queue: JobQueue, lookahead: int = AUDIO_LOOKAHEAD, workers: int = AUDIO_DECODE_WORKERS,
+                 memmap_min_seconds: float = MEMMAP_MIN_SECONDS):
+        self._queue = queue
+        self._lookahead = max(0, lookahead)
+        self._memmap_min_seconds = memmap_min_seconds
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="audio-decode")
+        self.hits = 0
+        self.misses = 0
+        clear_scratch()
+
+    def _decode(self, path: str) -> DecodedAudio:
+        return decode_audio(path, self._memmap_min_seconds)
+
+    def prefetch(self):
+        """Dekodieren der nächsten pending Jobs starten, nicht mehr benötigte verwerfen."""
+        upcoming = self._queue.peek(self._lookahead) if self._lookahead else []
+        with self._lock:
+            wanted = {job.key: job.payload["path"] for job in upcoming}
+            for key in [k for k in self._pending if k not in wanted]:
+                self._discard(self._pending.pop(key))
+            for key, path in wanted.items():
+                if key not in self._pending:
+                    self._pending[key] = self._pool.submit(self._decode, path)
+            STATS.gauge("queue.audio_decoded", sum(f.done() for f in self._pending.values()))
+
+    @staticmethod
+    def _discard(future: Future):
+        if not future.cancel():
+            future.add_done_callback(lambda f: f.exception() is None and f.result().release())
+
+    def get(self, job: Job) -> DecodedAudio:
+        with self._lock:
+            future = self._pending.pop(job.key, None)
+        self.prefetch()
+        if future is None:
+            self.misses += 1
+            return self._decode(job.payload["path"])
+        self.hits += 1
+        with stage("audio.wait"):  # > 0, wenn Whisper auf ffmpeg warten muss
+            return future.result()
+
+    def close(self):
+        with self._lock:
+            for future in self._pending.values():
+                self._discard(future)
+            self._pending.clear()
+        self._pool.shutdown(wait=False)
+        log.debug(f"AudioDecodePool: {self.hits} hits, {self.misses} misses")
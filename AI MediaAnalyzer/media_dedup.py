@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+log = logging.getLogger(__name__)
+
+#
+# Doppelte Dateien (gleicher Inhalt, anderer Name/Ordner) vor den teuren KI-Stufen erkennen.
+# Handy-Backups enthalten dieselben Fotos und Videos oft mehrfach.
+# Drei Stufen, jede nur für die Kandidaten der vorigen:
+#   1. Dateigröße (nur os.stat)
+#   2. Hash über die ersten und letzten PARTIAL_BYTES
+#   3. Hash über die ganze Datei (nur bei Kollisionen in Stufe 2 und Dateien > 2 x PARTIAL_BYTES)
+#
+PARTIAL_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+MIN_SIZE = 1  # leere Dateien nicht als Duplikate behandeln
+
+
+def _group(paths: Iterable[str], key) -> List[List[str]]:
+    """Gruppiert nach key(path), nur Gruppen mit mehr als einer Datei. Lesefehler -> Datei fällt heraus."""
+    groups = defaultdict(list)
+    for path in paths:
+        try:
+            groups[key(path)].append(path)
+        except OSError as e:
+            log.warning(f"dedup: {path}: {e}")
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def partial_hash(path: str, size: int = None) -> bytes:
+    size = os.path.getsize(path) if size is None else size
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(PARTIAL_BYTES))
+        if size > PARTIAL_BYTES:
+            f.seek(max(PARTIAL_BYTES, size - PARTIAL_BYTES))
+            h.update(f.read(PARTIAL_BYTES))
+    return h.digest()
+
+
+def full_hash(path: str) -> bytes:
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_BYTES):
+            h.update(chunk)
+    return h.digest()
+
+
+def find_duplicates(paths: Iterable) -> Dict[str, List[str]]:
+    """
+    Liefert {Original: [Duplikate]} mit absoluten Pfaden. Original ist die erste Datei
+    in der Reihenfolge von paths, damit sie vor ihren Duplikaten analysiert wird.
+    """
+    ordered = list(dict.fromkeys(os.path.abspath(str(p)) for p in paths))
+    position = {path: idx for idx, path in enumerate(ordered)}
+    sizes = {}
+    for path in ordered:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError as e:
+            log.warning(f"dedup: {path}: {e}")
+
+    result: Dict[str, List[str]] = {}
+    candidates = [path for path in ordered if sizes.get(path, 0) >= MIN_SIZE]
+    for same_size in _group(candidates, sizes.get):
+        for same_partial in _group(same_size, lambda p: partial_hash(p, sizes[p])):
+            # Kleine Dateien sind durch den partiellen Hash schon vollständig gelesen
+            if sizes[same_partial[0]] > 2 * PARTIAL_BYTES:
+                groups = _group(same_partial, full_hash)
+            else:
+                groups = [same_partial]
+            for group in groups:
+                group.sort(key=position.get)
+                result[group[0]] = group[1:]
+    count = sum(len(dups) for dups in result.values())
+    if count:
+        log.info(f"dedup: {count} duplicate files in {len(result)} groups")
+    return result
+
+
+###########################################################
+# CLI:  python media_dedup.py D:/Fotos
+###########################################################
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
+    folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    files = [os.path.join(root, f) for root, _, names in os.walk(folder) for f in names]
+    for original, duplicates in find_duplicates(files).items():
+        print(original)
+        for dup in duplicates:
+            print(f"  = {dup}")
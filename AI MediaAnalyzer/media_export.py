@@ -0,0 +1,121 @@
+import csv
+import os
+import logging
+from typing import Iterable
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+# own:
+from media_table import RecordStore, HEADINGS, FIELD_INDEX, NUMERIC_FIELDS, format_values
+
+try:  # optional: nur für den Parquet-Export nötig
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+log = logging.getLogger(__name__)
+
+# Anzahl Zeilen, aus denen die Excel-Spaltenbreite geschätzt wird
+WIDTH_SAMPLE_ROWS = 1000
+MAX_COLUMN_WIDTH = 60
+# Zeilen pro Arrow RecordBatch
+PARQUET_BATCH_ROWS = 10000
+
+
+###########################################################
+# CSV: Zeile für Zeile aus dem RecordStore schreiben
+###########################################################
+def export_csv(records: RecordStore, file_path: str):
+    with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(HEADINGS)
+        writer.writerows(format_values(row) for row in records.iter_rows())
+    log.info(f"export_csv(): {len(records)} rows → {file_path}")
+
+
+def append_csv(records: RecordStore, file_path: str, item_ids: Iterable[int]):
+    """Hängt die Zeilen item_ids an (Watch Folder), neue Datei mit Kopfzeile."""
+    item_ids = list(item_ids)
+    is_new = not os.path.exists(file_path) or os.path.getsize(file_path) == 0
+    with open(file_path, "a", newline="", encoding="utf-8-sig" if is_new else "utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        if is_new:
+            writer.writerow(HEADINGS)
+        writer.writerows(format_values(records.values(item_id)) for item_id in item_ids)
+    log.info(f"append_csv(): {len(item_ids)} rows → {file_path}")
+
+
+###########################################################
+# Excel: write_only Workbook, die Spaltenbreiten werden vorab
+# aus einer Stichprobe geschätzt (write_only erlaubt kein
+# nachträgliches Anpassen).
+###########################################################
+def estimate_column_widths(records: RecordStore, sample_rows: int = WIDTH_SAMPLE_ROWS) -> list[int]:
+    widths = [len(str(header)) for header in HEADINGS]
+    for row in records.sample(sample_rows):
+        for idx, value in enumerate(format_values(row)):
+            widths[idx] = max(widths[idx], len(str(value)))
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+def export_xlsx(records: RecordStore, file_path: str):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Media Analysis")
+
+    for col_idx, width in enumerate(estimate_column_widths(records), start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+    ws.append(list(HEADINGS))
+    for row in records.iter_rows():
+        ws.append(list(format_values(row)))
+
+    wb.save(file_path)
+    log.info(f"export_xlsx(): {len(records)} rows → {file_path}")
+
+
+###########################################################
+# Parquet (Arrow) für die Weiterverarbeitung mit pandas, DuckDB, ...
+# Lat, Lon und Length (Sekunden) werden als float64 gespeichert, wie im RecordStore.
+###########################################################
+def _to_float(value):
+    if value in ("", None):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def export_parquet(records: RecordStore, file_path: str) -> bool:
+    if pa is None:
+        log.error("export_parquet(): pyarrow is not installed (pip install pyarrow).")
+        return False
+
+    fields = [pa.field(name, pa.float64() if name in NUMERIC_FIELDS else pa.string()) for name in FIELD_INDEX]
+    schema = pa.schema(fields)
+
+    def _write(writer, batch):
+        columns = list(zip(*batch))
+        arrays = []
+        for name, idx in FIELD_INDEX.items():
+            if name in NUMERIC_FIELDS:
+                arrays.append(pa.array([_to_float(v) for v in columns[idx]], type=pa.float64()))
+            else:
+                arrays.append(pa.array([str(v) for v in columns[idx]], type=pa.string()))
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+    with pq.ParquetWriter(file_path, schema) as writer:
+        batch = []
+        for row in records.iter_rows():
+            values = list(format_values(row))
+            for name in NUMERIC_FIELDS:
+                values[FIELD_INDEX[name]] = row[FIELD_INDEX[name]]
+            batch.append(values)
+            if len(batch) >= PARQUET_BATCH_ROWS:
+                _write(writer, batch)
+                batch = []
+        if batch:
+            _write(writer, batch)
+    log.info(f"export_parquet(): {len(records)} rows → {file_path}")
+    return True
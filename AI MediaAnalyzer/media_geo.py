@@ -0,0 +1,454 @@
+import io
+import json
+import logging
+import math
+import sys
+import threading
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+# own:
+from media_tools import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+#
+# Offline Reverse Geocoding: (lat, lon) -> Ort, Region, Land ohne Netz (Reise-Laptop).
+# Quelle 1: GeoNames Orte (cities500/1000/5000/15000.txt bzw. .zip, dazu admin1CodesASCII.txt und
+#           countryInfo.txt) -> nächster Ort über ein Gitter-Index (Zellen CELL_DEG Grad, nach Zelle sortiert).
+# Quelle 2 (optional): GeoJSON Verwaltungsgrenzen (OSM admin boundaries, Natural Earth Länder)
+#           -> Region/Land per Punkt-in-Polygon, genauer an Grenzen als der nächste Ort.
+# Beides wird einmal importiert und als .npz unter GEO_DIR abgelegt, das Laden dauert dann nur Millisekunden.
+#   python media_geo.py import cities1000.zip admin1CodesASCII.txt countryInfo.txt
+#   python media_geo.py boundaries countries.geojson
+#   python media_geo.py 48.137 11.575
+#
+GEO_DIR = CACHE_DIR / "geo"
+PLACES_FILE = "places.npz"
+BOUNDARIES_FILE = "boundaries.npz"
+CELL_DEG = 0.5
+MAX_DISTANCE_KM = 50.0    # weiter weg (Meer, Wüste): kein Ort, nur Region/Land aus den Grenzen
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+# GeoJSON Properties, in dieser Reihenfolge gesucht
+BOUNDARY_NAME_KEYS = ("name:en", "name_en", "NAME_EN", "name", "NAME", "ADMIN", "admin")
+BOUNDARY_CODE_KEYS = ("ISO3166-1:alpha2", "ISO3166-1", "ISO_A2", "iso_a2", "country_code")
+COUNTRY_LEVEL = 2
+REGION_LEVEL = 4
+
+_N_LON = int(round(360 / CELL_DEG))
+
+
+@dataclass(frozen=True)
+class Place:
+    city: str = ""
+    region: str = ""
+    country: str = ""
+    country_code: str = ""
+    distance_km: float = None  # zum Ortsmittelpunkt, None ohne Ort
+
+    def format(self) -> str:
+        """z.B. "München, Bayern, Germany" """
+        parts = []
+        for part in (self.city, self.region, self.country):
+            if part and part not in parts:
+                parts.append(part)
+        return ", ".join(parts)
+
+
+def _pack(strings: Iterable[str]) -> np.ndarray:
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(buffer: np.ndarray) -> List[str]:
+    return buffer.tobytes().decode("utf-8").split("\n") if buffer.size else []
+
+
+def _cell(lat, lon):
+    lat_i = np.clip(np.floor((np.asarray(lat) + 90) / CELL_DEG), 0, 180 / CELL_DEG - 1).astype(np.int64)
+    lon_i = np.floor((np.asarray(lon) + 180) / CELL_DEG).astype(np.int64) % _N_LON
+    return lat_i * _N_LON + lon_i
+
+
+def _haversine_km(lat, lon, lats, lons) -> np.ndarray:
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+###########################################################
+# GeoNames Orte im Gitter-Index
+###########################################################
+class PlaceIndex:
+    """Orte sortiert nach Gitterzelle, nearest() sucht Ring um Ring um die Zelle des Punkts."""
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, name_idx: np.ndarray, region_idx: np.ndarray,
+                 country_idx: np.ndarray, names: List[str], regions: List[str], countries: List[str], codes: List[str]):
+        cells = _cell(lat, lon)
+        order = np.argsort(cells, kind="stable")
+        self.cells = cells[order]
+        self.lat = lat[order].astype(np.float64)
+        self.lon = lon[order].astype(np.float64)
+        self.name_idx = name_idx[order]
+        self.region_idx = region_idx[order]
+        self.country_idx = country_idx[order]
+        self.names, self.regions, self.countries, self.codes = names, regions, countries, codes
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, lat=self.lat.astype(np.float32), lon=self.lon.astype(np.float32), name_idx=self.name_idx,
+                 region_idx=self.region_idx, country_idx=self.country_idx, names=_pack(self.names),
+                 regions=_pack(self.regions), countries=_pack(self.countries), codes=_pack(self.codes))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "PlaceIndex":
+        with np.load(path) as data:
+            return cls(data["lat"], data["lon"], data["name_idx"], data["region_idx"], data["country_idx"],
+                       _unpack(data["names"]), _unpack(data["regions"]), _unpack(data["countries"]),
+                       _unpack(data["codes"]))
+
+    def _ring(self, lat_i: int, lon_i: int, r: int) -> np.ndarray:
+        """Indizes aller Orte in den Zellen mit Abstand genau r (Chebyshev) zur Zelle (lat_i, lon_i)."""
+        if r == 0:
+            cells = [(lat_i, lon_i)]
+        else:
+            cells = [(lat_i + di, lon_i + dj) for di in range(-r, r + 1) for dj in (-r, r)]
+            cells += [(lat_i + di, lon_i + dj) for di in (-r, r) for dj in range(-r + 1, r)]
+        ids = sorted({i * _N_LON + (j % _N_LON) for i, j in cells if 0 <= i < 180 / CELL_DEG})
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        starts = np.searchsorted(self.cells, ids, side="left")
+        ends = np.searchsorted(self.cells, ids, side="right")
+        ranges = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def nearest(self, lat: float, lon: float, max_km: float = MAX_DISTANCE_KM) -> Optional[Tuple[int, float]]:
+        """(Index, Entfernung in km) des nächsten Orts oder None, wenn keiner näher als max_km ist."""
+        if not len(self):
+            return None
+        cell = int(_cell(lat, lon))
+        lat_i, lon_i = divmod(cell, _N_LON)
+        best, best_km = None, math.inf
+        max_rings = int(180 / CELL_DEG)
+        for r in range(max_rings):
+            candidates = self._ring(lat_i, lon_i, r)
+            if len(candidates):
+                km = _haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+                k = int(np.argmin(km))
+                if km[k] < best_km:
+                    best, best_km = int(candidates[k]), float(km[k])
+            # Alle Orte außerhalb der Ringe 0..r sind mindestens so weit weg (Längengrade werden zu den Polen kürzer)
+            cos_lat = math.cos(math.radians(min(89.9, abs(lat) + (r + 1) * CELL_DEG)))
+            bound_km = r * CELL_DEG * KM_PER_DEG * cos_lat
+            if best_km <= bound_km or bound_km > max_km:
+                break
+        if best is None or best_km > max_km:
+            return None
+        return best, best_km
+
+    def place(self, idx: int, distance_km: float = None) -> Place:
+        code = self.codes[self.country_idx[idx]]
+        return Place(city=self.names[self.name_idx[idx]], region=self.regions[self.region_idx[idx]],
+                     country=self.countries[self.country_idx[idx]], country_code=code,
+                     distance_km=None if distance_km is None else round(distance_km, 2))
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    """Textdatei, bei .zip die erste .txt Datei darin."""
+    path = Path(path)
+    if path.suffix.lower() == ".zip":
+        archive = zipfile.ZipFile(path)
+        name = next(n for n in archive.namelist() if n.lower().endswith(".txt") and not n.lower().startswith("readme"))
+        return io.TextIOWrapper(archive.open(name), encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _read_admin1(path: Path) -> Dict[str, str]:
+    """admin1CodesASCII.txt: "DE.02<TAB>Bavaria<TAB>Bavaria<TAB>2951839" -> {"DE.02": "Bavaria"}"""
+    result = {}
+    with _open_text(path) as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 2:
+                result[cols[0]] = cols[1]
+    return result
+
+
+def _read_countries(path: Path) -> Dict[str, str]:
+    """countryInfo.txt: ISO, ISO3, ISO-Numeric, fips, Country, ... -> {"DE": "Germany"}"""
+    result = {}
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 5:
+                result[cols[0]] = cols[4]
+    return result
+
+
+def import_geonames(cities_path, admin1_path=None, countries_path=None, root: Path = GEO_DIR) -> int:
+    """
+    Importiert einen GeoNames Orte-Dump (cities*.txt/.zip oder allCountries, nur Feature-Klasse P).
+    Ohne admin1CodesASCII.txt / countryInfo.txt stehen Region und Land als Code im Ergebnis.
+    """
+    admin1 = _read_admin1(admin1_path) if admin1_path else {}
+    countries = _read_countries(countries_path) if countries_path else {}
+    lats, lons, name_idx, region_idx, country_idx = [], [], [], [], []
+    names, name_pos = [], {}
+    regions, region_pos = [], {}
+    codes, code_pos = [], {}
+
+    def _intern(value: str, values: list, pos: dict) -> int:
+        if value not in pos:
+            pos[value] = len(values)
+            values.append(value)
+        return pos[value]
+
+    with _open_text(cities_path) as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 11 or cols[6] != "P":
+                continue
+            try:
+                lat, lon = float(cols[4]), float(cols[5])
+            except ValueError:
+                continue
+            code = cols[8]
+            lats.append(lat)
+            lons.append(lon)
+            name_idx.append(_intern(cols[1], names, name_pos))
+            region_idx.append(_intern(admin1.get(f"{code}.{cols[10]}", cols[10]), regions, region_pos))
+            country_idx.append(_intern(code, codes, code_pos))
+
+    index = PlaceIndex(np.asarray(lats, dtype=np.float32), np.asarray(lons, dtype=np.float32),
+                       np.asarray(name_idx, dtype=np.int32), np.asarray(region_idx, dtype=np.int32),
+                       np.asarray(country_idx, dtype=np.int32), names, regions,
+                       [countries.get(code, code) for code in codes], codes)
+    index.save(Path(root) / PLACES_FILE)
+    log.info(f"import_geonames(): {len(index)} places, {len(regions)} regions, {len(codes)} countries")
+    _reset()
+    return len(index)
+
+
+###########################################################
+# Verwaltungsgrenzen (GeoJSON), Punkt-in-Polygon
+###########################################################
+class BoundaryIndex:
+    """
+    Alle Ringe (Außen- und Loch-Ringe) als ein Array von Eckpunkten. Ein Punkt liegt in einem Polygon,
+    wenn ein Strahl nach Osten die Ringe des Polygons ungerade oft schneidet (even-odd, Löcher inklusive).
+    Kandidaten vorab über die Bounding Box der Polygone.
+    """
+
+    def __init__(self, vertices: np.ndarray, ring_start: np.ndarray, poly_ring_start: np.ndarray,
+                 poly_feature: np.ndarray, poly_bbox: np.ndarray, features: List[dict]):
+        self.vertices = vertices            # (n, 2) lon, lat
+        self.ring_start = ring_start        # Ring k: vertices[ring_start[k]:ring_start[k + 1]]
+        self.poly_ring_start = poly_ring_start  # Polygon p: Ringe poly_ring_start[p]..poly_ring_start[p + 1]
+        self.poly_feature = poly_feature
+        self.poly_bbox = poly_bbox          # (p, 4) min_lon, min_lat, max_lon, max_lat
+        self.features = features            # [{"name", "code", "level"}]
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, vertices=self.vertices, ring_start=self.ring_start, poly_ring_start=self.poly_ring_start,
+                 poly_feature=self.poly_feature, poly_bbox=self.poly_bbox,
+                 features=np.frombuffer(json.dumps(self.features).encode("utf-8"), dtype=np.uint8))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BoundaryIndex":
+        with np.load(path) as data:
+            return cls(data["vertices"], data["ring_start"], data["poly_ring_start"], data["poly_feature"],
+                       data["poly_bbox"], json.loads(data["features"].tobytes().decode("utf-8")))
+
+    @classmethod
+    def from_geojson(cls, paths: Iterable, default_level: int = COUNTRY_LEVEL) -> "BoundaryIndex":
+        vertices, ring_start, poly_ring_start, poly_feature, poly_bbox, features = [], [0], [0], [], [], []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            for feature in data.get("features", [data] if data.get("type") == "Feature" else []):
+                geometry = feature.get("geometry") or {}
+                if geometry.get("type") == "Polygon":
+                    polygons = [geometry["coordinates"]]
+                elif geometry.get("type") == "MultiPolygon":
+                    polygons = geometry["coordinates"]
+                else:
+                    continue
+                props = feature.get("properties") or {}
+                name = next((str(props[k]) for k in BOUNDARY_NAME_KEYS if props.get(k)), "")
+                code = next((str(props[k]) for k in BOUNDARY_CODE_KEYS if props.get(k) not in (None, "", "-99")), "")
+                try:
+                    level = int(props.get("admin_level", default_level))
+                except (TypeError, ValueError):
+                    level = default_level
+                feature_id = len(features)
+                features.append({"name": name, "code": code.upper()[:2] if level == COUNTRY_LEVEL else code,
+                                 "level": level})
+                for polygon in polygons:
+                    rings = [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon if len(ring) >= 3]
+                    if not rings:
+                        continue
+                    for ring in rings:
+                        vertices.append(ring)
+                        ring_start.append(ring_start[-1] + len(ring))
+                    poly_ring_start.append(poly_ring_start[-1] + len(rings))
+                    poly_feature.append(feature_id)
+                    outer = rings[0]
+                    poly_bbox.append((outer[:, 0].min(), outer[:, 1].min(), outer[:, 0].max(), outer[:, 1].max()))
+        return cls(np.concatenate(vertices) if vertices else np.empty((0, 2)), np.asarray(ring_start, dtype=np.int64),
+                   np.asarray(poly_ring_start, dtype=np.int64), np.asarray(poly_feature, dtype=np.int32),
+                   np.asarray(poly_bbox, dtype=np.float64).reshape(-1, 4), features)
+
+    def _crossings(self, ring: int, lon: float, lat: float) -> int:
+        xs = self.vertices[self.ring_start[ring]:self.ring_start[ring + 1], 0]
+        ys = self.vertices[self.ring_start[ring]:self.ring_start[ring + 1], 1]
+        xj, yj = np.roll(xs, 1), np.roll(ys, 1)
+        spans = (ys > lat) != (yj > lat)
+        if not spans.any():
+            return 0
+        xs, ys, xj, yj = xs[spans], ys[spans], xj[spans], yj[spans]
+        x_cross = xs + (lat - ys) * (xj - xs) / (yj - ys)
+        return int(np.count_nonzero(lon < x_cross))
+
+    def lookup(self, lat: float, lon: float) -> Dict[int, dict]:
+        """{admin_level: feature} aller Grenzen, in denen der Punkt liegt."""
+        bbox = self.poly_bbox
+        candidates = np.nonzero((bbox[:, 0] <= lon) & (lon <= bbox[:, 2]) & (bbox[:, 1] <= lat) & (lat <= bbox[:, 3]))[0]
+        result = {}
+        for poly in candidates:
+            feature = self.features[self.poly_feature[poly]]
+            if feature["level"] in result:
+                continue
+            rings = range(self.poly_ring_start[poly], self.poly_ring_start[poly + 1])
+            if sum(self._crossings(ring, lon, lat) for ring in rings) % 2:
+                result[feature["level"]] = feature
+        return result
+
+
+def import_boundaries(geojson_paths, root: Path = GEO_DIR, default_level: int = COUNTRY_LEVEL) -> int:
+    """Importiert GeoJSON Grenzen (Properties admin_level, name, ISO3166-1 bzw. Natural Earth NAME/ISO_A2)."""
+    if isinstance(geojson_paths, (str, Path)):
+        geojson_paths = [geojson_paths]
+    index = BoundaryIndex.from_geojson(geojson_paths, default_level)
+    index.save(Path(root) / BOUNDARIES_FILE)
+    log.info(f"import_boundaries(): {len(index)} boundaries, {len(index.poly_feature)} polygons")
+    _reset()
+    return len(index)
+
+
+###########################################################
+# Abfrage
+###########################################################
+class OfflineGeocoder:
+    """Lädt die importierten Indizes aus root beim ersten lookup()."""
+
+    def __init__(self, root: Path = GEO_DIR, max_km: float = MAX_DISTANCE_KM):
+        self.root = Path(root)
+        self.max_km = max_km
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.places: Optional[PlaceIndex] = None
+        self.boundaries: Optional[BoundaryIndex] = None
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                if (self.root / PLACES_FILE).exists():
+                    self.places = PlaceIndex.load(self.root / PLACES_FILE)
+                if (self.root / BOUNDARIES_FILE).exists():
+                    self.boundaries = BoundaryIndex.load(self.root / BOUNDARIES_FILE)
+            except (OSError, ValueError, KeyError) as e:
+                log.error(f"OfflineGeocoder: cannot load {self.root}: {e}")
+            if self.places is None and self.boundaries is None:
+                log.info(f"OfflineGeocoder: no data in {self.root} (python media_geo.py import cities1000.zip ...)")
+
+    @property
+    def available(self) -> bool:
+        self._load()
+        return self.places is not None or self.boundaries is not None
+
+    def lookup(self, lat: float, lon: float) -> Optional[Place]:
+        self._load()
+        place = None
+        if self.places is not None:
+            hit = self.places.nearest(lat, lon, self.max_km)
+            if hit is not None:
+                place = self.places.place(*hit)
+        if self.boundaries is not None:
+            admin = self.boundaries.lookup(lat, lon)
+            country, region = admin.get(COUNTRY_LEVEL), admin.get(REGION_LEVEL)
+            if country or region:
+                # Die Grenze gewinnt: liegt der nächste Ort jenseits der Landesgrenze, wird er verworfen
+                same_country = place is not None and (not country or place.country_code == country["code"])
+                base = place if same_country else Place()
+                place = Place(city=base.city, region=region["name"] if region else base.region,
+                              country=country["name"] if country else base.country,
+                              country_code=country["code"] if country else base.country_code,
+                              distance_km=base.distance_km)
+        return place
+
+
+_geocoder: Optional[OfflineGeocoder] = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder() -> OfflineGeocoder:
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = OfflineGeocoder()
+        return _geocoder
+
+
+def _reset():
+    """Nach einem Import neu laden."""
+    global _geocoder
+    with _geocoder_lock:
+        _geocoder = None
+
+
+def reverse_geocode_offline(lat: float, lon: float) -> str:
+    """"Ort, Region, Land" oder "" (keine Daten importiert, kein Ort in der Nähe)."""
+    place = get_geocoder().lookup(lat, lon)
+    return place.format() if place else ""
+
+
+###########################################################
+# CLI
+###########################################################
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
+    if len(sys.argv) >= 3 and sys.argv[1] == "import":
+        files = {Path(p).name.lower(): Path(p) for p in sys.argv[2:]}
+        admin1 = next((p for n, p in files.items() if n.startswith("admin1")), None)
+        countries = next((p for n, p in files.items() if n.startswith("countryinfo")), None)
+        cities = [p for p in files.values() if p not in (admin1, countries)]
+        print(import_geonames(cities[0], admin1, countries), "places")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "boundaries":
+        print(import_boundaries(sys.argv[2:]), "boundaries")
+    elif len(sys.argv) == 3:
+        result = get_geocoder().lookup(float(sys.argv[1]), float(sys.argv[2]))
+        print(result.format() if result else "<unknown>", result)
+    else:
+        print("python media_geo.py import <cities.zip> [admin1CodesASCII.txt] [countryInfo.txt]\n"
+              "python media_geo.py boundaries <file.geojson> ...\n"
+              "python media_geo.py <lat> <lon>")
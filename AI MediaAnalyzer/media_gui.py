@@ -1,19 +1,16 @@
 import os
-import csv
 import threading
+import time
 from pathlib import Path
 import torch
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
 from tkinter import (
     Tk, Frame, Button, Label, filedialog, ttk, messagebox, Text,
     Scrollbar, Checkbutton, IntVar, StringVar, Menu, Toplevel, END, BOTH, W
 )
 from tkinter import font as tkfont
 from tqdm import tqdm
-from PIL import Image, ImageTk, ExifTags
+from PIL import Image, ImageTk
 from exiftool import ExifToolHelper
-from moviepy.video.io.VideoFileClip import VideoFileClip
 import logging
 
 # Own Program parts:
@@ -23,7 +20,17 @@ from ai_audio import AIAudio
 from ai_image import AIImage
 from ai_face import AIFace
 from media_tools import get_meta_data_bundle, get_kind_of_media, \
-    extract_mp3_front_cover, read_ai_metadata
+    extract_mp3_front_cover, extract_mp3_cover_file, read_ai_metadata
+from media_table import RecordStore, VirtualTable, FIELDS, HEADINGS, FLUSH_MS, format_values
+import media_export
+import media_dedup
+import media_geo
+from media_stats import STATS, stage
+from media_search import SearchIndex, format_start
+from media_vectors import VectorStore, key_path
+from media_prefetch import Prefetcher
+from media_audio_decode import AudioDecodePool
+from media_watch import FolderWatcher
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +38,8 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 log = logging.getLogger(__name__)
+# Statistik-Zeile nur jede Sekunde neu berechnen (Perzentile sortieren die Messwerte)
+STATS_REFRESH_S = 1.0
 
 class MediaAnalyzerGUI:
 
@@ -47,31 +56,58 @@ class MediaAnalyzerGUI:
         # GUI defaults:
         self.model_var = StringVar(value="small")
         self.save_transcript_var = IntVar(value=1)  # standardmäßig aktiviert
+        self.audio_batch_var = IntVar(value=1)  # kurze Clips (<30 s) gebündelt transkribieren
+        self.cpu_int8_var = IntVar(value=0)  # ohne GPU: int8-quantisierte Modelle (schneller, etwas ungenauer)
         self.interval_var = StringVar(value="20")
         self.save_frames_var = IntVar(value=0)
         self.save_csv_var = IntVar(value=1)
         self.save_xlsx_var = IntVar(value=1)
+        self.save_parquet_var = IntVar(value=0)
+        self.save_stats_var = IntVar(value=0)
         self.save_tags_var = IntVar(value=1)
         self.ai_faces_var = IntVar(value=1)
         self.landmark_var = IntVar(value=1)  # Calculate nearest landmark, sightseeing point <300 m)
         self.landmark_radius_var = IntVar(value=500)
+        self.nominatim_var = IntVar(value=0)  # Adresse offline (media_geo), zusätzlich Nominatim, wenn online
         self.face_db_dir:Path = Path("C:/TEMP/Fotos-DCIM-2023-/_FACE_IDENT/personen_db")
+        # Analyse-Ergebnisse. Worker-Threads schreiben nur hier und in _pending_ui,
+        # die GUI übernimmt die Änderungen gesammelt alle FLUSH_MS in _ui_flush().
+        self.records = RecordStore()
+        self.search_index = SearchIndex()  # Volltextsuche über alle analysierten Ordner
+        self.search_var = StringVar(value="")
+        self.semantic_var = IntVar(value=0)  # Suche über CLIP Embeddings statt Volltext
+        self.clip_var = IntVar(value=0)  # CLIP Embeddings je Bild/Keyframe berechnen (semantische Suche, Duplikate)
+        self.ai_embed = None  # AIEmbed, erst bei Bedarf geladen
+        self._embed_lock = threading.Lock()
+        self._ui_lock = threading.Lock()
+        self._pending_ui = {}
+        self._run_id = None
+        # Doppelte Dateien eines Durchgangs: Original-Pfad -> [Duplikat-Pfade], Original item_id -> [item_ids]
+        self._dup_paths = {}
+        self._dup_items = {}
+        self._cover_captions = {}  # Cover-Datei im Cover-Cache -> Bildbeschreibung (ein Album = ein Cover)
+        self._stats_shown = 0.0  # letzte Aktualisierung der Statistik-Zeile
+        self.watch_var = IntVar(value=0)  # Ordner beobachten und neue Dateien sofort analysieren
+        self._watcher = None  # FolderWatcher
+        self._pipeline_lock = threading.Lock()  # analyze_folder und Watch Folder nicht gleichzeitig
 
         self.create_menu()
         self.create_top_controls()
         self.create_table()
         self._init_styles()
+        self.root.after(FLUSH_MS, self._ui_flush)
         log.info("AI Audio loading...")
         self.root.update_idletasks()
-        self.ai_audio = AIAudio(audio_model_size=self.model_var.get())
+        self.ai_audio = AIAudio(audio_model_size=self.model_var.get(), cpu_optimized=bool(self.cpu_int8_var.get()))
         log.info("AI Image loading...")
-        self.ai_image = AIImage()
+        self.ai_image = AIImage(cpu_optimized=bool(self.cpu_int8_var.get()))
         self.current_folder:Path = Path(".")
         self.transcripts_missing = 0 # number of audio transcriptions still not processed.
         self.audio_workers = []
         self.MAX_AUDIO_WORKERS = 1  # <-- sehr wichtig
         #self.start_audio_workers()  # Startet den Thread zur Verarbeitung von Audios/Videos
         self.ai_face = AIFace(self.face_db_dir)
+        self.root.after(500, self._offer_resume)
     #
     # ---------------- Menü ----------------
     #
@@ -81,9 +117,16 @@ class MediaAnalyzerGUI:
         filemenu = Menu(menubar, tearoff=0)
         filemenu.add_command(label="Bulk Load", command=self.choose_folder)
         filemenu.add_command(label="Single File", command=self.choose_single_file)
+        filemenu.add_checkbutton(label="Watch Folder", variable=self.watch_var, command=self.toggle_watch)
         filemenu.add_separator()
         filemenu.add_command(label="Exit", command=self.root.quit)
         menubar.add_cascade(label="File", menu=filemenu)
+        toolsmenu = Menu(menubar, tearoff=0)
+        toolsmenu.add_command(label="Find duplicates (CLIP)", command=self.find_duplicates)
+        toolsmenu.add_separator()
+        toolsmenu.add_command(label="Import GeoNames places…", command=self.import_geonames)
+        toolsmenu.add_command(label="Import boundaries (GeoJSON)…", command=self.import_boundaries)
+        menubar.add_cascade(label="Tools", menu=toolsmenu)
         self.root.config(menu=menubar)
         # Hilfe-Menü
         helpmenu = Menu(menubar, tearoff=0)
@@ -157,8 +200,10 @@ class MediaAnalyzerGUI:
     def show_help_nominatim():
         messagebox.showinfo("Nominatim Info",
             "This module lets you identify sightseeing or other spots.\n"
-            "This module uses Nominatim from OpenStreetMaps.org.\n"
-            "For each photo and videos with GPS coordinates a web request is done.\n"
+            "Addresses come from an offline GeoNames index (Tools > Import GeoNames places),\n"
+            "optionally refined by country/region boundaries (Tools > Import boundaries).\n"
+            "With 'Nominatim' checked, a web request to Nominatim (OpenStreetMaps.org)\n"
+            "adds street level details for each photo and video with GPS coordinates.\n"
             "It returns a landmark name or 'None'\n"
         )
 
@@ -205,6 +250,12 @@ class MediaAnalyzerGUI:
         self.model_menu.bind("<<ComboboxSelected>>", self.on_whisper_model_change)
         self.model_menu.grid(row=0, column=1, sticky="W", padx=5)
         Checkbutton(self.config_frame, text="Save Transcripts", variable=self.save_transcript_var).grid(row=0, column=2, sticky="W")
+        self.cpu_int8_check = Checkbutton(self.config_frame, text="CPU int8", variable=self.cpu_int8_var,
+                                          command=self.on_cpu_mode_change)
+        self.cpu_int8_check.grid(row=0, column=3, sticky="W")
+        Checkbutton(self.config_frame, text="Batch short clips", variable=self.audio_batch_var).grid(row=0, column=4, sticky="W")
+        if torch.cuda.is_available():
+            self.cpu_int8_check.config(state="disabled")
         self.create_gpu_status_widget()
 
         # --- Zeile 2: Video Analyse ---
@@ -214,6 +265,8 @@ class MediaAnalyzerGUI:
         Label(self.config_frame, text="Umkreissuche POIs:", font=("Arial", 11)).grid(row=1, column=3,
                                                                                                   sticky="W", padx=5)
         ttk.Entry(self.config_frame, textvariable=self.landmark_radius_var, width=6).grid(row=1, column=4, sticky="W", padx=5)
+        Checkbutton(self.config_frame, text="CLIP Vectors", variable=self.clip_var).grid(row=1, column=5, sticky="W")
+        Checkbutton(self.config_frame, text="Nominatim", variable=self.nominatim_var).grid(row=1, column=6, sticky="W")
 
         # --- Zeile 3: Ordner/File Wahl ---
         Label(self.config_frame, text="📂 Analyse File/Ordner:", font=("Arial", 11)).grid(row=2, column=0, sticky="W", padx=5, pady=(10,0))
@@ -221,10 +274,17 @@ class MediaAnalyzerGUI:
         Button(self.config_frame, text="File select", command=self.choose_single_file).grid(row=2, column=2, sticky="W", padx=5, pady=(10, 0))
         Button(self.config_frame, text="FaceDB select", command=self.choose_facedb).grid(row=2, column=2, sticky="E",
                                                                                             padx=5, pady=(10, 0))
-        Button(self.config_frame, text="Delete AI tags", command=self.export_treeview_to_delete).grid(row=2, column=4,
-                                                                                                      sticky="W", padx=5,
-                                                                                                      pady=(10, 0))
-        Button(self.config_frame, text="Save AI tags", command=self.export_treeview_to_files).grid(row=2, column=5, sticky="W", padx=5, pady=(10, 0))
+        self.delete_tags_button = Button(self.config_frame, text="Delete AI tags",
+                                         command=lambda: self._run_tag_action("Delete AI tags", self.export_treeview_to_delete))
+        self.delete_tags_button.grid(row=2, column=4, sticky="W", padx=5, pady=(10, 0))
+        self.save_tags_button = Button(self.config_frame, text="Save AI tags",
+                                       command=lambda: self._run_tag_action("Save AI tags", self.export_treeview_to_files))
+        self.save_tags_button.grid(row=2, column=5, sticky="W", padx=5, pady=(10, 0))
+        search_entry = ttk.Entry(self.config_frame, textvariable=self.search_var, width=24)
+        search_entry.grid(row=2, column=6, sticky="W", padx=5, pady=(10, 0))
+        search_entry.bind("<Return>", lambda e: self.search_library())
+        Button(self.config_frame, text="🔎 Search", command=self.search_library).grid(row=2, column=7, sticky="W", padx=5, pady=(10, 0))
+        Checkbutton(self.config_frame, text="semantic", variable=self.semantic_var).grid(row=2, column=8, sticky="W", pady=(10, 0))
 
         # --- Zeile 4 - Fortschrittanzeige und Ergebnisspeicherung
         self.status_label = Label(self.config_frame, text="Status", font=("Arial", 10))
@@ -238,6 +298,12 @@ class MediaAnalyzerGUI:
         Checkbutton(self.config_frame, text="Save Excel", variable=self.save_xlsx_var).grid(row=3, column=4, sticky="W")
         Checkbutton(self.config_frame, text="Save AI Tags (Files)", variable=self.save_tags_var).grid(row=3, column=5, sticky="W")
         Checkbutton(self.config_frame, text="AI Faces", variable=self.ai_faces_var).grid(row=3, column=6, sticky="W")
+        Checkbutton(self.config_frame, text="Save Parquet", variable=self.save_parquet_var).grid(row=3, column=7, sticky="W")
+        Checkbutton(self.config_frame, text="Save Stats", variable=self.save_stats_var).grid(row=3, column=8, sticky="W")
+
+        # --- Zeile 5 - Laufzeit je Stufe (p50/p95) und Queue-Längen
+        self.stats_label = Label(self.config_frame, text="", font=("Arial", 9), fg="gray")
+        self.stats_label.grid(row=4, column=0, columnspan=9, sticky="W", padx=5)
 
         self.root.update_idletasks()
         log.debug("Top controls GUI created.")
@@ -248,7 +314,7 @@ class MediaAnalyzerGUI:
         table_frame = Frame(self.root)
         table_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
 
-        cols = ("File", "Type", "Date", "Lat", "Lon", "Length", "Address", "Point of Interest", "Persons", "Image", "Audio")
+        cols = HEADINGS
         self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=20)
         for col in cols:
             self.tree.heading(col, text=col, command=lambda c=col: self.sort_column(c, False))
@@ -260,8 +326,9 @@ class MediaAnalyzerGUI:
         vsb = Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
         hsb = Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
 
-        # Treeview <-> Scrollbars koppeln
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        # Treeview <-> Scrollbars koppeln. Vertikal scrollt die virtuelle Liste über den RecordStore.
+        self.tree.configure(xscrollcommand=hsb.set)
+        self.table = VirtualTable(self.tree, vsb, self.records)
 
         # Grid-Layout: tree in (0,0), vsb in (0,1), hsb in (1,0)
         self.tree.grid(row=0, column=0, sticky="nsew")
@@ -283,88 +350,102 @@ class MediaAnalyzerGUI:
         self.root.update_idletasks()
         log.debug("Table view created.")
     #
-    # Reads data from TreeView.
+    # Reads data from the RecordStore behind the TreeView (in display order).
     #
-    @staticmethod
-    def get_treeview_data(tree: ttk.Treeview):
-        columns = tree["columns"]
-        headers = [tree.heading(col)["text"] or col for col in columns]
-
-        rows = []
-        for item_id in tree.get_children():
-            rows.append(tree.item(item_id, "values"))
-
+    def get_treeview_data(self):
+        headers = list(HEADINGS)
+        rows = [format_values(row) for row in self.records.rows()]
         return headers, rows
 
     #
-    # Writes CSV from filled Treeview.
+    # Writes CSV, streamed from the RecordStore behind the Treeview.
     #
     def export_treeview_to_csv(self, file_path: str):
-        headers, rows = self.get_treeview_data(self.tree)
-
-        with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.writer(f, delimiter=";")
-            writer.writerow(headers)
-            writer.writerows(rows)
+        media_export.export_csv(self.records, file_path)
 
     #
-    # Writes Excel from filled Treeview.
+    # Writes Excel (write_only workbook), streamed from the RecordStore.
     #
     def export_treeview_to_xlsx(self, file_path: str):
-        headers, rows = self.get_treeview_data(self.tree)
+        media_export.export_xlsx(self.records, file_path)
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Media Analysis"
-
-        # Header
-        ws.append(headers)
-
-        # Daten
-        for row in rows:
-            ws.append(list(row))
-
-        # Spaltenbreite automatisch anpassen
-        for col_idx, header in enumerate(headers, start=1):
-            max_len = len(str(header))
-            for row in rows:
-                try:
-                    max_len = max(max_len, len(str(row[col_idx - 1])))
-                except IndexError:
-                    pass
-
-            ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 60)
-
-        wb.save(file_path)
+    #
+    # Writes Parquet (needs pyarrow), streamed from the RecordStore.
+    #
+    def export_treeview_to_parquet(self, file_path: str) -> bool:
+        return media_export.export_parquet(self.records, file_path)
 
     #
     # Writes AI tags for Address, Image and Audio to image, video, audio files
+    # Gesammelt mit wenigen exiftool-Aufrufen, verteilt auf mehrere exiftool-Prozesse
+    # (media_tools.write_ai_metadata_parallel).
     #
-    def export_treeview_to_files(self):
-        headers, rows = self.get_treeview_data(self.tree)
+    def export_treeview_to_files(self, item_ids=None):
+        if item_ids is None:
+            headers, rows = self.get_treeview_data()
+        else:  # nur diese Zeilen (Watch Folder)
+            rows = [format_values(self.records.values(item_id)) for item_id in item_ids]
 
          # Daten
-        with ExifToolHelper(encoding="utf-8") as et:
-            for row in rows:
-                a = list(row)
-                address:str = a[6]
-                landmark:str = a[7]
-                persons = a[8]
-                image_text = a[8]
-                audio_text = a[9]
-                media_tools.write_ai_metadata(self.folder / Path(a[0]), address,landmark, image_text,audio_text,persons, et )
+        jobs = []
+        for row in rows:
+            a = list(row)
+            # 0 File | 1 Type | 2 Date | 3 Lat | 4 Lon | 5 Length | 6 Address | 7 Landmark | 8 Persons | 9 Image | 10 Audio
+            jobs.append({
+                "path": self.folder / Path(a[0]),
+                "address": a[6],
+                "landmark": a[7],
+                "persons": a[8],
+                "image2text": a[9],
+                "transcript": a[10],
+            })
+        self._set_progress(value=0, maximum=max(1, len(jobs)), mode="determinate")
+        failures = media_tools.write_ai_metadata_parallel(jobs, progress=self._on_bulk_progress)
+        self._log_bulk_failures("Save AI tags", failures)
+        return failures
 
     #
     # Delete AI tags from shown Images, Videos and Audio in TreeView
     #
     def export_treeview_to_delete(self):
-        headers, rows = self.get_treeview_data(self.tree)
+        headers, rows = self.get_treeview_data()
 
          # Daten
-        with ExifToolHelper(encoding="utf-8") as et:
-            for row in rows:
-                a = list(row)
-                media_tools.delete_ai_metadata(self.folder / Path(a[0]), et)
+        paths = [self.folder / Path(row[0]) for row in rows]
+        self._set_progress(value=0, maximum=max(1, len(paths)), mode="determinate")
+        failures = media_tools.delete_ai_metadata_parallel(paths, progress=self._on_bulk_progress)
+        self._log_bulk_failures("Delete AI tags", failures)
+        return failures
+
+    #
+    # Save/Delete AI tags im Hintergrund: der Fortschritt wird im Tk-Mainthread (_ui_flush) angezeigt,
+    # die Buttons sind solange gesperrt.
+    #
+    def _run_tag_action(self, action:str, func):
+        for button in (self.delete_tags_button, self.save_tags_button):
+            button.config(state="disabled")
+        self._set_status(f"🏷️ {action}...")
+
+        def _run():
+            try:
+                if not func():  # Fehler meldet _log_bulk_failures()
+                    self._set_status(f"✅ {action}: fertig")
+            except Exception as e:
+                log.exception(f"{action}: ")
+                self._set_status(f"⚠️ {action}: {e}")
+            finally:
+                self.root.after(0, lambda: [button.config(state="normal")
+                                            for button in (self.delete_tags_button, self.save_tags_button)])
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _on_bulk_progress(self, done:int, total:int):
+        self._set_progress(value=done, maximum=max(1, total))
+
+    def _log_bulk_failures(self, action:str, failures:list):
+        for path, message in failures:
+            log.error(f"{action}: {path}: {message}")
+        if failures:
+            self._set_status(f"⚠️ {action}: {len(failures)} Fehler (siehe Log)")
 
     @staticmethod
     def get_gpu_status():
@@ -420,58 +501,64 @@ class MediaAnalyzerGUI:
             font=("Segoe UI", 9),
         )
 
-    def on_whisper_model_change(self):
+    def on_whisper_model_change(self, event=None):
         """
         Wird aufgerufen, wenn ein anderes Whisper-Modell ausgewählt wird.
-        Lädt das Modell im Hintergrund.
+        Lädt das Modell im Hintergrund, das bisherige Modell transkribiert bis zum Tausch weiter.
         """
-        if self._model_loading:
-            return  # Mehrfachklicks ignorieren
-
-        self._model_loading = True
         whisper_choice: str = self.model_var.get()
+        self._set_status(f"🎙 Lade Audio-Modell '{whisper_choice}' im Hintergrund …")
 
-        self.status_label.config(
-            text=f"🎙 Lade Audio-Modell '{whisper_choice}' …"
-        )
-        self.progress.config(mode="indeterminate")
-        self.progress.start(10)
-        self.root.update_idletasks()
-
-        def _load_model():
-            try:
-                self.ai_audio._load_audio_model(audio_model_size=whisper_choice)
-                # GUI-Update: GPU-Status
-                self.root.after(0, self.update_gpu_status_label)
-
-            except Exception as e:
+        def _loaded(error):
+            if error is not None:
                 self.root.after(
                     0,
-                    lambda _e=e: messagebox.showerror(
+                    lambda _e=error: messagebox.showerror(
                         "ERROR",
                         f"Audio Modell konnte nicht geladen werden:\n{_e}"
                     )
                 )
-            finally:
-                self.root.after(0, self._on_whisper_model_loaded)
+            # GUI-Update: GPU-Status
+            self.root.after(0, self.update_gpu_status_label)
+            self.root.after(0, self._on_whisper_model_loaded)
 
-        threading.Thread(
-            target=_load_model,
-            daemon=True,
-            name="WhisperModelSwitch"
-        ).start()
+        self.ai_audio.swap_model_async(whisper_choice, on_done=_loaded)
 
-    def _on_whisper_model_loaded(self):
-        self.progress.stop()
-        self.progress.config(mode="determinate")
-        self.progress["value"] = 0
+    #
+    # CPU int8 Modus umschalten: Quantisieren geht in-place, Ausschalten lädt die fp32 Modelle neu.
+    #
+    def on_cpu_mode_change(self):
+        if self._model_loading:
+            self.cpu_int8_var.set(1 - self.cpu_int8_var.get())  # Klick während des Ladens ignorieren
+            return
+        enabled = bool(self.cpu_int8_var.get())
+        self._model_loading = True
+        self._set_status(f"🧮 CPU int8 Modus {'ein' if enabled else 'aus'} …")
+        self._set_progress(mode="indeterminate")
 
-        model_name = self.model_var.get()
-        self.status_label.config(
-            text=f"✅ Whisper '{model_name}' bereit"
-        )
+        def _switch():
+            try:
+                self.ai_image.set_cpu_optimized(enabled)
+                self.ai_audio.set_cpu_optimized(enabled)
+                if enabled and self.ai_image.backend == "onnx" and not self.ai_image.quantized:
+                    self._set_status("✅ CPU int8 Modus ein (BLIP bleibt fp32, kein int8 Export)")
+                else:
+                    self._set_status(f"✅ CPU int8 Modus {'ein' if enabled else 'aus'}")
+            except Exception:
+                log.exception("on_cpu_mode_change(): ")
+                self._set_status("⚠️ CPU int8 Modus: Fehler (siehe Log)")
+            finally:
+                self._set_progress(mode="determinate")
+                self._model_loading = False
 
-        self._model_loading = False
+        threading.Thread(target=_switch, daemon=True, name="CpuModeSwitch").start()
+
+    def _on_whisper_model_loaded(self):
+        model_name = self.ai_audio.audio_model_size_loaded
+        if model_name:
+            self.status_label.config(
+                text=f"✅ Whisper '{model_name}' bereit"
+            )
 
     # ---- Thumbnail Hover ----
     def on_hover(self, event):
@@ -494,7 +581,7 @@ class MediaAnalyzerGUI:
             self.hide_text_tooltip()
             return
 
-        values = self.tree.item(row_id, "values")
+        values = format_values(self.records.values(self.table.item_id(row_id)))
         if not values:
             self.hide_thumbnail()
             self.hide_text_tooltip()
@@ -651,12 +738,7 @@ class MediaAnalyzerGUI:
 
     def show_video_thumbnail(self, path, x:int, y:int):
         try:
-            clip = VideoFileClip(path)
-            mid = clip.duration / 2
-            frame = clip.get_frame(mid)  # numpy array
-            clip.close()
-            img = Image.fromarray(frame)
-            img.thumbnail((200, 200))
+            img = media_tools.make_video_thumbnail(path)
             photo = ImageTk.PhotoImage(img)
             self._last_thumb_image = photo
             self._show_thumbnail_window(photo, x, y)
@@ -688,26 +770,7 @@ class MediaAnalyzerGUI:
 
     def show_image_thumbnail(self, path: Path, x: int, y: int):
         try:
-            img = Image.open(path)
-
-            # Orientierung aus EXIF
-            try:
-                orientation_key = next((key for key, value in ExifTags.TAGS.items() if value == 'Orientation'), None)
-                exif = img.getexif()  # Verwende getexif() anstelle von _getexif()
-
-                if exif is not None and orientation_key in exif:
-                    orientation_value = exif[orientation_key]
-                    if orientation_value == 3:
-                        img = img.rotate(180, expand=True)
-                    elif orientation_value == 6:
-                        img = img.rotate(270, expand=True)
-                    elif orientation_value == 8:
-                        img = img.rotate(90, expand=True)
-
-            except Exception:
-                pass  # Optional: Logge den Fehler hier, falls gewünscht
-
-            img.thumbnail((200, 200))
+            img = media_tools.make_image_thumbnail(path)
             self._last_thumb_image = ImageTk.PhotoImage(img)  # Halte eine Referenz
             photo = self._last_thumb_image  # Referenz wird hierüber gehalten
             self._show_thumbnail_window(photo, x, y)
@@ -727,31 +790,208 @@ class MediaAnalyzerGUI:
         row_id = self.tree.identify_row(event.y)
         if not row_id:
             return
-        values = self.tree.item(row_id, "values")
+        values = self.records.values(self.table.item_id(row_id))
         filename = Path(values[0])
         folder = self.folder
         path = folder / filename
         if path.exists() and (filename.suffix.lower() in ["mp4", "mov", "avi"]):
-            # Standard Video-Player öffnen
-            if os.name == "nt":  # Windows
-                os.startfile(path)
-            elif os.name == "posix":  # macOS/Linux
-                log.warning("masOS, Linux Playback not implemented yet")
-                #subprocess.run(["open" if sys.platform == "darwin" else "xdg-open", path])
+            self._open_media(path)
+
+    @staticmethod
+    def _open_media(path:Path):
+        # Standard-Programm (Player, Bildbetrachter) öffnen
+        if os.name == "nt":  # Windows
+            os.startfile(path)
+        elif os.name == "posix":  # macOS/Linux
+            log.warning("masOS, Linux Playback not implemented yet")
+            #subprocess.run(["open" if sys.platform == "darwin" else "xdg-open", path])
+
+    # ---------------- Volltextsuche ----------------
+    def search_library(self):
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        start = time.perf_counter()
+        if self.semantic_var.get():
+            # CLIP (~600 MB) beim ersten Mal im Hintergrund laden, die GUI bleibt bedienbar
+            def _run():
+                embed = self._get_embedder()
+                if embed is None:
+                    return
+                hits = embed.search_text(query, k=200)
+                # Keyframe-Schlüssel "Pfad#t=12.0" -> Datei und Zeitpunkt
+                rows = [(key_path(key), "clip", format_start(float(key.rsplit("#t=", 1)[1])) if "#t=" in key else "",
+                         f"{score:.3f}") for key, score in hits]
+                self.root.after(0, lambda: self._show_search_hits(query, rows, start))
+            if self.ai_embed is None:
+                self._set_status("🧲 CLIP model loading...")
+            threading.Thread(target=_run, daemon=True).start()
+            return
+        hits = self.search_index.search(query, limit=200)
+        rows = [(hit.path, hit.field, format_start(hit.start), hit.snippet) for hit in hits]
+        self._show_search_hits(query, rows, start)
+
+    def _show_search_hits(self, query:str, rows, start:float):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.status_label.config(text=f"🔎 {len(rows)} Treffer in {elapsed_ms:.0f} ms")
+        self._show_result_list(f"🔎 {query}", ("File", "Field", "At", "Snippet"), (380, 80, 50, 480), rows)
+
+    # Ergebnisliste in eigenem Fenster, Doppelklick öffnet die Datei (erste Spalte = Pfad).
+    def _show_result_list(self, title:str, columns, widths, rows):
+        win = Toplevel(self.root)
+        win.title(title)
+        win.geometry("1000x400")
+        tree = ttk.Treeview(win, columns=columns, show="headings")
+        for col, width in zip(columns, widths):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor="w", stretch=(col == columns[-1]))
+        vsb = Scrollbar(win, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        vsb.pack(side="right", fill="y")
+        tree.pack(fill=BOTH, expand=True)
+        for idx, values in enumerate(rows):
+            tree.insert("", "end", iid=str(idx), values=values)
+
+        def _open(event):
+            row_id = tree.identify_row(event.y)
+            if row_id:
+                path = Path(rows[int(row_id)][0])
+                if path.exists():
+                    self._open_media(path)
+        tree.bind("<Double-1>", _open)
+
+    # ---------------- CLIP Embeddings ----------------
+    # Lädt CLIP beim ersten Aufruf (dauert), nicht im Tk-Mainthread aufrufen.
+    def _get_embedder(self):
+        with self._embed_lock:
+            if self.ai_embed is None:
+                try:
+                    from ai_embed import AIEmbed
+                    self.ai_embed = AIEmbed()
+                except Exception as e:
+                    log.exception("AIEmbed(): ")
+                    self.root.after(0, lambda: messagebox.showerror("CLIP", f"CLIP model could not be loaded:\n{e}"))
+            return self.ai_embed
+
+    def find_duplicates(self):
+        # Die Duplikat-Suche braucht nur die gespeicherten Embeddings, nicht das CLIP Modell
+        def _run():
+            if self.ai_embed is not None:
+                store = self.ai_embed.store
+            else:
+                from ai_embed import AIEmbed
+                store = VectorStore.open_existing(AIEmbed.MODEL_NAME)
+            if store is None or len(store) == 0:
+                self._set_status("🧲 Keine Embeddings vorhanden (beim Analysieren 'CLIP Vectors' aktivieren)")
+                return
+            self._set_status(f"🧲 Suche Duplikate in {len(store)} Bildern...")
+            start = time.perf_counter()
+            clusters = store.duplicate_clusters()
+            elapsed = time.perf_counter() - start
+            rows = [(path, f"{group_no}", f"{len(group)}") for group_no, group in enumerate(clusters, 1) for path in group]
+            self._set_status(f"🧲 {len(clusters)} Duplikat-Gruppen in {elapsed:.1f} s")
+            self.root.after(0, lambda: self._show_result_list("🧲 Duplicates", ("File", "Group", "Size"), (700, 60, 60), rows))
+        threading.Thread(target=_run, daemon=True).start()
+
+    #
+    # Offline Reverse Geocoding: GeoNames Dump (cities1000.zip, ...) bzw. GeoJSON Grenzen importieren.
+    # admin1CodesASCII.txt und countryInfo.txt im selben Ordner werden mit importiert.
+    #
+    def import_geonames(self):
+        filename = filedialog.askopenfilename(title="GeoNames cities*.zip / *.txt",
+                                              filetypes=[("GeoNames", "*.zip *.txt"), ("Alle Dateien", "*.*")])
+        if not filename:
+            return
+        folder = Path(filename).parent
+        admin1 = folder / "admin1CodesASCII.txt"
+        countries = folder / "countryInfo.txt"
+
+        def _run():
+            self._set_status("🌍 Importiere GeoNames...")
+            try:
+                count = media_geo.import_geonames(filename, admin1 if admin1.exists() else None,
+                                                  countries if countries.exists() else None)
+                self._set_status(f"🌍 {count} Orte importiert")
+            except Exception as e:
+                log.exception("import_geonames(): ")
+                self._set_status(f"⚠️ GeoNames Import: {e}")
+        threading.Thread(target=_run, daemon=True).start()
+
+    def import_boundaries(self):
+        filenames = filedialog.askopenfilenames(title="GeoJSON Grenzen",
+                                                filetypes=[("GeoJSON", "*.geojson *.json"), ("Alle Dateien", "*.*")])
+        if not filenames:
+            return
+
+        def _run():
+            self._set_status("🌍 Importiere Grenzen...")
+            try:
+                count = media_geo.import_boundaries(list(filenames))
+                self._set_status(f"🌍 {count} Grenzen importiert")
+            except Exception as e:
+                log.exception("import_boundaries(): ")
+                self._set_status(f"⚠️ Grenzen Import: {e}")
+        threading.Thread(target=_run, daemon=True).start()
+
+    # Ergebnisse in den Suchindex (auch für Duplikate), Fehler dürfen die Analyse nicht abbrechen.
+    def _index_update(self, path, kind:str = "", **fields):
+        # Leere Werte überspringen: update() ersetzt ein Feld, sonst wären z.B. die schon indizierten
+        # Personen oder die Transkript-Segmente einer früheren Sitzung gelöscht.
+        fields = {name: value for name, value in fields.items()
+                  if value and not (isinstance(value, str) and (value.startswith("⚠️") or value in ("No POI", "<error>", "<None>", "...")))}
+        for target in [path] + self._dup_paths.get(os.path.abspath(path), []):
+            try:
+                self.search_index.update(target, kind=kind, **fields)
+            except Exception:
+                log.exception(f"_index_update({target}): ")
 
     def set_process(self, value):
-        self.progress["value"] = value
+        self._set_progress(value=value)
 
-    # ---- Tabellen-Sortierung ----
-    def sort_column(self, col, reverse):
-        items = [(self.tree.set(k, col), k) for k in self.tree.get_children('')]
+    #
+    # Thread-sichere GUI-Updates: Worker-Threads merken sich nur den letzten Wert,
+    # _ui_flush() überträgt alles gesammelt im Tk-Mainthread.
+    #
+    def _set_status(self, text:str):
+        with self._ui_lock:
+            self._pending_ui["status"] = text
+
+    def _set_progress(self, value=None, maximum=None, mode=None):
+        with self._ui_lock:
+            if mode is not None:
+                self._pending_ui["mode"] = mode
+            if maximum is not None:
+                self._pending_ui["maximum"] = maximum
+            if value is not None:
+                self._pending_ui["value"] = value
+
+    def _ui_flush(self):
+        with self._ui_lock:
+            pending = self._pending_ui
+            self._pending_ui = {}
         try:
-            items.sort(key=lambda t: (float(t[0]) if t[0].replace('.', '', 1).isdigit() else t[0].lower()),
-                        reverse=reverse)
+            if "status" in pending:
+                self.status_label.config(text=pending["status"])
+            if "mode" in pending:
+                self.progress.config(mode=pending["mode"])
+            if "maximum" in pending:
+                self.progress["maximum"] = pending["maximum"]
+            if "value" in pending:
+                self.progress["value"] = pending["value"]
+            self.table.flush()
+            now = time.monotonic()
+            if now - self._stats_shown >= STATS_REFRESH_S:
+                self._stats_shown = now
+                self.stats_label.config(text=STATS.status_line())
         except Exception:
-            items.sort(key=lambda t: t[0].lower(), reverse=reverse)
-        for index, (val, k) in enumerate(items):
-            self.tree.move(k, '', index)
+            log.exception("_ui_flush(): ")
+        self.root.after(FLUSH_MS, self._ui_flush)
+
+    # ---- Tabellen-Sortierung ----
+    def sort_column(self, col, reverse):
+        # Typgerecht im RecordStore sortieren, die Tabelle zeigt danach nur die sichtbaren Zeilen neu an
+        self.records.sort(FIELDS[HEADINGS.index(col)], reverse)
+        self.table.refresh()
         self.tree.heading(col, command=lambda: self.sort_column(col, not reverse))
 
     # Face ID folder (directory with subdirectories named like the persons which are stored in the subdirectories
@@ -789,19 +1029,15 @@ class MediaAnalyzerGUI:
     # Hauptroutine liest files vom file_path und füllt die Tabelle.
     #
     def analyze_folder(self, file_path:Path):
-        self.status_label.config(text="📦 Lade Files...")
-        self.root.update_idletasks()
-        self.tree.delete(*self.tree.get_children())
+        self._set_status("📦 Lade Files...")
 
         if self._model_loading:
-            messagebox.showwarning(
+            self.root.after(0, lambda: messagebox.showwarning(
                 "Bitte warten",
                 "Das Audio-Modell wird noch geladen."
-            )
+            ))
             return
-
-        interval = int(self.interval_var.get())
-
+        self.stop_watch()
         if isinstance(file_path, Path):
             file_path = Path(file_path)
 
@@ -818,13 +1054,53 @@ class MediaAnalyzerGUI:
             log.warning("Der angegebene Pfad ist weder eine Datei noch ein Verzeichnis.")
             return
 
+        with self._pipeline_lock:
+            self.records.clear()
+            STATS.reset()
+            self._run_id = time.time_ns()  # item_ids in den Job-Queues gelten nur für diesen Durchgang
+            transcripts_duration = self._run_pipeline(all_files)
+            self._on_all_jobs_done()
+
+        self._set_status(f"All done")
+        self._set_progress(value=transcripts_duration, maximum=transcripts_duration)
+
+        self.root.after(0, lambda: messagebox.showinfo(
+            "Fertig",
+        "✅ Analyse abgeschlossen.\n"
+        ))
+
+    #
+    # Analysiert all_files und hängt die Ergebnisse an self.records an (Aufrufer hält _pipeline_lock).
+    # Kehrt zurück, wenn alle Gesichts- und Audio-Jobs erledigt sind. Liefert die Audio-Länge in s.
+    #
+    # existing: relpath -> item_id bereits vorhandener Zeilen (Watch Folder, geänderte Dateien),
+    # diese Zeilen werden überschrieben statt eine zweite Zeile anzuhängen.
+    def _run_pipeline(self, all_files:list, existing:dict = None) -> int:
+        self.ai_face.ai_queue.reopen()
+        self.ai_audio.ai_queue.reopen()
+        embed = self._get_embedder() if self.clip_var.get() else None
+        self.ai_image.image_hook = embed.add_image if embed is not None else None
+
+        interval = int(self.interval_var.get())
+
         total = len(all_files)
-        self.progress["maximum"] = total
-        self.progress["value"] = 0
-        self.root.update_idletasks()
+        self._set_progress(value=0, maximum=total)
+
+        # Gleiche Inhalte nur einmal analysieren, die Duplikate übernehmen die Ergebnisse
+        self._set_status(f"🔁 Suche doppelte Dateien in {total} Dateien...")
+        with stage("dedup"):
+            self._dup_paths = media_dedup.find_duplicates(f for f in all_files if get_kind_of_media(f) != "unknown")
+        original_of = {dup: original for original, dups in self._dup_paths.items() for dup in dups}
+        original_item = {}  # Original-Pfad -> item_id
+        self._dup_items = {}
+        STATS.gauge("dedup.duplicates", len(original_of))
+
+        # Bilder für BLIP im Hintergrund laden und vorverarbeiten, das Modell wartet nicht auf JPEG-Dekodierung
+        image_paths = [os.path.abspath(f) for f in all_files
+                       if get_kind_of_media(f) == "image" and os.path.abspath(f) not in original_of]
 
-        self.status_label.config(text=f"🔍 Analysiere {total} Dateien...")
-        with ExifToolHelper(encoding="utf-8") as et:
+        self._set_status(f"🔍 Analysiere {total} Dateien...")
+        with ExifToolHelper(encoding="utf-8") as et, Prefetcher(self.ai_image.prepare_image, image_paths) as prefetch:
 
             self.transcripts_missing = 0
             transcripts_cnt = 0
@@ -838,14 +1114,29 @@ class MediaAnalyzerGUI:
                     p = path
                 kind = get_kind_of_media(p)
                 if kind == "unknown":
-                    self.progress["value"] = i + 1
+                    self._set_progress(value=i + 1)
                     continue
                 relpath = os.path.relpath(p, self.folder)
+                abspath = os.path.abspath(p)
+                if abspath in original_of and original_of[abspath] in original_item:
+                    self._add_duplicate(original_item[original_of[abspath]], relpath,
+                                        existing.get(relpath) if existing else None)
+                    self._set_progress(value=i + 1)
+                    continue
                 rec = {"File": relpath, "Type": kind.capitalize(), "Date": "", "Lat": "", "Lon": "", "Length": "", "Address": "", "Landmark": "", "Persons": "", "Image": "", "Audio": ""}
-                item_id = self.tree.insert("", "end", values=tuple(rec.values()))
+                if existing and relpath in existing:
+                    item_id = existing[relpath]
+                    self.records.update(item_id, rec)
+                else:
+                    item_id = self.records.append(rec)
+                if abspath in self._dup_paths:
+                    original_item[abspath] = item_id
+                file_start = time.perf_counter()
                 try:
-                    meta_ai = read_ai_metadata(p, et)
-                    meta = get_meta_data_bundle(p, meta_ai, et_instance=et)
+                    with stage("metadata.read_ai"):
+                        meta_ai = read_ai_metadata(p, et)
+                    with stage("metadata"):
+                        meta = get_meta_data_bundle(p, meta_ai, et_instance=et)
                     rec["Date"] = meta.get("Date", "")
                     rec["Lat"] = meta.get("Lat", "")
                     rec["Lon"] = meta.get("Lon", "")
@@ -870,12 +1161,13 @@ class MediaAnalyzerGUI:
                         log.info("get_pois_nearby()=%s",rec['Landmark'])
                     if not rec["Address"]:
                         if rec["Lat"] and rec["Lon"]:
-                            rec["Address"] = api_location.reverse_geocode(float(rec["Lat"]), float(rec["Lon"]))
+                            rec["Address"] = api_location.reverse_geocode(float(rec["Lat"]), float(rec["Lon"]),
+                                                                          refine=bool(self.nominatim_var.get()))
                     self._update_tree_columns(item_id, rec)
                     if len(image_text) < 4:
                         # Mache Image Beschreibung sofort
                         if kind == "image":
-                            image_text = self.ai_image.describe_image(p)
+                            image_text = self.ai_image.describe_image(prefetch.get(abspath) or p)
                         elif kind == "video":
                             # Das ist aufwendiger: Video zerlegen in Einzelbilder, alle %interval%s Sekunden.
                             image_text = self.ai_image.describe_video_by_frames(p, interval)
@@ -883,40 +1175,65 @@ class MediaAnalyzerGUI:
                                 media_tools.save_video_frames(p, interval)
                         elif kind == "audio" and len(audio_text) < 4:
                             log.info("Extract Image from Audio file")
-                            image = extract_mp3_front_cover(p)
-                            if image is None:
+                            cover = extract_mp3_cover_file(p)
+                            if cover is None:
                                 log.warning(f"{relpath} has no image")
                                 image_text = ""
                             else:
-                                image_text = self.ai_image.describe_image(image)
+                                if cover not in self._cover_captions:
+                                    self._cover_captions[cover] = self.ai_image.describe_image(cover, key=os.path.abspath(p))
+                                image_text = self._cover_captions[cover]
                                 log.info(f"Cover-Bild zeigt: {image_text}")
-                                self.ai_face.push(p, kind, item_id)
+                                persons = self.ai_face.cached_persons(p)
+                                if persons is None:
+                                    self.ai_face.push(p, kind, item_id, self.folder, self._run_id)
+                                else:
+                                    self._update_tree_persons_columns(item_id, persons)
+                                    self._index_update(p, persons=persons)
                                 # MP3 Cover Image extrahieren und beschreiben.
 
+                    elif embed is not None and kind == "image" and os.path.abspath(p) not in embed.store:
+                        # Bildbeschreibung aus den Metadaten übernommen, Embedding fehlt noch
+                        with stage("image.load"), Image.open(p) as image:
+                            embed.add_image(os.path.abspath(p), image)
                     rec["Image"] = image_text
                     rec["Audio"] = audio_text
                     self._update_tree_columns(item_id, rec)
+                    self._index_update(p, kind, caption=image_text, transcript=audio_text, persons=rec["Persons"],
+                                       address=rec["Address"], landmark=rec["Landmark"])
 
                     # Nur audio_text im Hintergrund erzeugen
                     if kind in ("video", "audio"):
                         if audio_text == "..." or audio_text == "":
-                            self.transcripts_missing += 1
-                            transcripts_cnt += 1
-                            transcripts_duration:int = transcripts_duration+ int(round(float(rec["Length"])))
-                            self.ai_audio.push(p, kind, item_id, image_text, float(rec["Length"]))
+                            # Schon in einer früheren (evtl. abgebrochenen) Sitzung transkribiert?
+                            cached = self.ai_audio.cached_transcript(p)
+                            if cached is not None:
+                                self._update_tree_audio_columns(item_id, cached)
+                                if not self.search_index.has_field(p, "transcript"):  # Segmente mit Zeitstempel behalten
+                                    self._index_update(p, transcript=cached)
+                            else:
+                                self.transcripts_missing += 1
+                                transcripts_cnt += 1
+                                transcripts_duration:int = transcripts_duration+ int(round(float(rec["Length"])))
+                                self.ai_audio.push(p, kind, item_id, image_text, float(rec["Length"]), self.folder, self._run_id)
 
                 except Exception:
                     log.exception(f"⚠️ Fehler bei: {p}: ")
 
-                self.progress["value"] = i + 1
-                self.root.update_idletasks()
+                STATS.record("file", time.perf_counter() - file_start, start=file_start)
+                self._set_progress(value=i + 1)
+
+        # Alle Jobs dieses Durchgangs sind eingereiht: get() liefert None, sobald die Queues leer sind.
+        self.ai_face.ai_queue.close()
+        self.ai_audio.ai_queue.close()
+        # ffmpeg dekodiert die ersten Audios schon während der Gesichtserkennung
+        audio_decoder = AudioDecodePool(self.ai_audio.ai_queue)
+        audio_decoder.prefetch()
 
         #
         # Analyses all persons in the FaceDB.
         #
-        self.progress["maximum"] = total
-        self.progress["value"] = 1
-        self.progress.config(mode="indeterminate")
+        self._set_progress(value=1, maximum=total, mode="indeterminate")
         while True:
             i = 1
             job = self.ai_face.get()
@@ -924,78 +1241,217 @@ class MediaAnalyzerGUI:
                 log.info("Face AI has nothing to do.")
                 break  # sauberer Shutdown
 
-            path, kind, item_id = job
+            path, kind, item_id = job.payload["path"], job.payload["kind"], job.payload["item_id"]
             persons:set = set()
             try:
                 persons = self.ai_face.identify_persons(Path(path))
-                self.progress.config(mode="determinate")
-                self.status_label.config(text="🤓 Search Faces...")
-                self.root.update_idletasks()
+                self.ai_face.job_done(job, persons)
+                self._index_update(path, persons=persons)
+                self._set_status("🤓 Search Faces...")
                 i += 1
-                self.progress["value"] = i
-            except Exception:
+                self._set_progress(value=i, mode="determinate")
+            except Exception as e:
                 log.exception("_faces_worker_loop(): ")
+                self.ai_face.job_failed(job, e)
                 persons = {"⚠️"}
-            rec["Persons"] = persons
-            self._update_tree_persons_columns(item_id, persons)
+            if job.payload.get("run_id") == self._run_id:
+                self._update_tree_persons_columns(item_id, persons)
 
 
-        self.status_label.config(
-            text=f"🎧 Transcribe Audios {self.transcripts_missing}"
-        )
-        self.progress["maximum"] = transcripts_duration
-        self.progress["value"] = 0
-        self.progress.config(mode="indeterminate")
-        self.root.update_idletasks()
+        self._set_status(f"🎧 Transcribe Audios {self.transcripts_missing}")
+        self._set_progress(value=0, maximum=transcripts_duration, mode="indeterminate")
+        carry = None  # langer Clip, der beim Sammeln eines Batches schon geholt und dekodiert wurde
         while True:
             i = 0
-            job = self.ai_audio._get()
-            if job is None:
-                log.info("🎧 Audio AI has nothing to do.")
-                break  # sauberer Shutdown
+            if carry is not None:
+                (job, decoded), carry = carry, None
+            else:
+                job = self.ai_audio._get()
+                if job is None:
+                    log.info("🎧 Audio AI has nothing to do.")
+                    break  # sauberer Shutdown
+                decoded = self._decode_audio_job(audio_decoder, job)
+                if decoded is None:
+                    continue
+
+            # Kurze Clips (Sprachmemos) sammeln und gemeinsam durch Whisper schicken
+            batch = [(job, decoded)]
+            if self.audio_batch_var.get() and decoded.seconds <= self.ai_audio.BATCH_MAX_SECONDS:
+                while len(batch) < self.ai_audio.BATCH_SIZE:
+                    nxt = self.ai_audio.ai_queue.get(block=False)
+                    if nxt is None:
+                        break
+                    nxt_decoded = self._decode_audio_job(audio_decoder, nxt)
+                    if nxt_decoded is None:
+                        continue
+                    if nxt_decoded.seconds > self.ai_audio.BATCH_MAX_SECONDS:
+                        carry = (nxt, nxt_decoded)
+                        break
+                    batch.append((nxt, nxt_decoded))
 
-            path, kind, item_id, image_text, length = job
-            audio_text:str = ""
             try:
-                audio_text = self.ai_audio.transcribe_audio(Path(path))
-                self.progress.config(mode="determinate")
-                self.status_label.config(text="🎧 Transcribe Videos & Audios...")
-                self.root.update_idletasks()
-                i += round(length)
-                self.progress["value"] = i
-            except Exception:
+                items = [(Path(j.payload["path"]), d.samples) for j, d in batch]
+                if len(items) > 1:
+                    results = self.ai_audio.transcribe_batch(items, beam_size=self.ai_audio.BATCH_BEAM_SIZE)
+                else:
+                    results = [self.ai_audio.transcribe_audio_segments(items[0][0], audio=items[0][1])]
+            except Exception as e:
                 log.exception("⚠️ in transcribing: ")
-                audio_text = "⚠️"
-            rec["Audio"] = audio_text
-            self._update_tree_audio_columns(item_id, audio_text)
-
+                results = [(f"⚠️ {e}", [])] * len(batch)
+            finally:
+                for _, d in batch:
+                    d.release()
+            for (j, _), (audio_text, segments) in zip(batch, results):
+                self._finish_audio_job(j, audio_text, segments)
+            self._set_status("🎧 Transcribe Videos & Audios...")
+            i += round(sum(j.payload["length"] for j, _ in batch))
+            self._set_progress(value=i, mode="determinate")
+
+        audio_decoder.close()
         log.info("🎧 Audio AI finished all jobs.")
-        self._on_all_jobs_done()
-
-        self.status_label.config(
-            text=f"All done"
-        )
-        self.progress["maximum"] = transcripts_duration
-        self.progress["value"] = transcripts_duration
-        self.root.update_idletasks()
+        return transcripts_duration
 
-        messagebox.showinfo(
-            "Fertig",
-        "✅ Analyse abgeschlossen.\n"
-        )
+    def _decode_audio_job(self, audio_decoder:AudioDecodePool, job):
+        """Dekodiertes Audio des Jobs oder None (Job als fehlgeschlagen markiert)."""
+        try:
+            return audio_decoder.get(job)
+        except Exception as e:
+            log.exception(f"⚠️ decoding {job.payload['path']}: ")
+            self._finish_audio_job(job, f"⚠️ {e}", [])
+            return None
+
+    def _finish_audio_job(self, job, audio_text:str, segments:list):
+        path, item_id = job.payload["path"], job.payload["item_id"]
+        if audio_text.startswith("⚠️"):
+            self.ai_audio.job_failed(job, audio_text)
+        else:
+            self.ai_audio.job_done(job, audio_text)
+            self._index_update(path, transcript=segments or audio_text)
+        # Übrig gebliebene Jobs älterer Durchgänge landen nur in der Job-Datenbank
+        if job.payload.get("run_id") == self._run_id:
+            self._update_tree_audio_columns(item_id, audio_text)
 
     def _on_all_jobs_done(self):
+        self._export_tables()
+        if self.save_tags_var.get():
+            self.export_treeview_to_files()
+            self._set_status(f"✅ Fertig → Tags in Files")
+        if self.save_stats_var.get():
+            STATS.export_json(os.path.join(self.folder, "_media_stats.json"))
+            STATS.export_csv(os.path.join(self.folder, "_media_stats.csv"))
+        log.info("Stats: %s", STATS.status_line(top=10))
+
+    def _export_tables(self):
         if self.save_csv_var.get():
             out_path = os.path.join(self.folder, "_media_analysis.csv")
             self.export_treeview_to_csv(out_path)
-            self.status_label.config(text=f"✅ Fertig → {os.path.basename(out_path)}")
+            self._set_status(f"✅ Fertig → {os.path.basename(out_path)}")
         if self.save_xlsx_var.get():
             out_path = os.path.join(self.folder, "_media_analysis.xlsx")
             self.export_treeview_to_xlsx(out_path)
-            self.status_label.config(text=f"✅ Fertig → {os.path.basename(out_path)}")
-        if self.save_tags_var.get():
-            self.export_treeview_to_files()
-            self.status_label.config(text=f"✅ Fertig → Tags in Files")
+            self._set_status(f"✅ Fertig → {os.path.basename(out_path)}")
+        if self.save_parquet_var.get():
+            out_path = os.path.join(self.folder, "_media_analysis.parquet")
+            if self.export_treeview_to_parquet(out_path):
+                self._set_status(f"✅ Fertig → {os.path.basename(out_path)}")
+            else:
+                self._set_status("⚠️ Parquet Export: pyarrow fehlt")
+
+    #
+    # Ordner beobachten (File > Watch Folder): neue Dateien werden nach DEBOUNCE_S Sekunden Ruhe
+    # analysiert und an Tabelle, Suchindex und CSV angehängt. Excel/Parquet beim Beenden.
+    #
+    def toggle_watch(self):
+        if self.watch_var.get():
+            self.start_watch()
+        else:
+            self.stop_watch(export=True)
+
+    def start_watch(self):
+        if not os.path.isdir(self.folder):
+            self.watch_var.set(0)
+            messagebox.showwarning("Watch Folder", "Bitte zuerst einen Ordner analysieren (Bulk Load).")
+            return
+        self.stop_watch()
+        self._watcher = FolderWatcher(self.folder, self.ingest_files).start()
+        self.watch_var.set(1)
+        self._set_status(f"👁 Beobachte {self.folder} ({self._watcher.mode})")
+
+    def stop_watch(self, export:bool = False):
+        watcher, self._watcher = self._watcher, None
+        if watcher is None:
+            return
+        watcher.stop(wait=False)  # nicht im Tk-Mainthread auf ein laufendes ingest_files warten
+        self.root.after(0, lambda: self.watch_var.set(0))
+
+        def _finish():
+            watcher.join()
+            if export:
+                # Tabellen vollständig neu schreiben, sobald die laufende Analyse fertig ist
+                with self._pipeline_lock:
+                    self._export_tables()
+        threading.Thread(target=_finish, daemon=True).start()
+
+    def ingest_files(self, paths:list):
+        """
+        Vom FolderWatcher-Thread: neue/geänderte Dateien analysieren. Neue Dateien werden angehängt,
+        geänderte Dateien überschreiben ihre vorhandene Zeile (Tabelle und CSV).
+        """
+        watcher = self._watcher
+        with self._pipeline_lock:
+            if self._run_id is None:
+                self._run_id = time.time_ns()
+            item_of = {self.records.record(item_id).file: item_id for item_id in range(len(self.records))}
+            changed = {}
+            for p in paths:
+                relpath = os.path.relpath(p, self.folder)
+                if relpath in item_of:
+                    changed[relpath] = item_of[relpath]
+            first = len(self.records)
+            self._run_pipeline([str(p) for p in paths], existing=changed)
+            new_ids = range(first, len(self.records))
+            csv_path = os.path.join(self.folder, "_media_analysis.csv")
+            if self.save_csv_var.get():
+                if changed:  # geänderte Zeilen: CSV neu schreiben statt anhängen
+                    self.export_treeview_to_csv(csv_path)
+                else:
+                    media_export.append_csv(self.records, csv_path, new_ids)
+            if self.save_tags_var.get():
+                self.export_treeview_to_files(list(changed.values()) + list(new_ids))
+            if watcher is not None:
+                watcher.mark_seen(paths)  # eigene Tag-Schreibzugriffe nicht erneut melden
+        self._set_status(f"👁 {len(new_ids)} neue, {len(changed)} geänderte Dateien analysiert, beobachte {self.folder}")
+
+    #
+    # Nach einem Absturz/Schließen: offene Jobs der persistenten Queues fortsetzen.
+    # Die Ordner werden neu eingelesen, fertige Ergebnisse kommen aus der Job-Datenbank.
+    #
+    def _offer_resume(self):
+        pending = []
+        for payload in self.ai_audio.ai_queue.unfinished() + self.ai_face.ai_queue.unfinished():
+            folder = payload.get("folder") or ""
+            if folder not in pending:
+                pending.append(folder)
+        if not pending:
+            return
+        folders = [folder for folder in pending if folder and os.path.isdir(folder)]
+        if not folders:
+            for ai_queue in (self.ai_audio.ai_queue, self.ai_face.ai_queue):
+                ai_queue.discard_unfinished(pending)
+            return
+        resume = messagebox.askyesno("Fortsetzen?",
+                                     "Die letzte Analyse wurde nicht beendet:\n" + "\n".join(folders) +
+                                     f"\n\n{folders[0]} jetzt fortsetzen?" +
+                                     ("\nOffene Jobs der anderen Ordner werden verworfen." if len(folders) > 1 else ""))
+        # Alte offene Jobs verwerfen, sonst arbeitet der nächste Lauf sie mit ab (Whisper, DeepFace).
+        # Der fortgesetzte Lauf reiht neu ein, was noch fehlt, fertige Ergebnisse bleiben in der Job-Datenbank.
+        for ai_queue in (self.ai_audio.ai_queue, self.ai_face.ai_queue):
+            ai_queue.discard_unfinished(pending)
+        if resume:
+            folder = Path(folders[0])
+            self.folder = folder
+            self.current_folder = folder
+            threading.Thread(target=self.analyze_folder, args=(folder,), daemon=True).start()
 
     # ---------------- Single File Mode ----------------
     def analyze_single_file(self, file_path:Path):
@@ -1003,52 +1459,35 @@ class MediaAnalyzerGUI:
 
     #
     # AI Ergebnisse eintragen.
+    # Es wird nur der RecordStore geändert, die Tabelle zeichnet sich im nächsten _ui_flush() neu.
     #
     def _update_tree_audio_columns(self, item_id, audio_text:str):
-        values = list(self.tree.item(item_id, "values"))
-
-        # Spaltenindex:
-        # 0 File | 1 Type | 2 Date | 3 Lat | 4 Lon | 5 Length | 6 Address | 7 Landmark | 8 Persons | 9 Image | 10 Audio
         if audio_text:
-            values[10] = audio_text
-
-        self.tree.item(item_id, values=values)
+            for target in [item_id] + self._dup_items.get(item_id, []):
+                self.records.update(target, Audio=audio_text)
 
     def _update_tree_persons_columns(self, item_id, persons:set):
-        values = list(self.tree.item(item_id, "values"))
-
-        # Spaltenindex:
-        # 0 File | 1 Type | 2 Date | 3 Lat | 4 Lon | 5 Length | 6 Address | 7 Landmark | 8 Persons | 9 Image | 10 Audio
         if persons:
-            values[8] = persons
-
-        self.tree.item(item_id, values=values)
+            for target in [item_id] + self._dup_items.get(item_id, []):
+                self.records.update(target, Persons=persons)
+
+    # Duplikat übernimmt die (bisherigen) Ergebnisse des Originals, spätere Audio/Face Ergebnisse folgen.
+    # item_id: vorhandene Zeile des Duplikats (Watch Folder, geänderte Datei) überschreiben statt anhängen.
+    def _add_duplicate(self, original_id:int, relpath:str, item_id:int = None) -> int:
+        rec = self.records.get(original_id)
+        rec["File"] = relpath
+        if item_id is None:
+            item_id = self.records.append(rec)
+        else:
+            self.records.update(item_id, rec)
+        self._dup_items.setdefault(original_id, []).append(item_id)
+        log.info(f"🔁 {relpath} = {self.records.get(original_id)['File']} (skipped)")
+        return item_id
     #
     # AI Ergebnisse eintragen.
     #
     def _update_tree_columns(self, item_id, rec):
-        values = list(self.tree.item(item_id, "values"))
-        # 0 File | 1 Type | 2 Date | 3 Lat | 4 Lon | 5 Length | 6 Address | 7 Image | 8 Audio
-        #rec = {"File": relpath, "Type": kind.capitalize(), "Date": "", "Lat": "", "Lon": "", "Length": "","Address": "", "Image": "", "Audio": ""}
-
-        values[0] = rec["File"]
-        values[1] = rec["Type"]
-        values[2] = rec["Date"]
-        values[3] = rec["Lat"]
-        values[4] = rec["Lon"]
-        if rec["Length"]:
-            minutes:int = int(float(rec["Length"]) // 60)
-            seconds:int = int(float(rec["Length"]) % 60)
-            values[5] = f"{minutes}:{seconds:02d}"
-        else:
-            values[5] = ""
-        values[6] = rec["Address"]
-        values[7] = rec["Landmark"]
-        values[8] = rec["Persons"]
-        values[9] = rec["Image"]
-        values[10] = rec["Audio"]
-        self.tree.item(item_id, values=values)
-
+        self.records.update(item_id, rec)
 
     def show_result_window(self, file_path, kind, result_text):
         win = Toplevel(self.root)
@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+# own:
+from media_tools import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+JOBS_DB = CACHE_DIR / "jobs.sqlite"
+MAX_ATTEMPTS = 3
+
+# Zustände eines Jobs
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue    TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    payload  TEXT NOT NULL,
+    state    TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result   TEXT,
+    error    TEXT,
+    created  REAL NOT NULL,
+    updated  REAL NOT NULL,
+    UNIQUE (queue, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (queue, state, id);
+"""
+
+
+#
+# Eindeutiger Schlüssel einer Datei: Pfad + Änderungszeit.
+# Wird die Datei geändert, entsteht ein neuer Job statt das alte Ergebnis zu verwenden.
+#
+def job_key(path) -> str:
+    path = os.path.abspath(str(path))
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime_ns = 0
+    return f"{path}@{mtime_ns}"
+
+
+class Job:
+    def __init__(self, job_id: int, key: str, payload: Dict[str, Any], attempts: int):
+        self.id = job_id
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Job(id={self.id}, key={self.key!r}, attempts={self.attempts})"
+
+
+class JobQueue:
+    """
+    Persistente FIFO-Queue auf SQLite (ersetzt queue.Queue in AIAudio / AIFace).
+    Jeder Job hat einen Zustand (pending/running/done/failed), die Anzahl Versuche und
+    das Ergebnis. Nach einem Absturz werden 'running' Jobs wieder 'pending', d.h. ein
+    Neustart macht dort weiter, wo aufgehört wurde. get() blockiert ohne Polling, bis ein
+    Job kommt oder die Queue mit close() für den laufenden Durchgang geschlossen wurde.
+    """
+
+    def __init__(self, name: str, db_path: Path = JOBS_DB, max_attempts: int = MAX_ATTEMPTS):
+        self.name = name
+        self.max_attempts = max_attempts
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._cond = threading.Condition()
+        self._closed = False
+        recovered = self._execute(
+            "UPDATE jobs SET state=?, updated=? WHERE queue=? AND state=?",
+            (PENDING, time.time(), self.name, RUNNING)).rowcount
+        if recovered:
+            log.info(f"JobQueue({self.name}): {recovered} interrupted jobs are pending again.")
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._cond:
+            return self._db.execute(sql, params)
+
+    #
+    # Neuer Job. Existiert der Schlüssel schon, wird nur die Payload aktualisiert
+    # (z.B. neue item_id nach Neustart), ein erledigter/fehlgeschlagener Job wird neu eingereiht.
+    #
+    def put(self, key: str, payload: Dict[str, Any]):
+        now = time.time()
+        with self._cond:
+            self._db.execute(
+                """INSERT INTO jobs (queue, key, payload, state, attempts, created, updated)
+                   VALUES (?, ?, ?, ?, 0, ?, ?)
+                   ON CONFLICT (queue, key) DO UPDATE SET
+                       payload = excluded.payload,
+                       attempts = CASE WHEN state IN (?, ?) THEN 0 ELSE attempts END,
+                       state = CASE WHEN state = ? THEN state ELSE ? END,
+                       updated = excluded.updated""",
+                (self.name, key, json.dumps(payload), PENDING, now, now, DONE, FAILED, RUNNING, PENDING))
+            self._cond.notify()
+
+    #
+    # Ältesten pending Job holen und als running markieren.
+    # block=True: wartet bis ein Job kommt, close() aufgerufen wird oder timeout abläuft.
+    #
+    def get(self, block: bool = True, timeout: float = None) -> Optional[Job]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                row = self._db.execute(
+                    "SELECT id, key, payload, attempts FROM jobs WHERE queue=? AND state=? ORDER BY id LIMIT 1",
+                    (self.name, PENDING)).fetchone()
+                if row is not None:
+                    job_id, key, payload, attempts = row
+                    self._db.execute("UPDATE jobs SET state=?, attempts=?, updated=? WHERE id=?",
+                                     (RUNNING, attempts + 1, time.time(), job_id))
+                    return Job(job_id, key, json.loads(payload), attempts + 1)
+                if not block or self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def task_done(self, job: Job, result: Any = None):
+        with self._cond:
+            self._db.execute("UPDATE jobs SET state=?, result=?, error=NULL, updated=? WHERE id=?",
+                             (DONE, json.dumps(result), time.time(), job.id))
+            self._cond.notify_all()
+
+    def task_failed(self, job: Job, error: str):
+        """Fehlversuch: erneut einreihen, bis max_attempts erreicht ist."""
+        state = FAILED if job.attempts >= self.max_attempts else PENDING
+        with self._cond:
+            self._db.execute("UPDATE jobs SET state=?, error=?, updated=? WHERE id=?",
+                             (state, str(error), time.time(), job.id))
+            self._cond.notify_all()
+        log.warning(f"JobQueue({self.name}): {job} failed ({error}), now {state}")
+
+    #
+    # Leases für entfernte Worker (media_worker.py): ein running Job gehört dem Worker nur,
+    # solange er sich innerhalb von lease_s Sekunden meldet (renew). Sonst wird er neu vergeben.
+    # attempts dient als Lease-Kennung: ein Worker mit abgelaufenem Lease kann nichts mehr abschließen.
+    #
+    def expire_leases(self, lease_s: float) -> int:
+        """Abgelaufene running Jobs wieder pending (bzw. failed nach max_attempts)."""
+        now = time.time()
+        with self._cond:
+            expired = self._db.execute(
+                """UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                                   error = 'lease expired', updated = ?
+                   WHERE queue=? AND state=? AND updated < ?""",
+                (self.max_attempts, FAILED, PENDING, now, self.name, RUNNING, now - lease_s)).rowcount
+            if expired:
+                self._cond.notify_all()
+        if expired:
+            log.warning(f"JobQueue({self.name}): {expired} leases expired")
+        return expired
+
+    def renew(self, job_id: int, attempts: int) -> bool:
+        """Lease verlängern. False: der Job wurde inzwischen neu vergeben oder ist erledigt."""
+        return self._execute("UPDATE jobs SET updated=? WHERE id=? AND state=? AND attempts=?",
+                             (time.time(), job_id, RUNNING, attempts)).rowcount == 1
+
+    def leased(self, job_id: int, attempts: int) -> Optional[Job]:
+        """Der running Job mit dieser Lease-Kennung oder None."""
+        row = self._execute("SELECT id, key, payload, attempts FROM jobs WHERE id=? AND state=? AND attempts=?",
+                            (job_id, RUNNING, attempts)).fetchone()
+        return Job(row[0], row[1], json.loads(row[2]), row[3]) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Anzahl Jobs je Zustand."""
+        rows = self._execute("SELECT state, COUNT(*) FROM jobs WHERE queue=? GROUP BY state", (self.name,)).fetchall()
+        return {state: count for state, count in rows}
+
+    def result(self, key: str) -> Any:
+        """Ergebnis eines erledigten Jobs oder None."""
+        row = self._execute("SELECT result FROM jobs WHERE queue=? AND key=? AND state=?",
+                            (self.name, key, DONE)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def qsize(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM jobs WHERE queue=? AND state=?",
+                             (self.name, PENDING)).fetchone()[0]
+
+    def peek(self, count: int) -> List[Job]:
+        """Die nächsten <count> pending Jobs, ohne sie zu holen (z.B. zum Vorladen)."""
+        rows = self._execute(
+            "SELECT id, key, payload, attempts FROM jobs WHERE queue=? AND state=? ORDER BY id LIMIT ?",
+            (self.name, PENDING, count)).fetchall()
+        return [Job(job_id, key, json.loads(payload), attempts) for job_id, key, payload, attempts in rows]
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Payloads aller noch nicht erledigten Jobs (pending/running), z.B. für Resume nach Neustart."""
+        rows = self._execute("SELECT payload FROM jobs WHERE queue=? AND state IN (?, ?) ORDER BY id",
+                             (self.name, PENDING, RUNNING)).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def discard_unfinished(self, folders: Iterable[str]) -> int:
+        """Offene Jobs (pending/running) der Ordner folders löschen, z.B. wenn das Fortsetzen abgelehnt wurde."""
+        folders = {str(folder) for folder in folders}
+        with self._cond:
+            rows = self._db.execute("SELECT id, payload FROM jobs WHERE queue=? AND state IN (?, ?)",
+                                    (self.name, PENDING, RUNNING)).fetchall()
+            ids = [(job_id,) for job_id, payload in rows if (json.loads(payload).get("folder") or "") in folders]
+            self._db.executemany("DELETE FROM jobs WHERE id=?", ids)
+            self._cond.notify_all()
+        if ids:
+            log.info(f"JobQueue({self.name}): {len(ids)} unfinished jobs discarded")
+        return len(ids)
+
+    def join(self):
+        """Blockiert, bis kein Job mehr pending oder running ist."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE queue=? AND state IN (?, ?)",
+                (self.name, PENDING, RUNNING)).fetchone()[0] == 0)
+
+    def close(self):
+        """Keine weiteren Jobs in diesem Durchgang: get() liefert None, sobald die Queue leer ist."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed = False
@@ -0,0 +1,278 @@
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+# own:
+from media_tools import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+#
+# Volltextsuche über die ganze Bibliothek (alle analysierten Ordner) mit SQLite FTS5.
+# Pro Datei und Feld (caption, transcript, persons, address, landmark) eine oder mehrere Zeilen,
+# Transkripte pro Whisper-Segment, damit der Treffer die Stelle im Audio/Video kennt.
+# Die Pipeline schreibt inkrementell: update() ersetzt nur die übergebenen Felder einer Datei.
+#
+SEARCH_DB = CACHE_DIR / "search.sqlite"
+FIELDS = ("caption", "transcript", "persons", "address", "landmark")
+DEFAULT_LIMIT = 50
+SNIPPET_TOKENS = 12
+HIGHLIGHT = ("[", "]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    path     TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    kind     TEXT NOT NULL DEFAULT '',
+    updated  REAL NOT NULL
+);
+-- Ein Segment = eine Zeile im FTS Index (gleiche rowid), hier mit Datei, Feld und Startzeit.
+-- Über den Index auf (file_id, field) lassen sich die Zeilen einer Datei ohne Scan des FTS Index ersetzen.
+CREATE TABLE IF NOT EXISTS segments (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id INTEGER NOT NULL,
+    field   TEXT NOT NULL,
+    start   REAL
+);
+CREATE INDEX IF NOT EXISTS segments_file ON segments (file_id, field);
+CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Zeichen mit Sonderbedeutung in der FTS5 Query-Syntax
+_FTS_SYNTAX = re.compile(r'["*:^()]|\b(AND|OR|NOT|NEAR)\b')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    path: str
+    kind: str
+    field: str
+    start: Optional[float]  # Sekunde im Audio/Video (nur Transkript-Segmente)
+    snippet: str
+    score: float
+
+
+def to_fts_query(text: str) -> str:
+    """
+    Freitext -> FTS5 Query: alle Wörter müssen vorkommen, das letzte auch als Präfix
+    ("strand son" findet "Strand Sonnenuntergang"). Enthält der Text bereits FTS5 Syntax
+    (Anführungszeichen, AND/OR/NOT, *), wird er unverändert verwendet.
+    """
+    if _FTS_SYNTAX.search(text):
+        return text
+    words = _WORD.findall(text)
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+def _segments(value) -> List[Tuple[Optional[float], str]]:
+    """Feldwert -> [(start, text)]: str, Liste/Set von Namen oder Whisper-Segmente."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [(None, value)] if value.strip() else []
+    if isinstance(value, (set, frozenset)):
+        value = sorted(value)
+    result = []
+    for item in value:
+        if isinstance(item, dict):  # Whisper: {"start": 1.2, "end": 3.4, "text": "..."}
+            text = str(item.get("text", "")).strip()
+            if text:
+                result.append((item.get("start"), text))
+        elif isinstance(item, (tuple, list)):  # (start, text) oder (start, end, text)
+            text = str(item[-1]).strip()
+            if text:
+                result.append((item[0], text))
+        elif str(item).strip():
+            result.append((None, str(item).strip()))
+    return result
+
+
+class SearchIndex:
+    """Thread-sicherer FTS5 Index (ein Connection-Objekt, Zugriffe über ein Lock)."""
+
+    def __init__(self, db_path: Path = SEARCH_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _file_id(self, path: str, kind: str, mtime_ns: int) -> int:
+        self._db.execute(
+            "INSERT INTO files (path, mtime_ns, kind, updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime_ns=excluded.mtime_ns, "
+            "kind=CASE WHEN excluded.kind != '' THEN excluded.kind ELSE files.kind END, updated=excluded.updated",
+            (path, mtime_ns, kind, time.time()))
+        return self._db.execute("SELECT id FROM files WHERE path=?", (path,)).fetchone()[0]
+
+    #
+    # Ersetzt die übergebenen Felder einer Datei, andere Felder bleiben stehen.
+    # Beispiel: update(p, kind="image", caption="A dog on a beach", address="Sylt")
+    #           update(p, transcript=[{"start": 0.0, "text": "Hallo"}, ...])
+    #
+    def update(self, path, kind: str = "", **fields):
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"unknown search fields: {sorted(unknown)}")
+        path = os.path.abspath(str(path))
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                file_id = self._file_id(path, kind, mtime_ns)
+                for field, value in fields.items():
+                    self._delete_segments(file_id, field)
+                    for start, text in _segments(value):
+                        cur = self._db.execute("INSERT INTO segments (file_id, field, start) VALUES (?, ?, ?)",
+                                               (file_id, field, start))
+                        self._db.execute("INSERT INTO media_fts (rowid, text) VALUES (?, ?)", (cur.lastrowid, text))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _delete_segments(self, file_id: int, field: str = None):
+        where, args = ("file_id=? AND field=?", (file_id, field)) if field else ("file_id=?", (file_id,))
+        self._db.execute(f"DELETE FROM media_fts WHERE rowid IN (SELECT id FROM segments WHERE {where})", args)
+        self._db.execute(f"DELETE FROM segments WHERE {where}", args)
+
+    def remove(self, path):
+        path = os.path.abspath(str(path))
+        with self._lock:
+            self._db.execute("BEGIN")
+            row = self._db.execute("SELECT id FROM files WHERE path=?", (path,)).fetchone()
+            if row:
+                self._delete_segments(row[0])
+                self._db.execute("DELETE FROM files WHERE id=?", (row[0],))
+            self._db.execute("COMMIT")
+
+    def is_current(self, path) -> bool:
+        """True, wenn die Datei seit dem letzten update() nicht geändert wurde."""
+        path = os.path.abspath(str(path))
+        with self._lock:
+            row = self._db.execute("SELECT mtime_ns FROM files WHERE path=?", (path,)).fetchone()
+        try:
+            return row is not None and row[0] == os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+
+    def has_field(self, path, field: str) -> bool:
+        """True, wenn für die Datei schon Text im Feld field indiziert ist."""
+        path = os.path.abspath(str(path))
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM segments s JOIN files f ON f.id = s.file_id "
+                                   "WHERE f.path=? AND s.field=? LIMIT 1", (path, field)).fetchone()
+        return row is not None
+
+    def search(self, text: str, limit: int = DEFAULT_LIMIT, fields: Sequence[str] = None,
+               folder=None) -> List[SearchHit]:
+        """Treffer nach Relevanz (bm25), pro Datei und Feld nur das beste Segment."""
+        query = to_fts_query(text)
+        if not query:
+            return []
+        sql = ("SELECT f.path, f.kind, s.field, s.start, "
+               "snippet(media_fts, 0, ?, ?, '…', ?) AS snip, bm25(media_fts) AS score "
+               "FROM media_fts JOIN segments s ON s.id = media_fts.rowid JOIN files f ON f.id = s.file_id "
+               "WHERE media_fts MATCH ?")
+        args: list = [HIGHLIGHT[0], HIGHLIGHT[1], SNIPPET_TOKENS, query]
+        if fields:
+            sql += f" AND s.field IN ({','.join('?' * len(fields))})"
+            args.extend(fields)
+        if folder:
+            sql += " AND f.path LIKE ? ESCAPE '\\'"
+            prefix = os.path.join(os.path.abspath(str(folder)), "")
+            args.append(prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        # etwas mehr holen, weil mehrere Segmente derselben Datei zusammengefasst werden
+        sql += " ORDER BY score LIMIT ?"
+        args.append(limit * 4)
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, args).fetchall()
+            except sqlite3.OperationalError as e:  # z.B. unvollständige FTS5 Syntax
+                log.warning(f"search({text!r}): {e}")
+                return []
+        hits, seen = [], set()
+        for path, kind, field, start, snip, score in rows:
+            if (path, field) in seen:
+                continue
+            seen.add((path, field))
+            hits.append(SearchHit(path, kind, field, start, snip, score))
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def optimize(self):
+        """FTS5 Segmente zusammenführen (nach großen Importen)."""
+        with self._lock:
+            self._db.execute("INSERT INTO media_fts(media_fts) VALUES ('optimize')")
+            self._db.execute("VACUUM")
+
+
+def format_start(start: Optional[float]) -> str:
+    if start is None:
+        return ""
+    return f"{int(start // 60)}:{int(start % 60):02d}"
+
+
+###########################################################
+# CLI:  python media_search.py "strand sonnenuntergang"
+#       python media_search.py --field persons Anna --folder D:/Fotos/2024
+###########################################################
+def main(argv: Iterable[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Full-text search over analysed media")
+    ap.add_argument("query", nargs="*", help="words (all must match, last one as prefix) or FTS5 syntax")
+    ap.add_argument("-n", "--limit", type=int, default=DEFAULT_LIMIT)
+    ap.add_argument("--field", action="append", choices=FIELDS, help="restrict to field (repeatable)")
+    ap.add_argument("--folder", help="only files below this folder")
+    ap.add_argument("--db", type=Path, default=SEARCH_DB)
+    ap.add_argument("--optimize", action="store_true", help="merge index segments and vacuum")
+    args = ap.parse_args(argv)
+
+    index = SearchIndex(args.db)
+    try:
+        if args.optimize:
+            index.optimize()
+        if not args.query:
+            print(f"{index.count()} files indexed in {args.db}")
+            return 0
+        start = time.perf_counter()
+        hits = index.search(" ".join(args.query), limit=args.limit, fields=args.field, folder=args.folder)
+        elapsed = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            at = f" @{format_start(hit.start)}" if hit.start is not None else ""
+            print(f"{hit.path}  [{hit.field}{at}]  {hit.snippet}")
+        print(f"{len(hits)} hits in {elapsed:.1f} ms", file=sys.stderr)
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import csv
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Pro Stufe werden die letzten SAMPLES_PER_STAGE Zeiten für p50/p95 aufbewahrt
+SAMPLES_PER_STAGE = 10000
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def _fmt_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+
+class _Stage:
+    __slots__ = ("count", "errors", "total", "max", "first_start", "last_end", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.first_start = None
+        self.last_end = None
+        self.samples = deque(maxlen=SAMPLES_PER_STAGE)
+
+
+class Stats:
+    """
+    Leichtgewichtige Laufzeit-Statistik der Media-Pipeline:
+     - stage(name): Context-Manager, misst die Dauer einer Stufe (ExifTool, ffprobe, BLIP, Whisper, ...)
+     - gauge(name, value): aktueller Wert, z.B. Queue-Länge
+     - summary(): count, p50, p95, max, items/sec je Stufe
+    Thread-sicher, Export als JSON/CSV am Ende eines Laufs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: dict[str, _Stage] = {}
+        self._gauges: dict[str, float] = {}
+        self.started = time.time()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._gauges = {}
+            self.started = time.time()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, start=start, failed=failed)
+
+    def record(self, name: str, seconds: float, start: float = None, failed: bool = False):
+        end = time.perf_counter()
+        with self._lock:
+            st = self._stages.get(name)
+            if st is None:
+                st = self._stages[name] = _Stage()
+            st.count += 1
+            st.errors += 1 if failed else 0
+            st.total += seconds
+            st.max = max(st.max, seconds)
+            st.samples.append(seconds)
+            if st.first_start is None:
+                st.first_start = start if start is not None else end - seconds
+            st.last_end = end
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def summary(self) -> dict:
+        with self._lock:
+            stages = {name: (st.count, st.errors, st.total, st.max, st.first_start, st.last_end, sorted(st.samples))
+                      for name, st in self._stages.items()}
+            gauges = dict(self._gauges)
+        result = {"elapsed_s": round(time.time() - self.started, 3), "stages": {}, "gauges": gauges}
+        for name, (count, errors, total, max_s, first, last, samples) in stages.items():
+            wall = (last - first) if first is not None and last is not None else 0.0
+            result["stages"][name] = {
+                "count": count,
+                "errors": errors,
+                "total_s": round(total, 4),
+                "mean_s": round(total / count, 4) if count else 0.0,
+                "p50_s": round(_percentile(samples, 50), 4),
+                "p95_s": round(_percentile(samples, 95), 4),
+                "max_s": round(max_s, 4),
+                "items_per_s": round(count / wall, 3) if wall > 0 else 0.0,
+            }
+        return result
+
+    #
+    # Kurzfassung für die Statuszeile der GUI: die teuersten Stufen und die Queue-Längen.
+    #
+    def status_line(self, top: int = 3) -> str:
+        summary = self.summary()
+        stages = sorted(summary["stages"].items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:top]
+        parts = [f"{name} p50 {_fmt_seconds(s['p50_s'])} p95 {_fmt_seconds(s['p95_s'])} ({s['count']})"
+                 for name, s in stages]
+        parts += [f"{name}={value:g}" for name, value in sorted(summary["gauges"].items())]
+        return " | ".join(parts)
+
+    def export_json(self, file_path: str):
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        log.info(f"Stats exported → {file_path}")
+
+    def export_csv(self, file_path: str):
+        summary = self.summary()
+        columns = ["count", "errors", "total_s", "mean_s", "p50_s", "p95_s", "max_s", "items_per_s"]
+        with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["stage"] + columns)
+            for name, s in sorted(summary["stages"].items()):
+                writer.writerow([name] + [s[c] for c in columns])
+            for name, value in sorted(summary["gauges"].items()):
+                writer.writerow([name] + [value] + [""] * (len(columns) - 1))
+        log.info(f"Stats exported → {file_path}")
+
+
+# Gemeinsame Instanz für alle Module
+STATS = Stats()
+
+
+def stage(name: str):
+    """Kurzform: with media_stats.stage("whisper.transcribe"): ..."""
+    return STATS.stage(name)
@@ -0,0 +1,341 @@
+import logging
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from tkinter import ttk, Scrollbar
+
+log = logging.getLogger(__name__)
+
+# Feldnamen der Records, Reihenfolge = Spalten der Tabelle
+FIELDS = ("File", "Type", "Date", "Lat", "Lon", "Length", "Address", "Landmark", "Persons", "Image", "Audio")
+HEADINGS = ("File", "Type", "Date", "Lat", "Lon", "Length", "Address", "Point of Interest", "Persons", "Image", "Audio")
+FIELD_INDEX = {name: idx for idx, name in enumerate(FIELDS)}
+# Attribute von MediaRecord je Feld
+FIELD_ATTR = {name: name.lower() for name in FIELDS}
+NUMERIC_FIELDS = ("Lat", "Lon", "Length")
+# GUI wird höchstens alle 100 ms aus dem RecordStore aktualisiert
+FLUSH_MS = 100
+DEFAULT_ROW_HEIGHT = 20
+
+
+###########################################################
+# Ein Analyse-Ergebnis. __slots__ statt dict: bei 100k+ Dateien
+# spart das pro Zeile das dict und die Schlüssel.
+# Lat, Lon und Length (Sekunden) sind float oder None,
+# formatiert wird erst für Anzeige und Export (format_values).
+###########################################################
+@dataclass(slots=True)
+class MediaRecord:
+    file: str = ""
+    type: str = ""
+    date: str = ""
+    lat: float | None = None
+    lon: float | None = None
+    length: float | None = None
+    address: str = ""
+    landmark: str = ""
+    persons: str = ""
+    image: str = ""
+    audio: str = ""
+
+    def values(self) -> tuple:
+        """Werte in FIELDS-Reihenfolge."""
+        return (self.file, self.type, self.date, self.lat, self.lon, self.length,
+                self.address, self.landmark, self.persons, self.image, self.audio)
+
+
+def _to_float(value) -> float | None:
+    if value in ("", None):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        log.debug(f"not a number: {value!r}")
+        return None
+
+
+def coerce(name: str, value):
+    """Wert für das Feld name in den Typ von MediaRecord bringen."""
+    if name in NUMERIC_FIELDS:
+        return _to_float(value)
+    if value is None:
+        return ""
+    if isinstance(value, (set, frozenset, list, tuple)):
+        return ", ".join(sorted(str(p) for p in value))
+    if name in ("Type", "Date"):  # wenige verschiedene Werte, nur einmal im Speicher
+        return sys.intern(str(value))
+    return value
+
+
+###########################################################
+# Formatiert eine Zeile für die Anzeige (Tabelle, Export)
+#  Lat/Lon: float -> 6 Nachkommastellen
+#  Length: Sekunden -> m:ss
+#  Persons: set -> "Anna, Bob"
+###########################################################
+def format_values(row) -> tuple:
+    values = list(row)
+    for name in ("Lat", "Lon"):
+        if isinstance(values[FIELD_INDEX[name]], float):
+            values[FIELD_INDEX[name]] = f"{values[FIELD_INDEX[name]]:.6f}"
+    length = values[FIELD_INDEX["Length"]]
+    if length not in ("", None):
+        try:
+            minutes: int = int(float(length) // 60)
+            seconds: int = int(float(length) % 60)
+            values[FIELD_INDEX["Length"]] = f"{minutes}:{seconds:02d}"
+        except (TypeError, ValueError):
+            values[FIELD_INDEX["Length"]] = str(length)
+    else:
+        values[FIELD_INDEX["Length"]] = ""
+    persons = values[FIELD_INDEX["Persons"]]
+    if isinstance(persons, (set, frozenset, list, tuple)):
+        values[FIELD_INDEX["Persons"]] = ", ".join(sorted(str(p) for p in persons))
+    return tuple("" if v is None else v for v in values)
+
+
+###########################################################
+# Sortierschlüssel je Spalte, aus den typisierten Werten:
+#  Zahlen numerisch (auch negative Koordinaten), Datum chronologisch,
+#  Dateinamen "natürlich" (IMG_2 vor IMG_10), sonst Text ohne Groß/Klein.
+# Leere Werte liefern None und stehen immer am Ende.
+###########################################################
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _number_key(value):
+    return value
+
+
+def _date_key(value: str):
+    if not value:
+        return None
+    # "2024:05:01 12:00:00" (EXIF) und "2024-05-01T12:00:00.000000Z" (ffprobe creation_time)
+    # wie "2024-05-01 12:00:00" behandeln: nur Datum und Uhrzeit, ohne Bruchteile und Zeitzone
+    return value[:10].replace(":", "-") + " " + value[11:19]
+
+
+def _natural_key(value: str):
+    if not value:
+        return None
+    return tuple(int(part) if idx % 2 else part.casefold() for idx, part in enumerate(_DIGITS.split(value)))
+
+
+def _text_key(value: str):
+    return value.casefold() if value else None
+
+
+SORT_KEYS = {"File": _natural_key, "Date": _date_key, "Lat": _number_key, "Lon": _number_key, "Length": _number_key}
+
+
+class RecordStore:
+    """
+    Kompakter, thread-sicherer Speicher der Analyse-Ergebnisse.
+    Jede Zeile ist ein MediaRecord, die Zeilennummer ist die item_id. Nach außen (append, update, get)
+    weiterhin dicts mit den Feldnamen aus FIELDS, values()/rows() liefern Tupel in FIELDS-Reihenfolge.
+    Worker-Threads schreiben nur hier hinein, die GUI holt sich die Änderungen per after()-Flush.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: list[MediaRecord] = []
+        self._order: list[int] = []  # Anzeige-Reihenfolge (Sortierung)
+        self.version: int = 0  # wird bei jeder Änderung hochgezählt
+        self._data_version: int = 0  # nur bei Datenänderungen (nicht beim Sortieren)
+        self._sort_cache: dict[str, tuple] = {}  # Feld -> (data_version, belegte item_ids aufsteigend, leere)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self):
+        with self._lock:
+            self._rows = []
+            self._order = []
+            self._sort_cache.clear()
+            self.version += 1
+            self._data_version += 1
+
+    def append(self, rec: dict) -> int:
+        row = MediaRecord(**{FIELD_ATTR[name]: coerce(name, value) for name, value in rec.items() if name in FIELD_ATTR})
+        with self._lock:
+            item_id = len(self._rows)
+            self._rows.append(row)
+            self._order.append(item_id)
+            self.version += 1
+            self._data_version += 1
+        return item_id
+
+    def update(self, item_id: int, rec: dict = None, **fields):
+        """Überschreibt die Felder aus rec und/oder fields (Feldname=Wert)."""
+        changes = dict(rec or {})
+        changes.update(fields)
+        changes = {FIELD_ATTR[name]: coerce(name, value) for name, value in changes.items() if name in FIELD_ATTR}
+        with self._lock:
+            row = self._rows[item_id]
+            for attr, value in changes.items():
+                setattr(row, attr, value)
+            self.version += 1
+            self._data_version += 1
+
+    def get(self, item_id: int) -> dict:
+        with self._lock:
+            return dict(zip(FIELDS, self._rows[item_id].values()))
+
+    def record(self, item_id: int) -> MediaRecord:
+        """Der MediaRecord selbst (nicht verändern, dafür update())."""
+        with self._lock:
+            return self._rows[item_id]
+
+    def values(self, item_id: int) -> tuple:
+        with self._lock:
+            return self._rows[item_id].values()
+
+    def order(self) -> list[int]:
+        with self._lock:
+            return list(self._order)
+
+    def set_order(self, order: list[int]):
+        with self._lock:
+            self._order = list(order)
+            self.version += 1
+
+    def sort(self, name: str, reverse: bool = False) -> list[int]:
+        """
+        Sortiert die Anzeige-Reihenfolge nach Feld name (siehe SORT_KEYS), leere Werte am Ende.
+        Die Reihenfolge je Feld wird bis zur nächsten Datenänderung gemerkt, Umdrehen kostet nur das Umkehren.
+        """
+        with self._lock:
+            cached = self._sort_cache.get(name)
+            if cached is None or cached[0] != self._data_version:
+                attr, key = FIELD_ATTR[name], SORT_KEYS.get(name, _text_key)
+                keys = [key(getattr(row, attr)) for row in self._rows]
+                filled = [i for i, k in enumerate(keys) if k is not None]
+                filled.sort(key=keys.__getitem__)
+                empty = [i for i, k in enumerate(keys) if k is None]
+                cached = (self._data_version, filled, empty)
+                self._sort_cache[name] = cached
+            _, filled, empty = cached
+            self._order = (filled[::-1] if reverse else filled) + empty
+            self.version += 1
+            return list(self._order)
+
+    def window(self, start: int, count: int) -> list[tuple[int, tuple]]:
+        """Liefert (item_id, values) der Zeilen start..start+count in Anzeige-Reihenfolge."""
+        with self._lock:
+            return [(i, self._rows[i].values()) for i in self._order[start:start + count]]
+
+    def rows(self) -> list[tuple]:
+        """Schnappschuss aller Zeilen in Anzeige-Reihenfolge."""
+        with self._lock:
+            return [self._rows[i].values() for i in self._order]
+
+    def iter_rows(self, chunk_size: int = 1000):
+        """Liefert alle Zeilen in Anzeige-Reihenfolge, jeweils chunk_size Zeilen pro Lock."""
+        start = 0
+        while True:
+            with self._lock:
+                chunk = [self._rows[i].values() for i in self._order[start:start + chunk_size]]
+            if not chunk:
+                return
+            yield from chunk
+            start += chunk_size
+
+    def sample(self, count: int) -> list[tuple]:
+        """Stichprobe: die ersten Zeilen plus gleichmäßig verteilte Zeilen aus dem Rest."""
+        with self._lock:
+            total = len(self._order)
+            if total <= count:
+                return [self._rows[i].values() for i in self._order]
+            head = count // 2
+            step = (total - head) / (count - head)
+            picks = list(range(head)) + [head + int(k * step) for k in range(count - head)]
+            return [self._rows[self._order[i]].values() for i in picks]
+
+
+class VirtualTable:
+    """
+    Virtuelle Liste über einem ttk.Treeview:
+    Im Treeview stehen nur die gerade sichtbaren Zeilen (iid = item_id im RecordStore),
+    die Scrollbar bildet die Position im gesamten RecordStore ab.
+    """
+
+    def __init__(self, tree: ttk.Treeview, vsb: Scrollbar, store: RecordStore, formatter=format_values):
+        self.tree = tree
+        self.vsb = vsb
+        self.store = store
+        self.formatter = formatter
+        self._top = 0
+        self._visible = int(tree.cget("height"))
+        self._rendered = None  # (version, top, visible) der letzten Darstellung
+
+        self.vsb.configure(command=self.yview)
+        self.tree.bind("<Configure>", self._on_configure, add="+")
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll(3))
+
+    @staticmethod
+    def item_id(iid) -> int:
+        return int(iid)
+
+    # Scrollbar-Kommando: ("moveto", fraction) oder ("scroll", n, "units"|"pages")
+    def yview(self, *args):
+        total = len(self.store)
+        if not args or not total:
+            return
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= max(1, self._visible - 1)
+            self._top += step
+        self.flush()
+
+    def _scroll(self, rows: int):
+        self._top += rows
+        self.flush()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self._scroll(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = DEFAULT_ROW_HEIGHT
+        # Abzüglich Kopfzeile
+        visible = max(1, (event.height - DEFAULT_ROW_HEIGHT) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self.flush()
+
+    def refresh(self):
+        """Erzwingt ein Neuzeichnen beim nächsten flush()."""
+        self._rendered = None
+        self.flush()
+
+    #
+    # Darf nur im Tk-Mainthread aufgerufen werden (z.B. aus root.after()).
+    # Zeichnet nur neu, wenn sich Daten oder Scroll-Position geändert haben.
+    #
+    def flush(self):
+        total = len(self.store)
+        self._top = max(0, min(self._top, total - self._visible))
+        state = (self.store.version, self._top, self._visible)
+        if state == self._rendered:
+            return
+        self._rendered = state
+
+        rows = self.store.window(self._top, self._visible)
+        self.tree.delete(*self.tree.get_children())
+        for item_id, values in rows:
+            self.tree.insert("", "end", iid=str(item_id), values=self.formatter(values))
+
+        if total:
+            self.vsb.set(self._top / total, (self._top + len(rows)) / total)
+        else:
+            self.vsb.set(0.0, 1.0)
@@ -1,25 +1,36 @@
 # media_tools.py
 import exifread
 import subprocess
+import csv
+import tempfile
+import threading
+import zlib
+import struct
+import xml.etree.ElementTree as ET
 import json
 import re
 import os
-import io
+import hashlib
 from pathlib import Path
 from datetime import datetime
 from dateutil import parser
 from moviepy.video.io.VideoFileClip import VideoFileClip  # <- korrigierter Import
 from math import radians, sin, cos, sqrt, atan2
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 import logging
 # Metadaten-Bibliotheken
-from PIL import Image  # Für JPEGs/PNGs (Exif)
+from PIL import Image, ExifTags  # Für JPEGs/PNGs (Exif)
 import exiftool  # Damit 'exiftool.exceptions' erkannt wird
 from exiftool import ExifToolHelper  # Bester Allrounder, erfordert separate ExifTool-Installation!
 from mutagen import File
 from mutagen.wave import WAVE
 from mutagen.mp3 import MP3
 from mutagen.id3 import ID3, APIC, ID3NoHeaderError, ID3Tags, COMM, ID3NoHeaderError, USLT
+# own:
+from media_stats import stage
 
 log = logging.getLogger(__name__)
 MEDIA_EXT = {
@@ -41,6 +52,8 @@ FILE_TAGS = {
 }
 DATE_FORMAT_STR = "%Y-%m-%d %H:%M:%S"
 DATE_EXIF_STR = "%Y:%m:%d %H:%M:%S"
+# Lokale Caches und Datenbanken des AI MediaAnalyzers (Job-Queue, ...)
+CACHE_DIR = Path.home() / ".cache" / "aimedia"
 
 ########################################
 # Find audio duration in the file
@@ -217,12 +230,244 @@ def get_meta_data_bundle(path: Path, meta_ai:dict, et_instance: object = None) -
     res["Landmark"] = meta_ai.get("Landmark")
     return res
 
+# ---------------- Header-only Bild-Metadaten ----------------
+#
+# Ein Leser für alle Bild-Metadaten (Datum, GPS, Orientierung, AI Tags aus XMP/IPTC):
+# liest den Dateikopf bis zum Start of Scan (in Blöcken zu HEADER_READ_BYTES), wertet die APP1 (Exif, XMP)
+# und APP13 (IPTC) Segmente aus und merkt sich das Ergebnis pro (Pfad, mtime, Größe).
+# _get_exif_data(), read_ai_metadata() und das Thumbnail in der GUI nutzen denselben Eintrag.
+#
+HEADER_READ_BYTES = 128 * 1024
+HEADER_CACHE_SIZE = 4096
+
+_EXIF_MAGIC = b"Exif\x00\x00"
+_XMP_MAGIC = b"http://ns.adobe.com/xap/1.0/\x00"
+_XMP_EXTENSION_MAGIC = b"http://ns.adobe.com/xmp/extension/\x00"  # Extended XMP: exiftool fügt zusammen
+_PHOTOSHOP_MAGIC = b"Photoshop 3.0\x00"
+# TIFF Feldtypen -> Bytes pro Wert
+_TIFF_TYPE_SIZE = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+_TAG_ORIENTATION = 0x0112
+_TAG_DATETIME = 0x0132
+_TAG_EXIF_IFD = 0x8769
+_TAG_GPS_IFD = 0x8825
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_DATETIME_DIGITIZED = 0x9004
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """Ergebnis von read_image_header(). parsed=False: kein JPEG bzw. nicht lesbar, Aufrufer nutzt den alten Weg."""
+    parsed: bool = False
+    date: str = ""  # DATE_FORMAT_STR
+    lat: float = None
+    lon: float = None
+    orientation: int = 1
+    address: str = ""
+    landmark: str = ""
+    caption: str = ""
+    transcript: str = ""
+    persons: str = ""
+    creator: str = ""
+
+def _tiff_ifd(data:bytes, offset:int, endian:str) -> Dict[int, Any]:
+    """Liest ein IFD aus dem TIFF-Block. Werte werden nur für die benötigten Typen dekodiert."""
+    entries = {}
+    if offset + 2 > len(data):
+        return entries
+    count = struct.unpack_from(endian + "H", data, offset)[0]
+    for i in range(count):
+        pos = offset + 2 + i * 12
+        if pos + 12 > len(data):
+            break
+        tag, typ, n = struct.unpack_from(endian + "HHI", data, pos)
+        size = _TIFF_TYPE_SIZE.get(typ)
+        if size is None:
+            continue
+        total = size * n
+        value_pos = pos + 8 if total <= 4 else struct.unpack_from(endian + "I", data, pos + 8)[0]
+        if value_pos + total > len(data):
+            continue
+        if typ == 2:
+            entries[tag] = data[value_pos:value_pos + total].split(b"\x00", 1)[0].decode("ascii", "ignore").strip()
+        elif typ == 3:
+            entries[tag] = struct.unpack_from(endian + "H" * n, data, value_pos)
+        elif typ in (4, 9):
+            entries[tag] = struct.unpack_from(endian + ("I" if typ == 4 else "i") * n, data, value_pos)
+        elif typ in (5, 10):
+            raw = struct.unpack_from(endian + ("I" if typ == 5 else "i") * (2 * n), data, value_pos)
+            entries[tag] = tuple((raw[k], raw[k + 1]) for k in range(0, len(raw), 2))
+    return entries
+
+def _gps_degrees(values) -> float | None:
+    try:
+        d, m, s = (num / den for num, den in values[:3])
+        return d + (m / 60.0) + (s / 3600.0)
+    except (ValueError, ZeroDivisionError, TypeError):
+        return None
+
+def _parse_exif(tiff:bytes) -> Dict[str, Any]:
+    result = {}
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return result
+    ifd0 = _tiff_ifd(tiff, struct.unpack_from(endian + "I", tiff, 4)[0], endian)
+    exif = _tiff_ifd(tiff, ifd0[_TAG_EXIF_IFD][0], endian) if _TAG_EXIF_IFD in ifd0 else {}
+    gps = _tiff_ifd(tiff, ifd0[_TAG_GPS_IFD][0], endian) if _TAG_GPS_IFD in ifd0 else {}
+
+    if _TAG_ORIENTATION in ifd0:
+        result["orientation"] = ifd0[_TAG_ORIENTATION][0]
+    # gleiche Priorität wie bisher mit exifread: DateTimeOriginal, DateTime, DateTimeDigitized
+    date_str = exif.get(_TAG_DATETIME_ORIGINAL) or ifd0.get(_TAG_DATETIME) or exif.get(_TAG_DATETIME_DIGITIZED)
+    if date_str:
+        try:
+            result["date"] = datetime.strptime(date_str, DATE_EXIF_STR).strftime(DATE_FORMAT_STR)
+        except ValueError:
+            log.debug(f"_parse_exif(): unparsable date {date_str}")
+    if 2 in gps and 4 in gps:
+        lat = _gps_degrees(gps[2])
+        lon = _gps_degrees(gps[4])
+        if lat is not None and lon is not None:
+            if gps.get(1, "N") != "N":
+                lat = -lat
+            if gps.get(3, "E") != "E":
+                lon = -lon
+            result["lat"] = lat
+            result["lon"] = lon
+    return result
+
+def _parse_xmp(packet:bytes) -> Dict[str, str]:
+    """Sammelt die XMP Properties nach lokalem Namen (Description, FullAddress, Transcript, ...)."""
+    props = {}
+    try:
+        root = ET.fromstring(packet.strip(b"\x00 \r\n\t"))
+    except ET.ParseError:
+        log.debug("_parse_xmp(): invalid XMP packet")
+        return props
+    for el in root.iter():
+        # simple Properties als Attribute von rdf:Description
+        for attr, value in el.attrib.items():
+            props.setdefault(attr.rsplit("}", 1)[-1], value)
+        name = el.tag.rsplit("}", 1)[-1]
+        if name in ("RDF", "Description", "Alt", "Bag", "Seq", "li", "xmpmeta"):
+            continue
+        items = [li.text.strip() for li in el.iter() if li.tag.endswith("}li") and li.text and li.text.strip()]
+        if items:
+            props.setdefault(name, ", ".join(items))
+        elif el.text and el.text.strip():
+            props.setdefault(name, el.text.strip())
+    return props
+
+def _parse_iptc_caption(segment:bytes) -> str:
+    """IPTC 2:120 Caption-Abstract aus dem Photoshop IRB (APP13)."""
+    pos = 0
+    while True:
+        pos = segment.find(b"8BIM\x04\x04", pos)
+        if pos < 0:
+            return ""
+        name_len = segment[pos + 6]
+        name_total = name_len + 1 + ((name_len + 1) % 2)  # Pascal-String, auf gerade Länge aufgefüllt
+        size_pos = pos + 6 + name_total
+        if size_pos + 4 > len(segment):
+            return ""
+        size = struct.unpack_from(">I", segment, size_pos)[0]
+        iim = segment[size_pos + 4:size_pos + 4 + size]
+        i = 0
+        while i + 5 <= len(iim) and iim[i] == 0x1C:
+            record, dataset, length = iim[i + 1], iim[i + 2], struct.unpack_from(">H", iim, i + 3)[0]
+            if record == 2 and dataset == 120:
+                return iim[i + 5:i + 5 + length].decode("utf-8", "replace").strip()
+            i += 5 + length
+        pos = size_pos
+
+@lru_cache(maxsize=HEADER_CACHE_SIZE)
+def _read_image_header_cached(path_str:str, mtime_ns:int, size:int) -> ImageHeader:
+    exif = {}
+    xmp = {}
+    iptc_caption = ""
+    with open(path_str, "rb") as f:
+        data = f.read(HEADER_READ_BYTES)
+        if data[:2] != b"\xff\xd8":
+            return ImageHeader(parsed=False)
+        pos = 2
+        while True:
+            if pos + 4 > len(data):  # weitere Segmente hinter dem gelesenen Kopf
+                more = f.read(HEADER_READ_BYTES)
+                if not more:
+                    break
+                data += more
+                continue
+            if data[pos] != 0xFF:
+                break
+            marker = data[pos + 1]
+            if marker == 0xFF:  # Füllbyte
+                pos += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                pos += 2
+                continue
+            if marker == 0xDA:  # Start of Scan: danach nur noch Bilddaten
+                break
+            length = struct.unpack_from(">H", data, pos + 2)[0]
+            if pos + 2 + length > len(data):
+                # Segment reicht über das Gelesene hinaus (z.B. APP1 nach großem APP2/ICC): Rest nachlesen
+                data += f.read(pos + 2 + length - len(data))
+                if pos + 2 + length > len(data):  # Datei abgeschnitten
+                    return ImageHeader(parsed=False)
+            segment = data[pos + 4:pos + 2 + length]
+            if marker == 0xE1 and segment.startswith(_XMP_EXTENSION_MAGIC):
+                return ImageHeader(parsed=False)  # Extended XMP: exiftool-Fallback
+            pos += 2 + length
+            if marker == 0xE1 and segment.startswith(_EXIF_MAGIC) and not exif:
+                try:
+                    exif = _parse_exif(segment[len(_EXIF_MAGIC):])
+                except struct.error:
+                    log.debug(f"read_image_header(): truncated Exif in {path_str}")
+            elif marker == 0xE1 and segment.startswith(_XMP_MAGIC):
+                xmp = _parse_xmp(segment[len(_XMP_MAGIC):])
+            elif marker == 0xED and segment.startswith(_PHOTOSHOP_MAGIC):
+                iptc_caption = _parse_iptc_caption(segment)
+
+    adr_mark = xmp.get("FullAddress") or xmp.get("Location") or ""
+    parts = adr_mark.split("|")
+    return ImageHeader(
+        parsed=True,
+        date=exif.get("date", ""),
+        lat=exif.get("lat"),
+        lon=exif.get("lon"),
+        orientation=exif.get("orientation", 1),
+        address=parts[0] if len(parts) > 0 else "",
+        landmark=parts[1] if len(parts) > 1 else "",
+        caption=xmp.get("description") or iptc_caption or "",
+        transcript=xmp.get("Transcript", ""),
+        persons=xmp.get("PersonInImage") or xmp.get("subject") or "",
+        creator=xmp.get("CreatorTool", ""),
+    )
+
+def read_image_header(path:Path) -> ImageHeader:
+    """Bild-Metadaten aus dem Dateikopf, gecacht pro (Pfad, mtime). Bei Fehlern ImageHeader(parsed=False)."""
+    try:
+        st = os.stat(path)
+        return _read_image_header_cached(str(path), st.st_mtime_ns, st.st_size)
+    except (OSError, ValueError, struct.error, IndexError):
+        log.exception(f"read_image_header({path}): ")
+        return ImageHeader(parsed=False)
+
 def _get_exif_data(path: Path) -> Dict[str, Any]:
     """
     Liest EXIF aus Bildern (Datum, GPS) und gibt Dict mit Schlüsseln:
     {'Date': str, 'Lat': float, 'Lon': float|''}
     """
     data = {"Date": "", "Lat": "", "Lon": "", "Length": "", "Address": "", "Landmark": ""}
+    header = read_image_header(path)
+    if header.parsed:
+        data["Date"] = header.date
+        if header.lat is not None and header.lon is not None:
+            data["Lat"] = f"{header.lat:.6f}"
+            data["Lon"] = f"{header.lon:.6f}"
+        return data
+    # Kein JPEG (z.B. PNG): exifread
     try:
         with open(path, 'rb') as f:
             tags = exifread.process_file(f, details=False)
@@ -334,9 +579,10 @@ def _get_video_metadata(path: Path) -> Dict[str, Any]:
     result = {"Date": "", "Lat": "", "Lon": "", "Length": "", "Address": "", "Landmark":""}
     # 1) Versuche moviepy für Dauer (falls moviepy funktioniert)
     try:
-        clip = VideoFileClip(path)
-        dur = float(clip.duration)
-        clip.close()
+        with stage("moviepy.duration"):
+            clip = VideoFileClip(path)
+            dur = float(clip.duration)
+            clip.close()
         result["Length"] = str(dur)
     except Exception:
         log.exception("_get_video_metadata() Exception clip")
@@ -349,7 +595,8 @@ def _get_video_metadata(path: Path) -> Dict[str, Any]:
             "ffprobe", "-v", "quiet", "-print_format", "json",
             "-show_format", "-show_streams", path
         ]
-        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
+        with stage("ffprobe"):
+            out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
         info = json.loads(out)
         # duration fallback from format
         fmt = info.get("format", {})
@@ -435,45 +682,112 @@ def haversine(lat1, lon1, lat2, lon2):
     a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
     return 2 * R * atan2(sqrt(a), sqrt(1 - a))
 
-def extract_mp3_front_cover(mp3_path: str) -> Image.Image | None:
-    base, _ = os.path.splitext(mp3_path)
-    log.debug(f"mp3_path={mp3_path}, base={base}")
-    out_name = f"{base}+cover.png"
-    if os.path.exists(out_name):
-        log.debug(f"Found file {out_name}")
-        return Image.open(out_name)
+###########################################################
+# MP3 Cover (ID3 APIC) einmal dekodieren und im Cover-Cache ablegen.
+# Dateiname = Hash des Bildinhalts: alle Titel eines Albums teilen sich eine Datei,
+# Bildbeschreibung und Gesichtssuche laufen so nur einmal pro Cover.
+###########################################################
+COVER_DIR = CACHE_DIR / "covers"
+COVER_CACHE_SIZE = 4096
+_COVER_EXT = {"image/jpeg": ".jpg", "image/jpg": ".jpg", "image/png": ".png", "image/gif": ".gif",
+              "image/webp": ".webp", "image/bmp": ".bmp"}
+
 
+@lru_cache(maxsize=COVER_CACHE_SIZE)
+def _mp3_cover_file_cached(path_str:str, mtime_ns:int, size:int) -> Path | None:
     try:
-        tags = ID3(mp3_path)
+        frames = ID3(path_str).getall("APIC")
+    except ID3NoHeaderError:
+        return None
     except Exception as e:
         log.error(f"Error reading ID3 tags: {e}")
         return None
+    # Front Cover (type 3) bevorzugt, sonst das erste Bild
+    tag = next((frame for frame in frames if frame.type == 3), frames[0] if frames else None)
+    if tag is None or not tag.data:
+        log.warning(f"{path_str} has no image")
+        return None
 
-    front = None
-    fallback = None
-    for tag in tags.values():
-        log.debug(f"Found tag {tag}")
-        if isinstance(tag, APIC):
-            log.debug(f"Found APIC tag with type {tag.type}")
-            if tag.type == 3:
-                front = tag
-                break
-            fallback = fallback or tag
-
-    tag = front or fallback
-    if not tag:
-        log.warning(f"{mp3_path} has no image")
+    digest = hashlib.blake2b(tag.data, digest_size=16).hexdigest()
+    ext = _COVER_EXT.get((tag.mime or "").lower())
+    if ext is None:  # MIME fehlt oder "-->" (Link): Format am Inhalt erkennen
+        ext = ".png" if tag.data[:8] == b"\x89PNG\r\n\x1a\n" else ".jpg"
+    out_path = COVER_DIR / f"{digest}{ext}"
+    if not out_path.exists():
+        # Bytes unverändert speichern (kein Dekodieren/Neukodieren), atomar per rename
+        COVER_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(tag.data)
+        os.replace(tmp_path, out_path)
+        log.debug(f"Write MP3 cover image to {out_path}")
+    return out_path
+
+
+def extract_mp3_cover_file(mp3_path) -> Path | None:
+    """Pfad des Covers im Cover-Cache (gemeinsam für gleiche Cover) oder None."""
+    try:
+        st = os.stat(mp3_path)
+    except OSError as e:
+        log.error(f"extract_mp3_cover_file({mp3_path}): {e}")
         return None
+    args = (os.path.abspath(str(mp3_path)), st.st_mtime_ns, st.st_size)
+    with stage("cover.extract"):
+        out_path = _mp3_cover_file_cached(*args)
+        if out_path is not None and not out_path.exists():
+            # Cover-Cache inzwischen gelöscht: die gemerkten Pfade sind ungültig, neu schreiben
+            _mp3_cover_file_cached.cache_clear()
+            out_path = _mp3_cover_file_cached(*args)
+        return out_path
 
+
+def extract_mp3_front_cover(mp3_path: str) -> Image.Image | None:
+    cover_path = extract_mp3_cover_file(mp3_path)
+    if cover_path is None:
+        return None
     try:
-        img = Image.open(io.BytesIO(tag.data))
-        log.debug(f"Write MP3 cover image to {out_name}")
-        img.save(out_name)
+        img = Image.open(cover_path)
+        img.load()
         return img
     except Exception as e:
         log.error(f"Error opening image: {e}")
         return None
 
+# ---------------- Thumbnails (Tooltip der Tabelle) ----------------
+THUMBNAIL_SIZE = (200, 200)
+_ORIENTATION_ROTATION = {3: 180, 6: 270, 8: 90}
+_TAG_ORIENTATION_NAME = next((key for key, value in ExifTags.TAGS.items() if value == 'Orientation'), None)
+
+
+def make_image_thumbnail(path:Path, size=THUMBNAIL_SIZE) -> Image.Image:
+    """Bild laden, laut EXIF-Orientierung drehen und verkleinern."""
+    img = Image.open(path)
+    # Orientierung aus EXIF (gecachter Dateikopf, bei PNG & Co. über PIL)
+    try:
+        header = read_image_header(path)
+        if header.parsed:
+            orientation = header.orientation
+        else:
+            exif = img.getexif()
+            orientation = exif.get(_TAG_ORIENTATION_NAME) if exif is not None else None
+        if orientation in _ORIENTATION_ROTATION:
+            img = img.rotate(_ORIENTATION_ROTATION[orientation], expand=True)
+    except Exception:
+        log.debug(f"make_image_thumbnail({path}): no orientation")
+    img.thumbnail(size)
+    return img
+
+
+def make_video_thumbnail(path, size=THUMBNAIL_SIZE) -> Image.Image:
+    """Frame aus der Mitte des Videos, verkleinert."""
+    clip = VideoFileClip(path)
+    try:
+        frame = clip.get_frame(clip.duration / 2)  # numpy array
+    finally:
+        clip.close()
+    img = Image.fromarray(frame)
+    img.thumbnail(size)
+    return img
+
 # ---------------- Hilfsfunktionen ----------------
 #
 # Speichert von einem Video alle <interval> Sekunden einen Frame als Bild
@@ -514,29 +828,54 @@ def assert_utf8(text: str) -> str:
         raise ValueError("Text is not valid UTF-8")
     return text
 
+#
+# ID3 Padding: Mutagen schreibt in-place (nur den Tag-Bereich am Dateianfang), solange
+# die neuen Tags in Tag + Padding passen. Sonst wird die ganze Datei neu geschrieben.
+# Beim ersten Wachsen wird deshalb reichlich Padding reserviert und danach nie verkleinert.
+#
+MP3_TAG_PADDING = 64 * 1024
+
+def _mp3_padding(info) -> int:
+    """Padding-Callback für ID3.save(): info.padding < 0 heißt, der Tag wächst über den reservierten Platz."""
+    if info.padding >= 0:
+        return info.padding  # passt: vorhandenes Padding unverändert weiterverwenden (in-place)
+    # Reserve für ein ähnlich großes Update (z.B. neues Transkript) plus Grundreserve
+    return MP3_TAG_PADDING + (-info.padding)
+
+def _set_id3_frame(tags, frame) -> bool:
+    """Setzt den Frame nur, wenn sich der Text ändert. Gibt True zurück, wenn geändert wurde."""
+    old = tags.get(frame.HashKey)
+    if old is not None and list(old.text) == list(frame.text):
+        return False
+    tags.add(frame)
+    return True
+
 def write_mp3_metadata(path: Path, image2text: str, transcript: str):
     log.info(f"Writing AI metadata to {path}")
     atime, mtime = _preserve_file_times(path)
 
     # Lade die MP3-Datei
-    try:
-        audio = MP3(path, ID3=ID3)
-    except ID3NoHeaderError:
+    audio = MP3(path, ID3=ID3)
+    if audio.tags is None:
         # Wenn die Datei keinen ID3-Header hat, erstelle einen neuen
         audio.add_tags()
 
-    # Setze die Tags
+    # Setze alle Frames, gespeichert wird einmal am Ende
+    changed = False
     if image2text:
-        audio.tags.add(COMM(encoding=3, lang='eng', desc='Comment', text=image2text))  # Comment
+        changed |= _set_id3_frame(audio.tags, COMM(encoding=3, lang='eng', desc='Comment', text=image2text))  # Comment
     if transcript:
-        audio.tags.add(USLT(encoding=3, lang='eng', desc='Lyrics', text=transcript))   # Lyrics
-        audio.tags.add(USLT(encoding=3, lang='eng', desc='UnsynchronizedLyrics', text=transcript))  # UnsynchronizedLyrics
+        changed |= _set_id3_frame(audio.tags, USLT(encoding=3, lang='eng', desc='Lyrics', text=transcript))   # Lyrics
+        changed |= _set_id3_frame(audio.tags, USLT(encoding=3, lang='eng', desc='UnsynchronizedLyrics', text=transcript))  # UnsynchronizedLyrics
         # XMP-aimedia:Transcript wird in MP3 nicht unterstützt, dafür könntest du das als Kommentar umsetzen
-        audio.tags.add(COMM(encoding=3, lang='eng', desc='Transcript', text=transcript))  # Transcript
+        changed |= _set_id3_frame(audio.tags, COMM(encoding=3, lang='eng', desc='Transcript', text=transcript))  # Transcript
 
-    # Speichere die Änderungen
-    audio.save()
-    _restore_file_times(path, atime, mtime)
+    # Speichere die Änderungen (in-place, solange das Padding reicht)
+    if changed:
+        audio.save(padding=_mp3_padding)
+        _restore_file_times(path, atime, mtime)
+    else:
+        log.debug(f"write_mp3_metadata(): {path} unchanged, nothing written")
 
 def delete_mp3_metadata(path: Path):
     log.info(f"Deleting AI metadata from {path}")
@@ -558,10 +897,49 @@ def delete_mp3_metadata(path: Path):
         if 'COMM::Transcript' in audio.tags:
             del audio.tags['COMM::Transcript']  # Löscht das Transcript
 
-    # Speichere die Änderungen
-    audio.save()
+    # Speichere die Änderungen, frei gewordener Platz bleibt als Padding erhalten (in-place)
+    audio.save(padding=_mp3_padding)
     _restore_file_times(path, atime, mtime)
 
+#
+# Liefert die zu schreibenden AI Tags {Tag: Wert} für Bilder und Videos.
+# (Audio wird mit Mutagen geschrieben, siehe write_mp3_metadata)
+#
+def _ai_metadata_tags(kind:str, address: str = "", landmark:str = "", image2text: str ="", transcript: str = "", persons:set = "") -> Dict[str, str]:
+    transcript = assert_utf8(transcript)
+    image2text = assert_utf8(image2text)
+    address = assert_utf8(address)
+    landmark = assert_utf8(landmark)
+    adr_mark = f"{address}|{landmark}"
+    tags = {"XMP:CreatorTool": "AI MediaAnalyzer AI"}
+    if kind == "image":
+        if adr_mark and adr_mark != "<error>":
+            tags["XMP:Location"] = adr_mark
+            tags["XMP:FullAddress"] = adr_mark
+        if image2text:
+            tags["XMP:Description"] = image2text
+            tags["IPTC:Caption-Abstract"] = image2text
+        if transcript and transcript != "<error>":
+            tags["XMP:Transcript"] = transcript  # sollte leer sein
+        if persons:
+            tags["XMP-dc:subject"] = f"{persons}"
+            tags["XMP:Iptc4xmpExt:PersonInImage"] = f"{persons}"
+    elif kind == "video":
+        if adr_mark and adr_mark != "<error>":
+            tags["XMP:Location"] = adr_mark
+            tags["QuickTime:LocationName"] = adr_mark
+            tags["XMP:FullAddress"] = adr_mark
+        if image2text:
+            tags["QuickTime:Description"] = image2text
+            tags["XMP:Description"] = image2text
+        if transcript:
+            tags["XMP-iptcExt:Transcript"] = transcript # Profi Transcript
+            tags["XMP:Transcript"] = transcript # Transcript
+        if persons:
+            tags["XMP-dc:subject"] = f"{persons}"
+            tags["XMP:Iptc4xmpExt:PersonInImage"] = f"{persons}"
+    return tags
+
 #
 # Schreibe AI Metadaten (Bildschreibung, ...) ins Video-File.
 def write_ai_metadata(
@@ -570,15 +948,6 @@ def write_ai_metadata(
     log.info(f"Writing ai metadata to {path}")
     kind:str = get_kind_of_media(path)
     atime, mtime = _preserve_file_times(path)
-    transcript = assert_utf8(transcript)
-    image2text = assert_utf8(image2text)
-    address = assert_utf8(address)
-    landmark = assert_utf8(landmark)
-    adr_mark = f"{address}|{landmark}"
-    args = [
-            "-charset",
-            "utf8" ]
-    args.append( "-XMP:CreatorTool=AI MediaAnalyzer AI")
     if kind == "audio":
         # exiftool unterstützt Schreiben von MP3 nicht, daher separate Funktion:
         #args.append(f"-Comment={image2text}")     # Cover Bild Beschreibung
@@ -588,32 +957,11 @@ def write_ai_metadata(
 
         write_mp3_metadata(path, image2text, transcript)
     else:
-        if kind == "image":
-            if adr_mark and adr_mark != "<error>":
-                args.append(f"-XMP:Location={adr_mark}")
-                args.append(f"-XMP:FullAddress={adr_mark}")
-            if image2text:
-                args.append(f"-XMP:Description={image2text}")
-                args.append(f"-IPTC:Caption-Abstract={image2text}")
-            if transcript and transcript != "<error>":
-                args.append(f"-XMP:Transcript={transcript}")  # sollte leer sein
-            if persons:
-                args.append(f"-XMP-dc:subject={persons}")
-                args.append(f"-XMP:Iptc4xmpExt:PersonInImage={persons}")
-        elif kind == "video":
-            if adr_mark and adr_mark != "<error>":
-                args.append(f"-XMP:Location={adr_mark}")
-                args.append(f"-QuickTime:LocationName={adr_mark}")
-                args.append(f"-XMP:FullAddress={adr_mark}")
-            if image2text:
-                args.append(f"-QuickTime:Description={image2text}")
-                args.append(f"-XMP:Description={image2text}")
-            if transcript:
-                args.append(f"-XMP-iptcExt:Transcript={transcript}") # Profi Transcript
-                args.append(f"-XMP:Transcript={transcript}") # Transcript
-            if persons:
-                args.append(f"-XMP-dc:subject={persons}")
-                args.append(f"-XMP:Iptc4xmpExt:PersonInImage={persons}")
+        tags = _ai_metadata_tags(kind, address, landmark, image2text, transcript, persons)
+        args = [
+            "-charset",
+            "utf8" ]
+        args += [f"-{tag}={value}" for tag, value in tags.items()]
         try:
             if et is None:
                 with ExifToolHelper(encoding="utf-8") as et:
@@ -640,10 +988,22 @@ def write_ai_metadata(
 #
 
 def read_ai_metadata(path: Path, et) -> dict:
+    kind: str = get_kind_of_media(path)
+    if kind == "image":
+        # JPEG: AI Tags aus dem gecachten Dateikopf, ohne exiftool-Aufruf
+        header = read_image_header(path)
+        if header.parsed:
+            return {
+                "Address": header.address,
+                "Landmark": header.landmark,
+                "caption": header.caption,
+                "transcript": header.transcript,
+                "creator": header.creator
+            }
+
     # Hinweis: Stelle sicher, dass et.execute_json mit dem Parameter "-G1" aufgerufen wurde
     meta_list = et.execute_json("-G1", "-s", str(path))
     meta = meta_list[0] if meta_list else {}
-    kind: str = get_kind_of_media(path)
 
     # Initialisierung der Variablen
     address = ""
@@ -688,6 +1048,24 @@ def read_ai_metadata(path: Path, et) -> dict:
         "creator": meta.get("XMP:CreatorTool") or meta.get("Info:CreatorTool") or ""
     }
 
+# Löscht alle AI Tags, die write_ai_metadata() schreibt.
+AI_DELETE_ARGS = (
+    "-ID3:Comment=",
+    "-File:Comment=",
+    "-ID3:Lyrics=",
+    "-ID3:UnsynchronizedLyrics=",
+    "-XMP:FullAddress=",
+    "-XMP:Location=",
+    "-XMP:Description=",
+    "-XMP-aimedia:Transcript=",
+    "-IPTC:Caption-Abstract=",
+    "-XMP:FullAddress=",
+    "-QuickTime:LocationName=",
+    "-QuickTime:Description=",
+    "-XMP-iptcExt:Transcript=",
+    "-XMP:Transcript=",
+)
+
 def delete_ai_metadata(path: Path, et):
     kind = get_kind_of_media(path)
     log.info(f"delete_ai_metadata(): {path}")
@@ -695,23 +1073,7 @@ def delete_ai_metadata(path: Path, et):
         delete_mp3_metadata(path)
     else:
         atime, mtime = _preserve_file_times(path)
-        et.execute(
-            "-ID3:Comment=",
-            "-File:Comment=",
-            "-ID3:Lyrics=",
-            "-ID3:UnsynchronizedLyrics=",
-            "-XMP:FullAddress=",
-            "-XMP:Location=",
-            "-XMP:Description=",
-            "-XMP-aimedia:Transcript=",
-            "-IPTC:Caption-Abstract=",
-            "-XMP:FullAddress=",
-            "-QuickTime:LocationName=",
-            "-QuickTime:Description=",
-            "-XMP-iptcExt:Transcript=",
-            "-XMP:Transcript=",
-            path
-        )
+        et.execute(*AI_DELETE_ARGS, path)
         _restore_file_times(path, atime, mtime)
         file_orig: Path = Path(f"{path}_original")
         log.debug(f"path: {path}")
@@ -720,3 +1082,237 @@ def delete_ai_metadata(path: Path, et):
             file_orig.unlink()
 
 
+# ---------------- Bulk Write-Back ----------------
+#
+# Statt eines exiftool-Aufrufs pro Datei werden viele Dateien pro Aufruf geschrieben:
+#  - Dateien mit identischen Tags: ein Aufruf "-Tag=Wert ... datei1 datei2 ..."
+#  - alle übrigen Dateien: CSV-Import "-csv=tags.csv datei1 datei2 ..."
+# -overwrite_original erspart das Aufräumen der *_original Dateien,
+# atime/mtime werden vorher gemerkt und danach wiederhergestellt.
+#
+BULK_CHUNK_SIZE = 500
+
+def _chunks(items:list, size:int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _execute_bulk(et, args:list, paths:List[Path]) -> List[Tuple[Path, str]]:
+    """
+    Führt einen exiftool-Aufruf für viele Dateien aus und stellt die Filezeiten wieder her.
+    Schlägt der Sammelaufruf fehl, werden die Dateien einzeln geschrieben, damit nur
+    die wirklich fehlerhaften Dateien als Fehler gemeldet werden.
+    Gibt die Liste der Fehler [(path, message)] zurück.
+    """
+    failures = []
+    times = {}
+    for path in paths:
+        try:
+            times[path] = _preserve_file_times(path)
+        except OSError as e:
+            failures.append((path, str(e)))
+    paths = [path for path in paths if path in times]
+    if not paths:
+        return failures
+    et._encoding = "utf-8"
+    try:
+        with stage("exiftool.write"):
+            et.execute("-charset", "utf8", "-overwrite_original", *args, *[str(path) for path in paths])
+    except exiftool.exceptions.ExifToolExecuteError as e:
+        if len(paths) == 1:
+            log.error(f"ExifTool Error: {e.stderr}")
+            failures.append((paths[0], str(e.stderr).strip()))
+        else:
+            log.warning(f"_execute_bulk(): bulk write of {len(paths)} files failed, retrying one by one.")
+            for path in paths:
+                failures += _execute_bulk(et, args, [path])
+    finally:
+        for path, (atime, mtime) in times.items():
+            try:
+                _restore_file_times(path, atime, mtime)
+            except OSError:
+                log.exception(f"_execute_bulk(): cannot restore file times of {path}")
+    return failures
+
+def _write_tags_csv(csv_path:Path, rows:List[Tuple[Path, Dict[str, str]]]):
+    """CSV für 'exiftool -csv=...': Spalte SourceFile + eine Spalte pro Tag. Leere Felder werden nicht geschrieben."""
+    columns = []
+    for _, tags in rows:
+        for tag in tags:
+            if tag not in columns:
+                columns.append(tag)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["SourceFile"] + columns)
+        for path, tags in rows:
+            writer.writerow([str(path)] + [tags.get(tag, "") for tag in columns])
+
+def write_ai_metadata_bulk(jobs:List[Dict[str, Any]], et, chunk_size:int = BULK_CHUNK_SIZE, progress=None) -> List[Tuple[Path, str]]:
+    """
+    Schreibt AI Metadaten für viele Dateien mit wenigen exiftool-Aufrufen.
+    jobs: [{"path": Path, "address": .., "landmark": .., "image2text": .., "transcript": .., "persons": ..}]
+    progress: optionaler Callback progress(done:int, total:int)
+    Gibt die Liste der Fehler [(path, message)] zurück.
+    """
+    total = len(jobs)
+    done = 0
+    failures = []
+    groups: Dict[tuple, List[Path]] = {}
+    for job in jobs:
+        path = Path(job["path"])
+        kind = get_kind_of_media(path)
+        try:
+            if kind == "audio":
+                write_mp3_metadata(path, job.get("image2text", ""), job.get("transcript", ""))
+                done += 1
+                if progress:
+                    progress(done, total)
+                continue
+            tags = _ai_metadata_tags(kind, job.get("address", ""), job.get("landmark", ""),
+                                     job.get("image2text", ""), job.get("transcript", ""), job.get("persons", ""))
+        except Exception as e:
+            log.exception(f"write_ai_metadata_bulk(): {path}")
+            failures.append((path, str(e)))
+            done += 1
+            if progress:
+                progress(done, total)
+            continue
+        groups.setdefault(tuple(tags.items()), []).append(path)
+
+    # 1) Identische Tag-Sets: ein Aufruf für alle Dateien der Gruppe
+    singles: List[Tuple[Path, Dict[str, str]]] = []
+    for tag_items, paths in groups.items():
+        if len(paths) == 1:
+            singles.append((paths[0], dict(tag_items)))
+            continue
+        args = [f"-{tag}={value}" for tag, value in tag_items]
+        for chunk in _chunks(paths, chunk_size):
+            failures += _execute_bulk(et, args, chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+
+    # 2) Individuelle Tags: CSV-Import, ein Aufruf pro Chunk
+    if singles:
+        with tempfile.TemporaryDirectory(prefix="aimedia_") as tmp_dir:
+            csv_path = Path(tmp_dir) / "tags.csv"
+            for chunk in _chunks(singles, chunk_size):
+                _write_tags_csv(csv_path, chunk)
+                failures += _execute_bulk(et, [f"-csv={csv_path}"], [path for path, _ in chunk])
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+
+    log.info(f"write_ai_metadata_bulk(): {total} files, {len(failures)} failures")
+    return failures
+
+def delete_ai_metadata_bulk(paths:List[Path], et, chunk_size:int = BULK_CHUNK_SIZE, progress=None) -> List[Tuple[Path, str]]:
+    """Löscht die AI Tags vieler Dateien. Alle Nicht-Audio-Dateien teilen dasselbe Tag-Set."""
+    total = len(paths)
+    done = 0
+    failures = []
+    others = []
+    for path in paths:
+        path = Path(path)
+        if get_kind_of_media(path) == "audio":
+            try:
+                delete_mp3_metadata(path)
+            except Exception as e:
+                log.exception(f"delete_ai_metadata_bulk(): {path}")
+                failures.append((path, str(e)))
+            done += 1
+            if progress:
+                progress(done, total)
+        else:
+            others.append(path)
+    for chunk in _chunks(others, chunk_size):
+        failures += _execute_bulk(et, list(AI_DELETE_ARGS), chunk)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+    log.info(f"delete_ai_metadata_bulk(): {total} files, {len(failures)} failures")
+    return failures
+
+# ---------------- Paralleler Write-Back ----------------
+#
+# Ein exiftool-Prozess nutzt nur einen CPU-Kern. Für große Bibliotheken werden die
+# Dateien deshalb auf mehrere ExifToolHelper-Prozesse verteilt (je ein Thread pro Prozess).
+# Die Verteilung erfolgt nach Pfad: eine Datei landet immer im selben Shard, und
+# _FILE_CLAIMS verhindert, dass zwei gleichzeitige Läufe dieselbe Datei schreiben.
+#
+MIN_FILES_PER_SHARD = 50
+
+class _FileClaims:
+    """Prozessweite Liste der Dateien, die gerade von exiftool/mutagen geschrieben werden."""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._busy = set()
+
+    def claim(self, paths):
+        keys = {os.path.normcase(os.path.abspath(str(p))) for p in paths}
+        with self._cond:
+            self._cond.wait_for(lambda: not (keys & self._busy))
+            self._busy |= keys
+        return keys
+
+    def release(self, keys):
+        with self._cond:
+            self._busy -= keys
+            self._cond.notify_all()
+
+_FILE_CLAIMS = _FileClaims()
+
+def _shard(items:list, key, shards:int) -> List[list]:
+    """Verteilt items stabil nach key(item) auf <shards> Listen, doppelte Pfade nur einmal (letzter gewinnt)."""
+    unique = {}
+    for item in items:
+        unique[os.path.normcase(os.path.abspath(str(key(item))))] = item
+    result = [[] for _ in range(shards)]
+    for norm_path, item in unique.items():
+        result[zlib.crc32(norm_path.encode("utf-8")) % shards].append(item)
+    return [shard for shard in result if shard]
+
+def _pool_size(count:int, pool_size:int = None) -> int:
+    pool_size = pool_size or os.cpu_count() or 1
+    return max(1, min(pool_size, -(-count // MIN_FILES_PER_SHARD)))
+
+def _run_sharded(bulk_func, items:list, key, pool_size:int = None, progress=None) -> List[Tuple[Path, str]]:
+    """Führt bulk_func(shard, et, progress=...) je Shard in einem eigenen exiftool-Prozess aus."""
+    if not items:
+        return []
+    shards = _shard(items, key, _pool_size(len(items), pool_size))
+    total = sum(len(shard) for shard in shards)
+    done_per_shard = [0] * len(shards)
+    progress_lock = threading.Lock()
+
+    def _shard_progress(idx:int, done:int):
+        with progress_lock:
+            done_per_shard[idx] = done
+            done_all = sum(done_per_shard)
+        if progress:
+            progress(done_all, total)
+
+    def _worker(idx:int, shard:list) -> List[Tuple[Path, str]]:
+        keys = _FILE_CLAIMS.claim(key(item) for item in shard)
+        try:
+            with ExifToolHelper(encoding="utf-8") as et:
+                return bulk_func(shard, et, progress=lambda done, _total: _shard_progress(idx, done))
+        except Exception as e:
+            log.exception(f"_run_sharded(): shard {idx} failed")
+            return [(Path(key(item)), str(e)) for item in shard]
+        finally:
+            _FILE_CLAIMS.release(keys)
+
+    log.info(f"_run_sharded(): {total} files on {len(shards)} exiftool processes")
+    failures = []
+    with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="ExifToolPool") as executor:
+        for shard_failures in executor.map(_worker, range(len(shards)), shards):
+            failures += shard_failures
+    return failures
+
+def write_ai_metadata_parallel(jobs:List[Dict[str, Any]], pool_size:int = None, progress=None) -> List[Tuple[Path, str]]:
+    """Wie write_ai_metadata_bulk(), verteilt auf mehrere exiftool-Prozesse."""
+    return _run_sharded(write_ai_metadata_bulk, jobs, lambda job: job["path"], pool_size, progress)
+
+def delete_ai_metadata_parallel(paths:List[Path], pool_size:int = None, progress=None) -> List[Tuple[Path, str]]:
+    """Wie delete_ai_metadata_bulk(), verteilt auf mehrere exiftool-Prozesse."""
+    return _run_sharded(delete_ai_metadata_bulk, paths, lambda path: path, pool_size, progress)
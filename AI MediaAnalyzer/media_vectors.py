@@ -0,0 +1,253 @@
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+# own:
+from media_tools import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+#
+# Embeddings (CLIP, L2-normiert) aller Bilder und Video-Keyframes als float16 Matrix auf der Platte.
+# Die Matrix wird per np.memmap gelesen: 100k x 512 float16 = 100 MB, das OS hält nur die
+# gerade benötigten Seiten im RAM. Ähnlichkeit = Skalarprodukt (Kosinus, weil normiert).
+#
+# Dateien pro Modell in CACHE_DIR/vectors/<modell>/:
+#   vectors.f16  Rohdaten, Zeile i = Embedding von keys[i] (Kapazität wächst in Stufen)
+#   keys.txt     ein Schlüssel pro Zeile: Pfad oder "Pfad#t=<Sekunde>" für Keyframes
+#   meta.json    Modell und Dimension
+#
+VECTORS_DIR = CACHE_DIR / "vectors"
+GROW_ROWS = 4096        # Kapazität wächst mindestens um so viele Zeilen
+SEARCH_CHUNK = 65536    # Zeilen pro Matrixmultiplikation bei der Suche
+DUP_BLOCK = 2048        # Zeilen-Block bei der Duplikatsuche (Block x Chunk float32 im RAM)
+DUP_CHUNK = 16384
+DUP_THRESHOLD = 0.95
+
+_KEY_TIME = re.compile(r"#t=[\d.]+$")
+
+
+def frame_key(path, t: float) -> str:
+    """Schlüssel eines Video-Keyframes."""
+    return f"{os.path.abspath(str(path))}#t={t:.1f}"
+
+
+def key_path(key: str) -> str:
+    """Dateipfad zu einem Schlüssel (ohne Keyframe-Zeit)."""
+    return _KEY_TIME.sub("", key)
+
+
+def _model_dir_name(model_name: str) -> str:
+    return re.sub(r"[^\w.-]+", "--", model_name)
+
+
+class VectorStore:
+    """Thread-sicherer, memory-mapped Embedding-Speicher. add() überschreibt vorhandene Schlüssel."""
+
+    def __init__(self, model_name: str, dim: int, root: Path = VECTORS_DIR):
+        self.model_name = model_name
+        self.dim = dim
+        self.dir = Path(root) / _model_dir_name(model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._vec_file = self.dir / "vectors.f16"
+        self._key_file = self.dir / "keys.txt"
+        self._lock = threading.Lock()
+
+        meta_file = self.dir / "meta.json"
+        if meta_file.exists():
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            if meta.get("dim") != dim:
+                raise ValueError(f"{self.dir}: dimension {meta.get('dim')} != {dim}")
+        else:
+            meta_file.write_text(json.dumps({"model": model_name, "dim": dim}), encoding="utf-8")
+
+        self.keys: List[str] = []
+        if self._key_file.exists():
+            self.keys = self._key_file.read_text(encoding="utf-8").splitlines()
+        self._rows: Dict[str, int] = {key: row for row, key in enumerate(self.keys)}
+        capacity = self._vec_file.stat().st_size // (2 * dim) if self._vec_file.exists() else 0
+        if capacity < len(self.keys):  # Abbruch zwischen keys.txt und vectors.f16
+            log.warning(f"{self.dir}: {len(self.keys) - capacity} keys without vector dropped.")
+            self.keys = self.keys[:capacity]
+            self._rows = {key: row for row, key in enumerate(self.keys)}
+            self._key_file.write_text("".join(k + "\n" for k in self.keys), encoding="utf-8")
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._open(max(capacity, GROW_ROWS))
+
+    @classmethod
+    def open_existing(cls, model_name: str, root: Path = VECTORS_DIR) -> Optional["VectorStore"]:
+        """Vorhandenen Speicher ohne das Modell öffnen (Dimension aus meta.json), None wenn es keinen gibt."""
+        meta_file = Path(root) / _model_dir_name(model_name) / "meta.json"
+        if not meta_file.exists():
+            return None
+        dim = json.loads(meta_file.read_text(encoding="utf-8"))["dim"]
+        return cls(model_name, dim, root)
+
+    def _open(self, capacity: int):
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self._vec_file, "ab") as f:
+            if f.tell() < capacity * 2 * self.dim:
+                f.truncate(capacity * 2 * self.dim)
+        self._matrix = np.memmap(self._vec_file, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Belegte Zeilen (float16, memory-mapped, nur lesen)."""
+        return self._matrix[:len(self.keys)]
+
+    def add(self, key: str, vector: np.ndarray):
+        self.add_many([key], np.asarray(vector).reshape(1, -1))
+
+    def add_many(self, keys: List[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(keys), self.dim):
+            raise ValueError(f"expected {(len(keys), self.dim)} vectors, got {vectors.shape}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+        with self._lock:
+            new_keys = []
+            for key, vec in zip(keys, vectors):
+                row = self._rows.get(key)
+                if row is None:
+                    row = len(self.keys)
+                    if row >= self._capacity:
+                        self._open(max(self._capacity * 2, self._capacity + GROW_ROWS))
+                    self.keys.append(key)
+                    self._rows[key] = row
+                    new_keys.append(key)
+                self._matrix[row] = vec
+            # Erst die Vektoren, dann die Schlüssel schreiben: nach einem Absturz fehlen höchstens Schlüssel.
+            self._matrix.flush()
+            if new_keys:
+                with open(self._key_file, "a", encoding="utf-8") as f:
+                    f.write("".join(k + "\n" for k in new_keys))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        return None if row is None else np.asarray(self._matrix[row], dtype=np.float32)
+
+    #
+    # Top-k nach Kosinus-Ähnlichkeit. Die Matrix wird in Blöcken zu float32 gewandelt und multipliziert,
+    # pro Block bleiben nur die k besten Kandidaten (argpartition, ohne vollständiges Sortieren).
+    #
+    def search(self, query: np.ndarray, k: int = 20, per_file: bool = True) -> List[Tuple[str, float]]:
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        with self._lock:
+            count = len(self.keys)
+            matrix = self._matrix[:count]
+        if count == 0:
+            return []
+        # Keyframes: mehrere Treffer pro Video möglich, daher großzügiger vorauswählen
+        want = min(count, k * 8 if per_file else k)
+        best_rows, best_scores = [], []
+        for start in range(0, count, SEARCH_CHUNK):
+            block = np.asarray(matrix[start:start + SEARCH_CHUNK], dtype=np.float32)
+            scores = block @ query
+            if len(scores) > want:
+                idx = np.argpartition(scores, -want)[-want:]
+            else:
+                idx = np.arange(len(scores))
+            best_rows.append(idx + start)
+            best_scores.append(scores[idx])
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(-scores)
+
+        hits, seen = [], set()
+        for i in order:
+            key = self.keys[rows[i]]
+            if per_file:
+                path = key_path(key)
+                if path in seen:
+                    continue
+                seen.add(path)
+            hits.append((key, float(scores[i])))
+            if len(hits) >= k:
+                break
+        return hits
+
+    def similar(self, key: str, k: int = 20) -> List[Tuple[str, float]]:
+        """Ähnlichste Einträge zu einem vorhandenen Schlüssel (ohne die Datei selbst)."""
+        vec = self.get(key)
+        if vec is None:
+            return []
+        path = key_path(key)
+        return [hit for hit in self.search(vec, k + 1) if key_path(hit[0]) != path][:k]
+
+    def duplicate_pairs(self, threshold: float = DUP_THRESHOLD, count: int = None) -> Iterator[Tuple[int, int, float]]:
+        """
+        Alle Zeilenpaare (i < j) mit Ähnlichkeit >= threshold, blockweise ohne n x n Matrix im RAM.
+        count: nur die ersten count Zeilen (Stand des Aufrufers, add() kann parallel weitere anhängen).
+        """
+        with self._lock:
+            count = len(self.keys) if count is None else min(count, len(self.keys))
+            if count == 0:
+                return
+            matrix = self._matrix[:count]
+        for i0 in range(0, count, DUP_BLOCK):
+            rows = np.asarray(matrix[i0:i0 + DUP_BLOCK], dtype=np.float32)
+            for j0 in range(i0, count, DUP_CHUNK):
+                cols = np.asarray(matrix[j0:j0 + DUP_CHUNK], dtype=np.float32)
+                sims = rows @ cols.T
+                if j0 == i0:  # Diagonalblock: Paare (i, i) und (j, i) ausblenden
+                    n = min(len(rows), len(cols))
+                    sims[:, :n][np.tril_indices(n)] = -1.0
+                if sims.max() < threshold:  # der Normalfall, billiger als np.nonzero() über den ganzen Block
+                    continue
+                hit_rows = np.flatnonzero((sims >= threshold).any(axis=1))
+                ii, jj = np.nonzero(sims[hit_rows] >= threshold)
+                ii = hit_rows[ii]
+                for i, j in zip(ii, jj):
+                    yield i0 + int(i), j0 + int(j), float(sims[i, j])
+
+    #
+    # Gruppen nahezu gleicher Bilder (Serienbilder, Kopien, bearbeitete Versionen).
+    # Paare über dem Schwellwert werden per Union-Find zu Gruppen zusammengefasst,
+    # Keyframes desselben Videos zählen nicht als Duplikate voneinander.
+    #
+    def duplicate_clusters(self, threshold: float = DUP_THRESHOLD) -> List[List[str]]:
+        with self._lock:
+            paths = [key_path(k) for k in self.keys]
+        parent = list(range(len(paths)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i, j, _ in self.duplicate_pairs(threshold, count=len(paths)):
+            if paths[i] == paths[j]:
+                continue
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+        groups: Dict[int, List[str]] = {}
+        for row, path in enumerate(paths):
+            group = groups.setdefault(find(row), [])
+            if path not in group:
+                group.append(path)
+        clusters = [sorted(group) for group in groups.values() if len(group) > 1]
+        clusters.sort(key=lambda g: (-len(g), g[0]))
+        return clusters
+
+    def flush(self):
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
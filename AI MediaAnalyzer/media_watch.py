@@ -0,0 +1,211 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+# own:
+from media_tools import MEDIA_EXT
+
+try:  # optional: inotify (Linux), FSEvents (macOS), ReadDirectoryChangesW (Windows)
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+log = logging.getLogger(__name__)
+
+#
+# Ordner beobachten und neue/geänderte Mediendateien an die Pipeline geben.
+# Handys synchronisieren Dateien in Stücken: eine Datei wird erst gemeldet, wenn Größe und
+# Änderungszeit DEBOUNCE_S Sekunden lang gleich geblieben sind.
+# Ohne watchdog wird der Ordner alle POLL_INTERVAL_S Sekunden gescannt (os.scandir, nur stat).
+#
+DEBOUNCE_S = 2.0
+POLL_INTERVAL_S = 5.0
+CHECK_INTERVAL_S = 0.5
+# Eigene Ausgaben des Analyzers nicht erneut analysieren (Video-Frames, Exporte, Transkripte)
+IGNORED_SUFFIXES = ("_transkript.txt",)
+IGNORED_PREFIXES = ("_media_analysis.", "_media_stats.")
+
+Signature = Tuple[int, int]  # (Größe, mtime_ns)
+
+
+def is_watched_file(path: str) -> bool:
+    name = os.path.basename(path)
+    if name.startswith(IGNORED_PREFIXES) or name.endswith(IGNORED_SUFFIXES) or name.startswith("."):
+        return False
+    stem, ext = os.path.splitext(name)
+    if ext.lower() not in MEDIA_EXT:
+        return False
+    # Video-Frames aus media_tools.save_video_frames(): "<video>+<mm_ss>.png"
+    return not (ext.lower() == ".png" and "+" in stem)
+
+
+def _signature(path: str) -> Signature | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def scan(folder) -> Dict[str, Signature]:
+    """Alle beobachteten Dateien unter folder mit Größe und mtime."""
+    result = {}
+    stack = [str(folder)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif is_watched_file(entry.path):
+                        st = entry.stat()
+                        result[os.path.abspath(entry.path)] = (st.st_size, st.st_mtime_ns)
+        except OSError as e:
+            log.debug(f"scan(): {e}")
+    return result
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher: "FolderWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._watcher.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._watcher.touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._watcher.touch(event.dest_path)
+
+    def on_closed(self, event):  # inotify: Schreiben beendet
+        self._watcher.touch(event.src_path)
+
+
+class FolderWatcher:
+    """
+    Ruft on_files([Path, ...]) im Watcher-Thread auf, sobald neue oder geänderte Dateien
+    DEBOUNCE_S Sekunden unverändert sind. Dateien, die es beim Start schon gibt, gelten als bekannt.
+    Während on_files() läuft, werden weitere Änderungen gesammelt und danach gemeldet.
+        watcher = FolderWatcher(folder, gui.ingest_files).start()
+        ...
+        watcher.mark_seen(paths)  # z.B. nach dem Schreiben der AI Tags, sonst kämen die Dateien erneut
+        watcher.stop()
+    """
+
+    def __init__(self, folder, on_files: Callable[[List[Path]], None], debounce: float = DEBOUNCE_S,
+                 poll_interval: float = POLL_INTERVAL_S, use_watchdog: bool = True):
+        self.folder = Path(folder)
+        self._on_files = on_files
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._use_watchdog = use_watchdog and Observer is not None
+        self._lock = threading.Lock()
+        self._seen: Dict[str, Signature] = {}
+        self._candidates: Dict[str, Tuple[Signature, float]] = {}  # Pfad -> (Signatur, seit)
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    @property
+    def mode(self) -> str:
+        return "watchdog" if self._use_watchdog else "polling"
+
+    def start(self):
+        self._seen = scan(self.folder)
+        if self._use_watchdog:
+            self._observer = Observer()
+            self._observer.schedule(_Handler(self), str(self.folder), recursive=True)
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name="FolderWatcher", daemon=True)
+        self._thread.start()
+        log.info(f"👁 Watching {self.folder} ({self.mode}, {len(self._seen)} files known)")
+        return self
+
+    def stop(self, wait: bool = True):
+        """Beenden. wait=False kehrt sofort zurück (z.B. im Tk-Mainthread), join() wartet dann später."""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+        if wait:
+            self.join()
+
+    def join(self, timeout: float = 5):
+        """Auf Observer und Watcher-Thread warten (der Watcher-Thread beendet noch ein laufendes on_files)."""
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.join(timeout=timeout)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        log.info(f"👁 Stopped watching {self.folder}")
+
+    def touch(self, path: str):
+        """Datei hat sich (vielleicht) geändert: Entprellung neu starten."""
+        path = os.path.abspath(path)
+        if not is_watched_file(path):
+            return
+        sig = _signature(path)
+        with self._lock:
+            if sig is None or sig == self._seen.get(path):
+                self._candidates.pop(path, None)
+            elif path not in self._candidates or self._candidates[path][0] != sig:
+                self._candidates[path] = (sig, time.monotonic())
+
+    def mark_seen(self, paths):
+        """Aktuellen Stand als bekannt merken (eigene Schreibzugriffe, z.B. AI Tags)."""
+        with self._lock:
+            for path in paths:
+                path = os.path.abspath(str(path))
+                sig = _signature(path)
+                if sig is not None:
+                    self._seen[path] = sig
+                self._candidates.pop(path, None)
+
+    def _poll(self):
+        current = scan(self.folder)
+        with self._lock:
+            for path in [p for p in self._seen if p not in current]:  # gelöscht
+                del self._seen[path]
+        for path, sig in current.items():
+            if sig != self._seen.get(path):
+                self.touch(path)
+
+    def _ready(self) -> List[Path]:
+        """Kandidaten, deren Signatur seit DEBOUNCE_S Sekunden gleich ist."""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (sig, since) in list(self._candidates.items()):
+                current = _signature(path)
+                if current is None:
+                    del self._candidates[path]
+                elif current != sig:
+                    self._candidates[path] = (current, now)
+                elif now - since >= self._debounce:
+                    del self._candidates[path]
+                    self._seen[path] = sig
+                    ready.append(Path(path))
+        return sorted(ready)
+
+    def _run(self):
+        next_poll = 0.0
+        while not self._stop.is_set():
+            if not self._use_watchdog and time.monotonic() >= next_poll:
+                self._poll()
+                next_poll = time.monotonic() + self._poll_interval
+            ready = self._ready()
+            if ready:
+                log.info(f"👁 {len(ready)} new/changed files in {self.folder}")
+                try:
+                    self._on_files(ready)
+                except Exception:
+                    log.exception("FolderWatcher: on_files(): ")
+            self._stop.wait(CHECK_INTERVAL_S)
@@ -0,0 +1,486 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+# own:
+from media_jobs import JOBS_DB, JobQueue, job_key
+from media_tools import get_kind_of_media
+
+log = logging.getLogger(__name__)
+
+#
+# Verteilte Analyse: ein Coordinator verteilt die Dateien eines Archivs per HTTP/JSON an beliebig
+# viele Worker (andere Rechner mit GPU, gleicher Netzwerk-Share). Ein Worker holt sich einen Job (Lease),
+# analysiert die Datei (read_ai_metadata -> Bildbeschreibung -> Gesichter -> Transkript) und lädt das
+# Ergebnis hoch. Meldet er sich LEASE_S Sekunden nicht (Absturz, Netzwerk), bekommt ein anderer Worker
+# den Job; nach MAX_ATTEMPTS Versuchen ist er failed. Die Jobs liegen in der JobQueue "remote".
+#
+#   python media_worker.py serve //nas/Fotos --host 0.0.0.0 --port 8765 --token geheim
+#   python media_worker.py work http://coordinator:8765 --token geheim --map //nas/Fotos=/mnt/fotos
+#
+# Protokoll (POST, JSON, Header X-Worker-Token):
+#   /lease     {"worker", "wait"}                -> 200 {"job": {"id", "attempts", "payload"}, "lease_s"}
+#                                                   204 keine Arbeit (Header X-Done: 1 = alles erledigt)
+#   /renew     {"id", "attempts"}                -> 200 | 409 Lease verloren
+#   /result    {"id", "attempts", "result"}      -> 200 | 409 Lease verloren
+#   /fail      {"id", "attempts", "error"}       -> 200 | 409 Lease verloren
+#   GET /status                                  -> 200 {"pending", "running", "done", "failed", "workers"}
+#
+DEFAULT_PORT = 8765
+LEASE_S = 120.0           # ohne renew() so lange, dann wird der Job neu vergeben
+LEASE_WAIT_S = 10.0       # Long-Polling: so lange wartet /lease auf einen Job
+QUEUE_NAME = "remote"
+RETRY_MAX_S = 60.0        # Worker: längste Pause zwischen Verbindungsversuchen
+GIVE_UP_S = 15 * 60.0     # Worker: Coordinator so lange nicht erreichbar -> beenden
+IDLE_S = 2.0              # Worker: Pause, wenn gerade nichts zu tun ist
+TOKEN_HEADER = "X-Worker-Token"
+
+
+###########################################################
+# Coordinator
+###########################################################
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "AIMediaCoordinator/1.0"
+
+    def log_message(self, fmt, *args):
+        log.debug("%s: " + fmt, self.client_address[0], *args)
+
+    def _send_json(self, payload: Optional[dict], status: int = 200, headers: Dict[str, str] = None):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        token = self.server.coordinator.token
+        if token and self.headers.get(TOKEN_HEADER) != token:
+            self._send_json({"error": "unauthorized"}, 401)
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path.rstrip("/") == "/status":
+            self._send_json(self.server.coordinator.status())
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json({"error": "bad request"}, 400)
+            return
+        coordinator = self.server.coordinator
+        route = self.path.rstrip("/")
+        try:
+            if route == "/lease":
+                job = coordinator.lease(str(request.get("worker", self.client_address[0])),
+                                        min(float(request.get("wait", LEASE_WAIT_S)), LEASE_WAIT_S))
+                if job is None:
+                    self._send_json(None, 204, {"X-Done": "1" if coordinator.finished() else "0"})
+                else:
+                    self._send_json({"job": job, "lease_s": coordinator.lease_s})
+            elif route in ("/renew", "/result", "/fail"):
+                job_id, attempts = int(request["id"]), int(request["attempts"])
+                if route == "/renew":
+                    ok = coordinator.renew(job_id, attempts)
+                elif route == "/result":
+                    ok = coordinator.complete(job_id, attempts, request.get("result") or {})
+                else:
+                    ok = coordinator.fail(job_id, attempts, str(request.get("error", "")))
+                self._send_json({"ok": ok}, 200 if ok else 409)
+            else:
+                self._send_json({"error": "not found"}, 404)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json({"error": f"bad request: {e}"}, 400)
+
+
+class Coordinator:
+    """
+    HTTP Server vor einer JobQueue. on_result(payload, result) wird für jedes hochgeladene Ergebnis
+    aufgerufen (z.B. Suchindex aktualisieren), nacheinander, nicht parallel.
+        with Coordinator(JobQueue("remote"), port=0) as coordinator:
+            coordinator.add(path)
+            coordinator.wait()
+    """
+
+    def __init__(self, queue: JobQueue, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 lease_s: float = LEASE_S, token: str = None, on_result: Callable[[dict, dict], None] = None):
+        self.queue = queue
+        self.lease_s = lease_s
+        self.token = token
+        self._on_result = on_result
+        self._result_lock = threading.Lock()
+        self._workers: Dict[str, float] = {}  # Worker -> letzte Meldung
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.coordinator = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="Coordinator", daemon=True)
+        self._thread.start()
+        log.info(f"Coordinator listening on {self.url} (lease {self.lease_s:.0f} s)")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.queue.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def add(self, path, force: bool = False, **payload) -> bool:
+        """
+        Datei einreihen. False bei unbekanntem Dateityp oder wenn die unveränderte Datei
+        schon ein Ergebnis hat (Neustart des Coordinators), force=True analysiert erneut.
+        """
+        kind = get_kind_of_media(path)
+        if kind == "unknown":
+            return False
+        path = os.path.abspath(str(path))
+        key = job_key(path)
+        if not force and self.queue.result(key) is not None:
+            return False
+        self.queue.put(key, {"path": path, "kind": kind, **payload})
+        return True
+
+    def lease(self, worker: str, wait: float = 0.0) -> Optional[dict]:
+        self._workers[worker] = time.time()
+        self.queue.expire_leases(self.lease_s)
+        job = self.queue.get(block=wait > 0, timeout=wait)
+        if job is None:
+            return None
+        log.debug(f"lease {job} -> {worker}")
+        return {"id": job.id, "attempts": job.attempts, "payload": job.payload}
+
+    def renew(self, job_id: int, attempts: int) -> bool:
+        return self.queue.renew(job_id, attempts)
+
+    def complete(self, job_id: int, attempts: int, result: dict) -> bool:
+        with self._result_lock:
+            job = self.queue.leased(job_id, attempts)
+            if job is None:
+                return False
+            self.queue.task_done(job, result)
+            if self._on_result is not None:
+                try:
+                    self._on_result(job.payload, result)
+                except Exception:
+                    log.exception(f"on_result({job.payload.get('path')}): ")
+            return True
+
+    def fail(self, job_id: int, attempts: int, error: str) -> bool:
+        job = self.queue.leased(job_id, attempts)
+        if job is None:
+            return False
+        self.queue.task_failed(job, error)
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        self.queue.expire_leases(self.lease_s)
+        counts = self.queue.counts()
+        status = {state: counts.get(state, 0) for state in ("pending", "running", "done", "failed")}
+        now = time.time()
+        status["workers"] = sorted(w for w, seen in self._workers.items() if now - seen < self.lease_s)
+        return status
+
+    def finished(self) -> bool:
+        counts = self.queue.counts()
+        return not counts.get("pending") and not counts.get("running")
+
+    def wait(self, poll_s: float = 1.0, progress: Callable[[Dict[str, Any]], None] = None):
+        """Blockiert, bis kein Job mehr pending oder running ist (abgelaufene Leases werden neu vergeben)."""
+        while True:
+            status = self.status()
+            if progress is not None:
+                progress(status)
+            if not status["pending"] and not status["running"]:
+                return status
+            time.sleep(poll_s)
+
+
+###########################################################
+# Worker
+###########################################################
+class FilePipeline:
+    """
+    Analyse einer Datei wie in MediaAnalyzerGUI._run_pipeline, ohne GUI, Tabelle und Queues.
+    Modelle werden beim ersten Aufruf geladen. Address/Landmark kommen nur aus vorhandenen AI Tags,
+    Nominatim/Overpass fragt der Worker nicht (Rate-Limit pro IP).
+    """
+
+    def __init__(self, face_db: Path = None, audio_model: str = "small", interval: int = 20,
+                 cpu_optimized: bool = False):
+        self.face_db = face_db
+        self.audio_model = audio_model
+        self.interval = interval
+        self.cpu_optimized = cpu_optimized
+        self._et = None
+        self._image = None
+        self._face = None
+        self._audio = None
+
+    def _models(self):
+        if self._et is None:
+            from exiftool import ExifToolHelper
+            from ai_image import AIImage
+            self._et = ExifToolHelper(encoding="utf-8")
+            self._et.run()
+            self._image = AIImage(cpu_optimized=self.cpu_optimized)
+            if self.face_db:
+                from ai_face import AIFace
+                self._face = AIFace(Path(self.face_db))
+        return self._et, self._image, self._face
+
+    def _audio_model(self):
+        if self._audio is None:
+            from ai_audio import AIAudio
+            # AIAudio lädt Whisper synchron im Konstruktor (audio_model_ready setzt nur preload_audio_model)
+            audio = AIAudio(audio_model_size=self.audio_model, cpu_optimized=self.cpu_optimized)
+            if audio.audio_model is None:
+                raise RuntimeError(f"Whisper: model '{self.audio_model}' not loaded")
+            self._audio = audio
+        return self._audio
+
+    def __call__(self, path: Path, kind: str) -> Dict[str, Any]:
+        import media_tools
+        et, ai_image, ai_face = self._models()
+        meta_ai = media_tools.read_ai_metadata(path, et)
+        meta = media_tools.get_meta_data_bundle(path, meta_ai, et_instance=et)
+        result = {field: meta.get(field) or "" for field in ("Date", "Lat", "Lon", "Length", "Address", "Landmark")}
+        caption = meta_ai.get("caption", "")
+        transcript = meta_ai.get("transcript", "")
+        persons = meta.get("Persons") or meta_ai.get("persons", "")
+        segments = []
+        if len(caption) < 4:
+            if kind == "image":
+                caption = ai_image.describe_image(path)
+            elif kind == "video":
+                caption = ai_image.describe_video_by_frames(path, self.interval)
+                if ai_face is not None:
+                    media_tools.save_video_frames(path, self.interval)
+            elif kind == "audio":
+                cover = media_tools.extract_mp3_cover_file(path)
+                caption = ai_image.describe_image(cover, key=str(path)) if cover is not None else ""
+        if ai_face is not None and not persons:
+            persons = ", ".join(sorted(ai_face.identify_persons(path)))
+        if kind in ("audio", "video") and len(transcript) < 4:
+            transcript, segments = self._audio_model().transcribe_audio_segments(path)
+        result.update({"Persons": persons, "Image": caption, "Audio": transcript, "segments": segments})
+        return result
+
+    def close(self):
+        if self._et is not None:
+            self._et.terminate()
+            self._et = None
+
+
+class Worker:
+    """
+    Holt Jobs vom Coordinator, bis alles erledigt ist. analyze(path, kind) -> dict (JSON-fähig).
+    path_map: {"//nas/Fotos": "/mnt/fotos"} übersetzt Pfade des Coordinators in lokale Pfade.
+    """
+
+    def __init__(self, url: str, analyze: Callable[[Path, str], Dict[str, Any]], name: str = None,
+                 token: str = None, path_map: Dict[str, str] = None, wait: float = LEASE_WAIT_S):
+        self.url = url.rstrip("/")
+        self.analyze = analyze
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident() % 10000}"
+        self.token = token
+        self.path_map = path_map or {}
+        self.wait = wait
+        self.done = 0
+        self.failed = 0
+        self._stop = threading.Event()
+
+    def _post(self, route: str, payload: dict, timeout: float = None) -> tuple[int, dict, dict]:
+        request = urllib.request.Request(f"{self.url}{route}", data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.wait + 30) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else {}, dict(response.headers)
+        except urllib.error.HTTPError as e:
+            if e.code == 409:
+                return e.code, {}, dict(e.headers)
+            raise
+
+    def _local_path(self, path: str) -> Path:
+        for remote, local in self.path_map.items():
+            if path.startswith(remote):
+                return Path(local + path[len(remote):])
+        return Path(path)
+
+    def _renew_loop(self, job: dict, lease_s: float, finished: threading.Event):
+        while not finished.wait(lease_s / 3):
+            try:
+                status, _, _ = self._post("/renew", {"id": job["id"], "attempts": job["attempts"]})
+                if status == 409:
+                    log.warning(f"{self.name}: lease for job {job['id']} lost")
+                    return
+            except (urllib.error.URLError, OSError) as e:
+                log.warning(f"{self.name}: renew failed: {e}")
+
+    def run_one(self) -> Optional[bool]:
+        """Einen Job bearbeiten. True/False = erledigt/fehlgeschlagen, None = kein Job bekommen."""
+        status, response, headers = self._post("/lease", {"worker": self.name, "wait": self.wait})
+        if status == 204:
+            if headers.get("X-Done") == "1":
+                self._stop.set()
+            else:  # andere Worker sind noch dran, ihre Jobs kommen zurück, falls ein Lease abläuft
+                self._stop.wait(IDLE_S)
+            return None
+        job, lease_s = response["job"], float(response["lease_s"])
+        payload = job["payload"]
+        finished = threading.Event()
+        renewer = threading.Thread(target=self._renew_loop, args=(job, lease_s, finished), daemon=True)
+        renewer.start()
+        try:
+            result = self.analyze(self._local_path(payload["path"]), payload["kind"])
+            route, body = "/result", {"result": result}
+        except Exception as e:
+            log.exception(f"{self.name}: {payload['path']}: ")
+            route, body = "/fail", {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            finished.set()
+            renewer.join()
+        status, _, _ = self._post(route, {"id": job["id"], "attempts": job["attempts"], **body})
+        if status == 409:
+            log.warning(f"{self.name}: result for job {job['id']} discarded (lease expired)")
+        ok = route == "/result"
+        if ok:
+            self.done += 1
+        else:
+            self.failed += 1
+        return ok
+
+    def run(self):
+        """Arbeitet, bis der Coordinator meldet, dass alles erledigt ist (oder stop())."""
+        log.info(f"Worker {self.name} → {self.url}")
+        backoff, unreachable_since = 1.0, None
+        while not self._stop.is_set():
+            try:
+                self.run_one()
+                backoff, unreachable_since = 1.0, None
+            except (urllib.error.URLError, OSError) as e:
+                unreachable_since = unreachable_since or time.monotonic()
+                if time.monotonic() - unreachable_since > GIVE_UP_S:
+                    log.error(f"{self.name}: coordinator unreachable for {GIVE_UP_S:.0f} s, giving up")
+                    break
+                log.warning(f"{self.name}: {e}, retry in {backoff:.0f} s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, RETRY_MAX_S)
+        log.info(f"Worker {self.name}: {self.done} done, {self.failed} failed")
+
+    def stop(self):
+        self._stop.set()
+
+
+###########################################################
+# CLI
+###########################################################
+def _serve(args):
+    from media_search import SearchIndex
+    from media_table import RecordStore, HEADINGS
+    import media_export
+
+    folder = Path(args.folder).resolve()
+    index = SearchIndex()
+
+    def _on_result(payload, result):
+        fields = {"caption": result.get("Image", ""), "transcript": result.get("segments") or result.get("Audio", ""),
+                  "persons": result.get("Persons", ""), "address": result.get("Address", ""),
+                  "landmark": result.get("Landmark", "")}
+        index.update(payload["path"], payload["kind"], **{k: v for k, v in fields.items() if v})
+
+    queue = JobQueue(QUEUE_NAME, db_path=Path(args.db))
+    coordinator = Coordinator(queue, args.host, args.port, lease_s=args.lease, token=args.token, on_result=_on_result)
+    with coordinator:
+        paths = [os.path.join(root, f) for root, _, names in os.walk(folder) for f in names]
+        added = sum(coordinator.add(path) for path in paths)
+        log.info(f"{added} files queued from {folder} (unchanged files with a result are skipped)")
+        queue.close()  # alle Jobs sind eingereiht: /lease wartet nicht mehr auf neue
+        status = coordinator.wait(poll_s=5, progress=lambda s: log.info(
+            f"pending {s['pending']}, running {s['running']}, done {s['done']}, failed {s['failed']}, "
+            f"workers {len(s['workers'])}"))
+        time.sleep(min(args.lease, LEASE_WAIT_S))  # wartende Worker erfahren, dass alles erledigt ist
+
+    records = RecordStore()
+    for path in sorted(paths):
+        kind = get_kind_of_media(path)
+        if kind == "unknown":
+            continue
+        result = queue.result(job_key(path)) or {}
+        rec = {name: result.get(name, "") for name in HEADINGS}
+        rec.update({"File": os.path.relpath(path, folder), "Type": kind.capitalize()})
+        records.append(rec)
+    out_path = folder / "_media_analysis.csv"
+    media_export.export_csv(records, str(out_path))
+    log.info(f"done: {status['done']}, failed: {status['failed']} → {out_path}")
+
+
+def _work(args):
+    path_map = dict(item.split("=", 1) for item in args.map)
+    # Ein Job nach dem anderen (ein Modell pro GPU), für mehr Parallelität mehrere Worker-Prozesse starten
+    pipeline = FilePipeline(args.face_db, args.model, args.interval, args.cpu_int8)
+    worker = Worker(args.url, pipeline, token=args.token, path_map=path_map)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    parser = argparse.ArgumentParser(description="Verteilte Medienanalyse: Coordinator und Worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Ordner einreihen und Jobs an Worker verteilen")
+    serve.add_argument("folder")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--lease", type=float, default=LEASE_S)
+    serve.add_argument("--db", default=str(JOBS_DB))
+    serve.add_argument("--token", default=os.environ.get("AIMEDIA_WORKER_TOKEN"))
+    work = sub.add_parser("work", help="Jobs vom Coordinator holen und analysieren")
+    work.add_argument("url")
+    work.add_argument("--token", default=os.environ.get("AIMEDIA_WORKER_TOKEN"))
+    work.add_argument("--map", action="append", default=[], metavar="REMOTE=LOCAL")
+    work.add_argument("--face-db", default=None)
+    work.add_argument("--model", default="small")
+    work.add_argument("--interval", type=int, default=20)
+    work.add_argument("--cpu-int8", action="store_true")
+    args = parser.parse_args()
+    sys.exit(_serve(args) if args.command == "serve" else _work(args))